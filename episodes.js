@@ -9,13 +9,17 @@ let currentDateTo = '';
 let currentMaxDuration = 150; // minutes
 let currentHasVideo = false;
 let searchEngine = null;
+let searchGeneration = 0; // Incremented per search; stale async results are dropped
 
 // Load episodes data and initialize search
 async function loadEpisodes() {
     try {
-        // Initialize search engine
+        // Initialize search engine (sharded index: posting shards and episode
+        // details are fetched on demand)
         searchEngine = new EpisodeSearch();
-        await searchEngine.loadIndex('resources/episodes/search-index.json');
+        if (!await searchEngine.loadIndex('resources/episodes/search-index/manifest.json')) {
+            throw new Error('Search index not available');
+        }
 
         // Get all episodes from search index
         allEpisodes = searchEngine.episodes;
@@ -38,6 +42,21 @@ async function loadEpisodes() {
     }
 }
 
+// Count episodes per comma-separated value of a field (for indexes without facets)
+function countEpisodeValues(field, legacyField) {
+    const counts = {};
+    allEpisodes.forEach(ep => {
+        const value = ep[field] || ep[legacyField] || '';
+        if (value && value !== 'N/A') {
+            value.split(',').forEach(part => {
+                const trimmed = part.trim();
+                counts[trimmed] = (counts[trimmed] || 0) + 1;
+            });
+        }
+    });
+    return counts;
+}
+
 // Populate industry, subcategory, and guest filters with counts
 function populateFilters() {
     if (!searchEngine) return;
@@ -45,18 +64,9 @@ function populateFilters() {
     const industries = searchEngine.getIndustries();
     const subcategories = searchEngine.getSubcategories();
 
-    // Count episodes per industry
-    const industryCounts = {};
-    allEpisodes.forEach(ep => {
-        const industry = ep.industry_category || ep['Industry Category'] || '';
-        if (industry && industry !== 'N/A') {
-            // Handle comma-separated industries
-            industry.split(',').forEach(ind => {
-                const trimmed = ind.trim();
-                industryCounts[trimmed] = (industryCounts[trimmed] || 0) + 1;
-            });
-        }
-    });
+    // Count episodes per industry (precomputed facets when the index has them)
+    const industryCounts = searchEngine.getFacetCounts('industry_category')
+        || countEpisodeValues('industry_category', 'Industry Category');
 
     // Populate industry dropdown with counts
     const industrySelect = document.getElementById('industry-filter');
@@ -69,17 +79,8 @@ function populateFilters() {
     });
 
     // Count episodes per subcategory
-    const subcategoryCounts = {};
-    allEpisodes.forEach(ep => {
-        const subcategory = ep.industry_subcategory || ep['Industry Subcategory'] || '';
-        if (subcategory && subcategory !== 'N/A') {
-            // Handle comma-separated subcategories
-            subcategory.split(',').forEach(sub => {
-                const trimmed = sub.trim();
-                subcategoryCounts[trimmed] = (subcategoryCounts[trimmed] || 0) + 1;
-            });
-        }
-    });
+    const subcategoryCounts = searchEngine.getFacetCounts('industry_subcategory')
+        || countEpisodeValues('industry_subcategory', 'Industry Subcategory');
 
     // Populate subcategory dropdown with counts
     const subcategorySelect = document.getElementById('subcategory-filter');
@@ -134,6 +135,36 @@ function renderEpisodes() {
     });
 }
 
+// Responsive thumbnails: card width on desktop, full width on mobile
+const THUMBNAIL_SIZES = '(max-width: 768px) 100vw, 300px';
+
+// srcset for one format of an optimized thumbnail (see scripts/optimize_thumbnails.py)
+function thumbnailSrcset(variants, thumbnail, format) {
+    const extension = variants.formats[format];
+    return thumbnail.widths
+        .map(width => `${variants.base_url}/${thumbnail.name}-${width}.${extension} ${width}w`)
+        .join(', ');
+}
+
+// Thumbnail markup: WebP/JPEG variants when the index has them, else the original image
+function createThumbnail(episode, episodeNum, title) {
+    const variants = searchEngine && searchEngine.searchIndex && searchEngine.searchIndex.thumbnails;
+    const thumbnail = variants && (episode.thumbnail || variants.default);
+
+    if (!thumbnail) {
+        // Build thumbnail path - use episode number for filename (format: 07.jpg, 100.jpg, etc.)
+        const thumbnailFilename = `${episodeNum}.jpg`;
+        const thumbnailPath = `resources/episodes/thumbnails/${thumbnailFilename}`;
+        return `<img src="${thumbnailPath}" alt="${title}" class="episode-thumbnail" onerror="this.src='resources/episodes/thumbnails/default.jpg'">`;
+    }
+
+    const src = `${variants.base_url}/${thumbnail.name}-${thumbnail.widths[0]}.${variants.formats.jpeg}`;
+    return `<picture>
+                <source type="image/webp" srcset="${thumbnailSrcset(variants, thumbnail, 'webp')}" sizes="${THUMBNAIL_SIZES}">
+                <img src="${src}" srcset="${thumbnailSrcset(variants, thumbnail, 'jpeg')}" sizes="${THUMBNAIL_SIZES}" width="${thumbnail.width}" height="${thumbnail.height}" alt="${title}" class="episode-thumbnail" loading="lazy">
+            </picture>`;
+}
+
 // Create episode card HTML
 function createEpisodeCard(episode) {
     // Handle both old and new data formats
@@ -143,13 +174,9 @@ function createEpisodeCard(episode) {
     const summary = episode.summary || episode['Episode Summary'] || 'No summary available';
     const date = episode.date || episode['Episode Date'] || '';
 
-    // Build thumbnail path - use episode number for filename (format: 07.jpg, 100.jpg, etc.)
-    const thumbnailFilename = `${episodeNum}.jpg`;
-    const thumbnail = `resources/episodes/thumbnails/${thumbnailFilename}`;
-
     return `
         <div class="episode-card" data-episode="${episodeNum}">
-            <img src="${thumbnail}" alt="${title}" class="episode-thumbnail" onerror="this.src='resources/episodes/thumbnails/default.jpg'">
+            ${createThumbnail(episode, episodeNum, title)}
             <div class="episode-content">
                 <div class="episode-header">
                     <span class="episode-number">Episode ${episodeNum}</span>
@@ -167,10 +194,13 @@ function createEpisodeCard(episode) {
 }
 
 // Open episode detail modal
-function openModal(episode) {
+async function openModal(episode) {
     const modal = document.getElementById('episode-modal');
     const modalBody = document.getElementById('modal-body');
 
+    // Cards only carry the card fields; fetch the rest (summary, takeaways, links)
+    episode = (await searchEngine.loadDetails(episode.id)) || episode;
+
     // Get episode data - handle both formats
     const episodeNum = episode.id || episode['Episode #'] || 'N/A';
     const title = episode.title || episode['Episode Title'] || 'Untitled Episode';
@@ -300,7 +330,7 @@ function formatDate(dateString) {
 }
 
 // Search episodes
-function searchEpisodes(query) {
+async function searchEpisodes(query) {
     if (!searchEngine) {
         console.warn('Search engine not initialized');
         return;
@@ -321,17 +351,28 @@ function searchEpisodes(query) {
         searchOptions.subcategory = currentSubcategory;
     }
 
-    // Use search engine with filters
-    if (searchTerm) {
-        filteredEpisodes = searchEngine.search(searchTerm, searchOptions);
-    } else if (currentIndustry || currentSubcategory) {
-        // Apply filters even without search query
-        filteredEpisodes = searchEngine.search('', searchOptions);
-    } else {
-        // No query or filters - show all
-        filteredEpisodes = allEpisodes;
+    // Use search engine with filters (fetches the query's shards first)
+    const generation = ++searchGeneration;
+    let results;
+    try {
+        if (searchTerm) {
+            results = await searchEngine.searchAsync(searchTerm, searchOptions);
+        } else if (currentIndustry || currentSubcategory) {
+            // Apply filters even without search query
+            results = await searchEngine.searchAsync('', searchOptions);
+        } else {
+            // No query or filters - show all
+            results = allEpisodes;
+        }
+    } catch (error) {
+        console.error('Search failed:', error);
+        return;
     }
 
+    // A newer search started while this one was fetching shards
+    if (generation !== searchGeneration) return;
+    filteredEpisodes = results;
+
     // Apply guest filter
     if (currentGuest) {
         filteredEpisodes = filteredEpisodes.filter(episode => {
@@ -511,7 +552,8 @@ document.addEventListener('DOMContentLoaded', () => {
         const durationFilter = document.getElementById('duration-filter');
         durationFilter.style.background = 'linear-gradient(to right, #0098EE 100%, #E5E7EB 100%)';
 
-        // Show all episodes
+        // Show all episodes (and drop results of searches still in flight)
+        searchGeneration++;
         filteredEpisodes = allEpisodes;
         updateResultsCount();
         renderEpisodes();
@@ -10,10 +10,30 @@ class EpisodeSearch {
         this.index = {};
         this.filters = {};
         this.loading = false;
+        this.shards = null;        // Shard table when loaded from a sharded manifest
+        this.shardBase = '';
+        this.loadedShards = new Map(); // shard key -> Promise
+        this.readyShards = new Set();  // shard keys fetched and merged
+        this.loadedDetails = new Map(); // details chunk -> Promise (sharded index)
+        this.encoding = null;      // Posting list encoding ('delta-varint-base64' or null)
+        this.decodedPostings = new Map(); // token -> decoded episode ids (compact encoding)
+        this.bm25 = null;          // BM25F parameters/lengths when the index carries term stats
+        this.rowOf = new Map();    // episode id -> row in this.episodes
+        this.transcripts = null;   // Positional transcript index (see loadTranscriptIndex)
+        this.suggestions = null;   // Autocomplete index (see loadSuggestions)
+        this.tagSets = new Map();  // episode id -> Set of tags (synonym matching)
+        this.tagMatchSets = new Map(); // token -> Set of episode ids (sharded tag_matches)
+        this.facetSets = new Map(); // "field:value" -> Set of matching episode ids
     }
 
     /**
      * Load search index from JSON file
+     *
+     * Accepts either the single-file index (search-index.json) or the
+     * manifest of a sharded index (search-index/manifest.json). In sharded
+     * mode only the manifest and the episode card fields are fetched here;
+     * posting shards are fetched on demand by searchAsync() and the other
+     * episode fields by loadDetails().
      */
     async loadIndex(indexPath = 'search-index.json') {
         if (this.loading) return;
@@ -24,9 +44,23 @@ class EpisodeSearch {
         try {
             const response = await fetch(indexPath);
             this.searchIndex = await response.json();
+
+            if (this.searchIndex.shards) {
+                this.shards = this.searchIndex.shards;
+                this.shardBase = indexPath.substring(0, indexPath.lastIndexOf('/') + 1);
+                const episodesResponse = await fetch(this.shardBase + this.searchIndex.episodes_file);
+                this.searchIndex.episodes = await episodesResponse.json();
+                for (const section of this.shards.sections) {
+                    this.searchIndex[section] = {};
+                }
+            }
+
             this.episodes = this.searchIndex.episodes;
             this.index = this.searchIndex.index;
             this.filters = this.searchIndex.filters;
+            this.encoding = (this.searchIndex.metadata || {}).encoding || null;
+            this.bm25 = this.searchIndex.bm25 || null;
+            this.episodes.forEach((ep, row) => this.rowOf.set(ep.id, row));
             this.loading = false;
             console.log(`✓ Loaded ${this.episodes.length} episodes`);
             return true;
@@ -37,6 +71,336 @@ class EpisodeSearch {
         }
     }
 
+    /**
+     * Fetch the posting shards needed for the given tokens (sharded index only)
+     */
+    async loadShardsFor(tokens) {
+        if (!this.shards) return;
+        await this.loadShards(this.shards, this.shardBase, this.loadedShards, this.searchIndex, tokens, this.readyShards);
+    }
+
+    /**
+     * Keys of the shards covering `tokens` that are not loaded yet
+     */
+    missingShards(tokens) {
+        if (!this.shards) return [];
+        const keys = tokens.map(token => Array.from(token).slice(0, this.shards.prefix_length).join(''));
+        return Array.from(new Set(keys)).filter(key => this.shards.table[key] && !this.readyShards.has(key));
+    }
+
+    /**
+     * Fetch the shards covering `tokens` and merge their sections into `target`
+     *
+     * @param {Object} shards - Shard description from a manifest
+     * @param {string} base - URL prefix of the shard files
+     * @param {Map} loaded - shard key -> Promise, shared between calls
+     * @param {Object} target - Object holding one dict per shard section
+     * @param {Array} tokens - Tokens whose shards are needed
+     * @param {Set} ready - Optional set receiving the keys of merged shards
+     */
+    async loadShards(shards, base, loaded, target, tokens, ready = null) {
+        const pending = [];
+        for (const token of tokens) {
+            const key = Array.from(token).slice(0, shards.prefix_length).join('');
+            const entry = shards.table[key];
+            if (!entry) continue; // No indexed token starts with this prefix
+
+            if (!loaded.has(key)) {
+                loaded.set(key, this.fetchShard(shards, base + entry.file, loaded, target, key, ready));
+            }
+            pending.push(loaded.get(key));
+        }
+
+        await Promise.all(pending);
+    }
+
+    async fetchShard(shards, url, loaded, target, key, ready) {
+        try {
+            const response = await fetch(url);
+            const shard = await response.json();
+            for (const section of shards.sections) {
+                Object.assign(target[section], shard[section] || {});
+            }
+            if (ready) ready.add(key);
+        } catch (error) {
+            console.error(`Failed to load search shard '${key}':`, error);
+            loaded.delete(key); // Retry on the next query
+        }
+    }
+
+    /**
+     * Get an episode with all its fields, fetching its details chunk first
+     * when the index is sharded (the card fields are loaded up front)
+     *
+     * @returns {Object|undefined} The episode row, or undefined for an unknown id
+     */
+    async loadDetails(id) {
+        const row = this.rowOf.get(id);
+        const details = this.searchIndex && this.searchIndex.details;
+        if (row === undefined || !details) return this.getEpisodeById(id);
+
+        const chunk = Math.floor(row / details.chunk_size);
+        if (!this.loadedDetails.has(chunk)) {
+            this.loadedDetails.set(chunk, this.fetchDetails(details, chunk));
+        }
+        await this.loadedDetails.get(chunk);
+        return this.episodes[row];
+    }
+
+    async fetchDetails(details, chunk) {
+        try {
+            const response = await fetch(this.shardBase + details.files[chunk]);
+            const rows = await response.json();
+            rows.forEach((fields, i) => Object.assign(this.episodes[chunk * details.chunk_size + i], fields));
+        } catch (error) {
+            console.error(`Failed to load episode details '${details.files[chunk]}':`, error);
+            this.loadedDetails.delete(chunk); // Retry on the next request
+        }
+    }
+
+    /**
+     * Load the autocomplete index (search-suggest.json). It is small and
+     * independent of the main index, so it can be loaded first.
+     */
+    async loadSuggestions(suggestPath = 'search-suggest.json') {
+        if (this.suggestions) return true;
+
+        try {
+            const response = await fetch(suggestPath);
+            this.suggestions = await response.json();
+            return true;
+        } catch (error) {
+            console.error('Failed to load autocomplete index:', error);
+            return false;
+        }
+    }
+
+    /**
+     * Autocomplete the last word of the query
+     *
+     * @param {string} text - Text typed so far
+     * @returns {Object} { completions: [token, ...], episodes: [{id, title}, ...] }
+     */
+    suggest(text) {
+        const empty = { completions: [], episodes: [] };
+        if (!this.suggestions || !text) return empty;
+
+        const words = text.toLowerCase().match(/[\w-]+/g);
+        if (!words) return empty;
+        const prefix = words[words.length - 1];
+
+        const { max_prefix: maxPrefix, top_k: topK, tokens, prefixes, titles } = this.suggestions;
+        const chars = Array.from(prefix);
+        const entry = prefixes[chars.slice(0, maxPrefix).join('')];
+        if (!entry) return empty;
+
+        const [start, end, completions, episodeIds] = entry;
+        const toEpisodes = ids => ids.map(id => ({ id: id, title: titles[id] }));
+
+        if (chars.length <= maxPrefix) {
+            return {
+                completions: completions.map(position => tokens[position]),
+                episodes: toEpisodes(episodeIds)
+            };
+        }
+
+        // Longer prefix: binary-search its sub-range of the max_prefix entry
+        // (tokens are sorted) and rank that by document frequency
+        const from = this.lowerBound(tokens, prefix, start, end);
+        const to = this.lowerBound(tokens, prefix + '\uffff', from, end);
+        if (from === to) return empty;
+
+        const df = this.suggestions.df || [];
+        const positions = [];
+        for (let position = from; position < to; position++) positions.push(position);
+        positions.sort((a, b) => (df[b] || 0) - (df[a] || 0) || (tokens[a] < tokens[b] ? -1 : 1));
+        const narrowed = positions.map(position => tokens[position]);
+
+        return {
+            completions: narrowed.slice(0, topK),
+            episodes: this.rankSuggestedEpisodes(narrowed, topK)
+        };
+    }
+
+    /**
+     * Autocomplete after fetching the posting shard a long prefix needs,
+     * so its episode suggestions are available with a sharded index
+     */
+    async suggestAsync(text) {
+        const words = (text || '').toLowerCase().match(/[\w-]+/g);
+        if (words && this.suggestions && Array.from(words[words.length - 1]).length > this.suggestions.max_prefix) {
+            await this.loadShardsFor([words[words.length - 1]]);
+        }
+        return this.suggest(text);
+    }
+
+    /**
+     * First position in tokens[lo, hi) whose token is >= value
+     */
+    lowerBound(tokens, value, lo, hi) {
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (tokens[mid] < value) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    /**
+     * Top episodes by number of matching tokens, from the loaded postings.
+     * Empty until the postings of every token are loaded (a sharded index
+     * fetches them in suggestAsync()), rather than stale shorter-prefix ones.
+     */
+    rankSuggestedEpisodes(tokens, topK) {
+        if (!this.searchIndex || !tokens.every(token => token in this.index)) return [];
+
+        const hits = new Map();
+        for (const token of tokens) {
+            this.getPostings(token).forEach(id => hits.set(id, (hits.get(id) || 0) + 1));
+        }
+        return Array.from(hits.keys())
+            .sort((a, b) => hits.get(b) - hits.get(a) || (a < b ? -1 : a > b ? 1 : 0))
+            .slice(0, topK)
+            .map(id => ({ id: id, title: (this.getEpisodeById(id) || {}).title }));
+    }
+
+    /**
+     * Load the positional transcript index manifest (built with --transcripts)
+     */
+    async loadTranscriptIndex(manifestPath = 'transcript-index/manifest.json') {
+        if (this.transcripts) return true;
+
+        try {
+            const response = await fetch(manifestPath);
+            const manifest = await response.json();
+            this.transcripts = {
+                manifest: manifest,
+                base: manifestPath.substring(0, manifestPath.lastIndexOf('/') + 1),
+                loaded: new Map(),
+                data: { postings: {} }
+            };
+            return true;
+        } catch (error) {
+            console.error('Failed to load transcript index:', error);
+            return false;
+        }
+    }
+
+    /**
+     * Get absolute token positions per episode from a transcript posting list
+     *
+     * @returns {Map} episode id -> sorted positions
+     */
+    getTranscriptPositions(token) {
+        const postings = this.transcripts.data.postings[token] || [];
+        const positions = new Map();
+        for (const posting of postings) {
+            const absolute = [];
+            let position = 0;
+            for (let i = 1; i < posting.length; i++) {
+                position += posting[i];
+                absolute.push(position);
+            }
+            positions.set(posting[0], absolute);
+        }
+        return positions;
+    }
+
+    /**
+     * Find episodes whose transcript contains the phrase (tokens at consecutive positions)
+     *
+     * @param {string} phrase - Phrase to search for
+     * @param {Object} options - Search options
+     * @param {number} options.limit - Max results to return (default: 50)
+     * @returns {Array} Matching episodes with `matchCount` = phrase occurrences
+     */
+    async searchTranscripts(phrase, options = {}) {
+        const { limit = 50 } = options;
+        if (!this.transcripts) {
+            console.warn('Transcript index not loaded');
+            return [];
+        }
+
+        const phraseTokens = this.tokenize(phrase);
+        if (phraseTokens.length === 0) return [];
+
+        const { manifest, base, loaded, data } = this.transcripts;
+        await this.loadShards(manifest.shards, base, loaded, data, phraseTokens);
+
+        const tokenPositions = phraseTokens.map(token => this.getTranscriptPositions(token));
+
+        // Walk the first token's episodes and check the others at the following positions
+        const [first, ...rest] = tokenPositions;
+        const results = [];
+        for (const [epId, starts] of first) {
+            if (!rest.every(positions => positions.has(epId))) continue;
+
+            const following = rest.map(positions => new Set(positions.get(epId)));
+            let matchCount = 0;
+            for (const start of starts) {
+                if (following.every((set, i) => set.has(start + i + 1))) matchCount++;
+            }
+            if (matchCount === 0) continue;
+
+            const episode = this.getEpisodeById(epId);
+            results.push({
+                ...(episode || { id: epId }),
+                score: matchCount,
+                matchCount: matchCount
+            });
+        }
+
+        results.sort((a, b) => b.score - a.score);
+        return results.slice(0, limit);
+    }
+
+    /**
+     * Search after making sure the shards for the query tokens are loaded.
+     * Works for both single-file and sharded indexes.
+     */
+    async searchAsync(query, options = {}) {
+        await this.loadShardsFor(this.tokenize(query));
+        return this.search(query, options);
+    }
+
+    /**
+     * Get the episode ids posted for a token, decoding compact lists on first use
+     */
+    getPostings(token) {
+        const postings = this.index[token];
+        if (!postings) return [];
+        if (this.encoding !== 'delta-varint-base64') return postings;
+
+        let decoded = this.decodedPostings.get(token);
+        if (!decoded) {
+            decoded = this.decodeRows(postings).map(row => this.episodes[row].id);
+            this.decodedPostings.set(token, decoded);
+        }
+        return decoded;
+    }
+
+    /**
+     * Decode a base64 string of delta-coded LEB128 varints into row numbers
+     */
+    decodeRows(encoded) {
+        const bytes = atob(encoded);
+        const rows = [];
+        let value = 0, shift = 0, previous = 0;
+        for (let i = 0; i < bytes.length; i++) {
+            const byte = bytes.charCodeAt(i);
+            value |= (byte & 0x7f) << shift;
+            if (byte & 0x80) {
+                shift += 7;
+                continue;
+            }
+            previous += value;
+            rows.push(previous);
+            value = 0;
+            shift = 0;
+        }
+        return rows;
+    }
+
     /**
      * Tokenize search query (same logic as Python indexer)
      */
@@ -56,6 +420,8 @@ class EpisodeSearch {
      * @param {string} options.subcategory - Filter by industry subcategory
      * @param {number} options.limit - Max results to return (default: 50)
      * @returns {Array} Array of matching episodes with scores
+     * @throws {Error} If the index is sharded and the query needs shards
+     *     that are not loaded yet (use searchAsync())
      */
     search(query, options = {}) {
         if (!this.searchIndex) {
@@ -63,6 +429,11 @@ class EpisodeSearch {
             return [];
         }
 
+        const missing = this.missingShards(this.tokenize(query));
+        if (missing.length > 0) {
+            throw new Error(`Search shards not loaded: ${missing.join(', ')} (use searchAsync())`);
+        }
+
         const {
             industry = null,
             subcategory = null,
@@ -79,19 +450,27 @@ class EpisodeSearch {
 
         // Find matching episode IDs for each token
         const matchingEpisodeIds = new Map(); // episode_id -> match_count
+        const bm25Scores = this.bm25 ? new Map() : null; // episode_id -> BM25F score
 
         for (const token of queryTokens) {
-            const episodeIds = this.index[token] || [];
-            for (const epId of episodeIds) {
+            const episodeIds = this.getPostings(token);
+            const termFreqs = bm25Scores ? (this.searchIndex.tf[token] || []) : null;
+            const idf = bm25Scores ? (this.searchIndex.idf[token] || 0) : 0;
+
+            episodeIds.forEach((epId, i) => {
                 matchingEpisodeIds.set(epId, (matchingEpisodeIds.get(epId) || 0) + 1);
-            }
+                if (bm25Scores) {
+                    const termScore = this.bm25TermScore(epId, termFreqs[i] || [], idf);
+                    bm25Scores.set(epId, (bm25Scores.get(epId) || 0) + termScore);
+                }
+            });
         }
 
         // Get full episode objects and calculate scores
         let results = [];
 
         for (const [epId, matchCount] of matchingEpisodeIds) {
-            const episode = this.episodes.find(ep => ep.id === epId);
+            const episode = this.getEpisodeById(epId);
             if (!episode) continue;
 
             // Apply filters
@@ -99,7 +478,9 @@ class EpisodeSearch {
             if (subcategory && !this.matchesSubcategory(episode, subcategory)) continue;
 
             // Calculate relevance score
-            const score = this.calculateScore(episode, queryTokens, matchCount);
+            const score = bm25Scores
+                ? bm25Scores.get(epId)
+                : this.calculateScore(episode, queryTokens, matchCount);
 
             results.push({
                 ...episode,
@@ -110,7 +491,7 @@ class EpisodeSearch {
 
         // If filters but no query, include all episodes matching filters
         if (queryTokens.length === 0 && (industry || subcategory)) {
-            for (const episode of this.episodes) {
+            for (const episode of this.filterCandidates(industry, subcategory)) {
                 if (industry && !this.matchesIndustry(episode, industry)) continue;
                 if (subcategory && !this.matchesSubcategory(episode, subcategory)) continue;
 
@@ -154,21 +535,146 @@ class EpisodeSearch {
         }
 
         // Boost for tag matches
-        const tagsLower = episode.tags.map(t => t.toLowerCase());
-        for (const token of queryTokens) {
-            if (tagsLower.some(tag => tag.includes(token))) {
-                score += 10;
+        const synonyms = this.searchIndex.tag_synonyms;
+        if (this.searchIndex.tag_matches) {
+            // Sharded index: query token -> episodes with a matching tag
+            for (const token of queryTokens) {
+                if (this.getTagMatchSet(token).has(episode.id)) {
+                    score += 10;
+                }
+            }
+        } else if (synonyms) {
+            // Index-time synonym table: query token -> canonical tags
+            const tagSet = this.getTagSet(episode);
+            for (const token of queryTokens) {
+                const canonicalTags = synonyms[token];
+                if (canonicalTags && canonicalTags.some(tag => tagSet.has(tag))) {
+                    score += 10;
+                }
+            }
+        } else {
+            const tagsLower = episode.tags.map(t => t.toLowerCase());
+            for (const token of queryTokens) {
+                if (tagsLower.some(tag => tag.includes(token))) {
+                    score += 10;
+                }
             }
         }
 
         return score;
     }
 
+    /**
+     * Set of an episode's (normalized) tags, built once per episode
+     */
+    getTagSet(episode) {
+        let tagSet = this.tagSets.get(episode.id);
+        if (!tagSet) {
+            tagSet = new Set(episode.tags);
+            this.tagSets.set(episode.id, tagSet);
+        }
+        return tagSet;
+    }
+
+    /**
+     * Set of episode ids whose tags match a query token (sharded index)
+     */
+    getTagMatchSet(token) {
+        let ids = this.tagMatchSets.get(token);
+        if (!ids) {
+            ids = new Set(this.searchIndex.tag_matches[token] || []);
+            this.tagMatchSets.set(token, ids);
+        }
+        return ids;
+    }
+
+    /**
+     * BM25F contribution of one query token to one episode
+     *
+     * @param {number} epId - Episode id
+     * @param {Array} termFreqs - Flat [field, tf, field, tf, ...] list from the index
+     * @param {number} idf - Precomputed idf of the token
+     */
+    bm25TermScore(epId, termFreqs, idf) {
+        const { field_weights: weights, k1, b, doc_lengths: docLengths, avg_lengths: avgLengths } = this.bm25;
+        const lengths = docLengths[this.rowOf.get(epId)];
+
+        let weightedTf = 0;
+        for (let i = 0; i < termFreqs.length; i += 2) {
+            const field = termFreqs[i];
+            const avg = avgLengths[field] || 1;
+            const norm = 1 - b + b * (lengths[field] / avg);
+            weightedTf += weights[field] * termFreqs[i + 1] / norm;
+        }
+
+        return idf * weightedTf / (k1 + weightedTf);
+    }
+
+    /**
+     * Episode ids matching a facet value (case-insensitive), plus episodes
+     * without a value for the field. Returns null if the index has no facets.
+     */
+    getFacetSet(field, value) {
+        const facet = (this.searchIndex.facets || {})[field];
+        if (!facet) return null;
+
+        const wanted = value.toLowerCase();
+        const cacheKey = `${field}:${wanted}`;
+        let ids = this.facetSets.get(cacheKey);
+        if (!ids) {
+            ids = new Set(facet.missing);
+            for (const [facetValue, facetIds] of Object.entries(facet.values)) {
+                if (facetValue.toLowerCase() === wanted) {
+                    facetIds.forEach(id => ids.add(id));
+                }
+            }
+            this.facetSets.set(cacheKey, ids);
+        }
+        return ids;
+    }
+
+    /**
+     * Episodes that can pass the given filters, in index order. Uses the
+     * smallest facet id list instead of walking every episode.
+     */
+    filterCandidates(industry, subcategory) {
+        const sets = [];
+        if (industry) sets.push(this.getFacetSet('industry_category', industry));
+        if (subcategory) sets.push(this.getFacetSet('industry_subcategory', subcategory));
+        if (sets.length === 0 || sets.includes(null)) return this.episodes;
+
+        const smallest = sets.reduce((a, b) => (b.size < a.size ? b : a));
+        return Array.from(smallest)
+            .map(id => this.rowOf.get(id))
+            .filter(row => row !== undefined)
+            .sort((a, b) => a - b)
+            .map(row => this.episodes[row]);
+    }
+
+    /**
+     * Number of episodes per facet value, without scanning episodes
+     *
+     * @param {string} field - 'industry_category' or 'industry_subcategory'
+     * @returns {Object|null} value -> count, or null if the index has no facets
+     */
+    getFacetCounts(field) {
+        const facet = (this.searchIndex && this.searchIndex.facets || {})[field];
+        if (!facet) return null;
+
+        const counts = {};
+        for (const [value, ids] of Object.entries(facet.values)) {
+            counts[value] = ids.length;
+        }
+        return counts;
+    }
+
     /**
      * Check if episode matches industry filter
      */
     matchesIndustry(episode, industry) {
         if (!industry || !episode.industry_category) return true;
+        const facetSet = this.getFacetSet('industry_category', industry);
+        if (facetSet) return facetSet.has(episode.id);
         const categories = episode.industry_category.split(',').map(c => c.trim().toLowerCase());
         return categories.includes(industry.toLowerCase());
     }
@@ -178,6 +684,8 @@ class EpisodeSearch {
      */
     matchesSubcategory(episode, subcategory) {
         if (!subcategory || !episode.industry_subcategory) return true;
+        const facetSet = this.getFacetSet('industry_subcategory', subcategory);
+        if (facetSet) return facetSet.has(episode.id);
         const subcategories = episode.industry_subcategory.split(',').map(s => s.trim().toLowerCase());
         return subcategories.includes(subcategory.toLowerCase());
     }
@@ -200,7 +708,8 @@ class EpisodeSearch {
      * Get episode by ID
      */
     getEpisodeById(id) {
-        return this.episodes.find(ep => ep.id === id);
+        const row = this.rowOf.get(id);
+        return row === undefined ? undefined : this.episodes[row];
     }
 
     /**
@@ -210,7 +719,9 @@ class EpisodeSearch {
         if (!this.searchIndex) return null;
         return {
             totalEpisodes: this.episodes.length,
-            totalTokens: Object.keys(this.index).length,
+            totalTokens: this.shards
+                ? this.searchIndex.metadata.total_tokens
+                : Object.keys(this.index).length,
             industries: this.filters.industries.length,
             subcategories: this.filters.subcategories.length
         };
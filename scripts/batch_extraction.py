@@ -0,0 +1,202 @@
+"""
+Batch submission mode for metadata extraction
+
+Instead of one synchronous LLM call per episode, all pending transcripts are
+submitted as a single Message Batches job, polled until it ends, and the
+results are merged back per episode. Batches trade latency (minutes to
+hours) for throughput and cost (batch requests are billed at half price).
+
+The extractor decides what is sent and how replies are read; batch mode
+needs two methods on it besides process_episode_folder():
+
+    build_request(folder_name, transcript_text, thumbnail_path) -> Messages API params
+    parse_response(folder_name, message) -> metadata dict (or None)
+
+The endpoint is configurable (ANTHROPIC_BASE_URL), so fake_batch_server.py
+can stand in for the real API in tests.
+"""
+
+import json
+import os
+import re
+import time
+import urllib.error
+import urllib.request
+
+from extraction_cache import PROMPT_VERSION, cache_key
+from request_executor import run_request
+
+ANTHROPIC_API_URL = os.getenv('ANTHROPIC_BASE_URL', 'https://api.anthropic.com')
+ANTHROPIC_VERSION = '2023-06-01'
+
+BATCH_POLL_INTERVAL = 30  # seconds between status checks
+BATCH_TIMEOUT = 24 * 60 * 60  # batches expire after 24 hours
+
+# Batch requests are billed at 50% of the synchronous price
+BATCH_DISCOUNT = 0.5
+
+class BatchError(Exception):
+    """The batch could not be submitted, polled or read"""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status  # HTTP status, so request_executor can tell transient errors apart
+        self.retry_after = retry_after
+
+class MessageBatchClient:
+    """
+    Minimal client for the Message Batches API (create, retrieve, results)
+
+    Args:
+        executor: Optional RequestExecutor; 429/5xx responses of retrieve()
+            and results() are retried. create() is sent exactly once: a
+            retried POST whose first attempt reached the server would
+            submit (and bill) a second batch
+    """
+
+    def __init__(self, api_key, base_url=ANTHROPIC_API_URL, timeout=60, executor=None):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.executor = executor
+
+    def _request(self, method, url, body=None):
+        return run_request(self.executor, self._send, method, url, body)
+
+    def _send(self, method, url, body=None):
+        headers = {
+            'x-api-key': self.api_key,
+            'anthropic-version': ANTHROPIC_VERSION,
+        }
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['content-type'] = 'application/json'
+
+        request = urllib.request.Request(url, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            raise BatchError(f"{method} {url} failed: HTTP {e.code} {e.read().decode('utf-8', 'ignore')[:200]}",
+                             status=e.code, retry_after=e.headers.get('retry-after'))
+        except urllib.error.URLError as e:
+            # Connection problems are transient: report them like a 503
+            raise BatchError(f"{method} {url} failed: {e.reason}", status=503)
+
+    def create(self, requests):
+        """Submit [{'custom_id', 'params'}, ...]; returns the batch object"""
+        # Not idempotent: bypasses the executor's retries
+        return json.loads(self._send('POST', f"{self.base_url}/v1/messages/batches", {'requests': requests}))
+
+    def retrieve(self, batch_id):
+        return json.loads(self._request('GET', f"{self.base_url}/v1/messages/batches/{batch_id}"))
+
+    def results(self, batch):
+        """Yield the result lines of an ended batch"""
+        if not batch.get('results_url'):
+            raise BatchError(f"Batch {batch['id']} has no results_url")
+        for line in self._request('GET', batch['results_url']).decode('utf-8').splitlines():
+            if line.strip():
+                yield json.loads(line)
+
+    def wait(self, batch_id, poll_interval=BATCH_POLL_INTERVAL, timeout=BATCH_TIMEOUT):
+        """Poll until the batch has ended; returns the final batch object"""
+        deadline = time.monotonic() + timeout
+        while True:
+            batch = self.retrieve(batch_id)
+            if batch.get('processing_status') == 'ended':
+                return batch
+            if time.monotonic() > deadline:
+                raise BatchError(f"Batch {batch_id} still {batch.get('processing_status')} after {timeout}s")
+
+            counts = batch.get('request_counts', {})
+            print(f"  ⏳ {batch_id}: {counts.get('processing', '?')} processing, "
+                  f"{counts.get('succeeded', 0)} succeeded, {counts.get('errored', 0)} errored")
+            time.sleep(poll_interval)
+
+def custom_id_for(index, episode_number):
+    """Batch custom_id (must match [a-zA-Z0-9_-]{1,64})"""
+    return f"ep{index:04d}-{re.sub(r'[^a-zA-Z0-9_-]', '_', str(episode_number))}"[:64]
+
+def extract_in_batch(items, extractor, client, cache=None,
+                     poll_interval=BATCH_POLL_INTERVAL, timeout=BATCH_TIMEOUT, timer=None):
+    """
+    Extract metadata for many episodes with one batch job
+
+    Args:
+        items: List of dicts with 'folder_name', 'episode_number',
+            'transcript' and 'thumbnail_path' (see prepare_episode())
+        extractor: Object with build_request() and parse_response()
+        client: MessageBatchClient (or a client for a stand-in server)
+        cache: Optional ExtractionCache; cached episodes are not submitted
+            and new results are stored
+        poll_interval: Seconds between status checks
+        timeout: Give up after this many seconds
+        timer: Optional StageTimer; token usage of the results is added to it
+
+    Returns:
+        List of (metadata or None, error message or None), aligned with items
+    """
+    if not hasattr(extractor, 'build_request') or not hasattr(extractor, 'parse_response'):
+        raise BatchError("Batch mode needs EpisodeExtractor.build_request() and parse_response()")
+
+    model = getattr(extractor, 'model', None)
+    prompt_version = getattr(extractor, 'prompt_version', PROMPT_VERSION)
+
+    results = [None] * len(items)
+    keys = [None] * len(items)
+    requests = []
+    index_of = {}
+
+    for i, item in enumerate(items):
+        if cache is not None:
+            keys[i] = cache_key(item['folder_name'], item['transcript'], item['thumbnail_path'], model, prompt_version)
+            metadata = cache.get(keys[i])
+            if metadata is not None:
+                results[i] = (metadata, None)
+                continue
+
+        custom_id = custom_id_for(i, item['episode_number'])
+        index_of[custom_id] = i
+        requests.append({
+            'custom_id': custom_id,
+            'params': extractor.build_request(
+                folder_name=item['folder_name'],
+                transcript_text=item['transcript'],
+                thumbnail_path=item['thumbnail_path']
+            ),
+        })
+
+    if requests:
+        batch = client.create(requests)
+        print(f"  📦 Submitted batch {batch['id']} ({len(requests)} requests, "
+              f"{len(items) - len(requests)} answered from cache)")
+        batch = client.wait(batch['id'], poll_interval, timeout)
+
+        for line in client.results(batch):
+            i = index_of.get(line.get('custom_id'))
+            if i is None:
+                continue
+
+            result = line.get('result', {})
+            if result.get('type') != 'succeeded':
+                error = result.get('error', {})
+                message = error.get('error', error).get('message') if isinstance(error, dict) else error
+                results[i] = (None, f"{result.get('type', 'unknown')}: {message or 'no details'}")
+                continue
+
+            if timer is not None:
+                timer.add_tokens(result['message'].get('usage'))
+
+            try:
+                metadata = extractor.parse_response(folder_name=items[i]['folder_name'], message=result['message'])
+            except Exception as e:
+                results[i] = (None, f"unparseable response: {str(e)}")
+                continue
+
+            results[i] = (metadata, None if metadata else "empty metadata")
+            if metadata and cache is not None:
+                cache.put(keys[i], metadata)
+
+    return [result or (None, "missing from batch results") for result in results]
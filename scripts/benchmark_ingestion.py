@@ -0,0 +1,183 @@
+"""
+Offline throughput benchmark for the Drive ingestion pipeline
+
+Generates synthetic episode corpora, serves them through LocalDriveBackend
+(with injected per-request latency standing in for Drive round trips) and
+runs process_batch_from_drive() with a simulated extractor, for every
+combination of corpus size and worker count. Reports episodes per minute
+and the p95 of the slowest stages, read from each run's stage trace.
+
+No Google credentials, API key or network access are needed.
+
+Usage:
+    python3 benchmark_ingestion.py
+    python3 benchmark_ingestion.py --sizes 20,100 --workers 1,4,8
+    python3 benchmark_ingestion.py --drive-latency 0.1 --extract-latency 2 --rps 10
+    python3 benchmark_ingestion.py --json benchmark_results.json
+"""
+
+import contextlib
+import io
+import json
+import os
+import random
+import tempfile
+import time
+
+from drive_backend import LocalDriveBackend
+from google_drive_batch_with_thumbnails import process_batch_from_drive, trace_path_for
+
+DEFAULT_SIZES = [20, 100]
+DEFAULT_WORKER_COUNTS = [1, 2, 4, 8]
+
+DEFAULT_DRIVE_LATENCY = 0.05  # seconds per Drive request
+DEFAULT_EXTRACT_LATENCY = 1.0  # seconds per extraction (scaled down from ~30s)
+DEFAULT_RPS = 1000.0  # effectively unthrottled; lower it to see the rate limit bite
+
+TRANSCRIPT_WORDS = 8000  # ~50 minute episode
+THUMBNAIL_BYTES = 200 * 1024
+
+WORDS = ('business revenue customers growth hiring team marketing sales pricing margin '
+         'acquisition franchise cash flow profit owner operator lessons story market').split()
+
+def generate_corpus(root, episodes, transcript_words=TRANSCRIPT_WORDS, thumbnail_bytes=THUMBNAIL_BYTES, seed=0):
+    """
+    Write a Drive-like corpus: one folder per episode with a Google Doc
+    transcript and a thumbnail (every third one in an 'art' subfolder)
+    """
+    rng = random.Random(seed)
+    for number in range(1, episodes + 1):
+        folder = os.path.join(root, f"{number:02d} - Guest {number}")
+        os.makedirs(folder, exist_ok=True)
+
+        with open(os.path.join(folder, f"Transcript {number}.gdoc"), 'w', encoding='utf-8') as f:
+            lines = []
+            for turn in range(0, transcript_words, 40):
+                speaker = 'Host' if (turn // 40) % 2 == 0 else f"Guest {number}"
+                lines.append(f"{speaker}: " + ' '.join(rng.choice(WORDS) for _ in range(40)))
+            f.write('\n'.join(lines))
+
+        thumbnail_folder = os.path.join(folder, 'art') if number % 3 == 0 else folder
+        os.makedirs(thumbnail_folder, exist_ok=True)
+        with open(os.path.join(thumbnail_folder, 'thumbnail.jpg'), 'wb') as f:
+            f.write(rng.randbytes(thumbnail_bytes))
+
+class SimulatedExtractor:
+    """Stands in for EpisodeExtractor: waits `latency` seconds per call and reports token usage"""
+
+    def __init__(self, latency=DEFAULT_EXTRACT_LATENCY):
+        self.latency = latency
+        self.usage = {'input_tokens': 0, 'output_tokens': 0}
+
+    def process_episode_folder(self, folder_name, transcript_text, thumbnail_path=None):
+        time.sleep(self.latency)
+        self.usage['input_tokens'] += len(transcript_text) // 4
+        self.usage['output_tokens'] += 800
+
+        episode_number = folder_name.split(' - ')[0].strip()
+        return {
+            'Episode #': episode_number,
+            'Episode Title': folder_name,
+            'Guest Name': folder_name.split(' - ', 1)[-1],
+            'Episode Summary': f"Simulated summary of {folder_name} for the ingestion benchmark.",
+            'Topics': 'Growth, Hiring',
+            'Tags': 'growth, hiring',
+            'Key Takeaways': '1. Simulated takeaway',
+        }
+
+def run_once(corpus_dir, episodes, workers, drive_latency, extract_latency, requests_per_second):
+    """
+    One ingestion run into a scratch directory
+
+    Returns:
+        Result dict (episodes, seconds, episodes_per_minute, stage p95s, request counts)
+    """
+    backend = LocalDriveBackend(corpus_dir, latency=drive_latency)
+
+    with tempfile.TemporaryDirectory(prefix='ingest-bench-') as work_dir:
+        output_file = os.path.join(work_dir, 'episodes.json')
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_batch_from_drive(
+                episodes, output_file,
+                workers=workers,
+                requests_per_second=requests_per_second,
+                use_cache=False,
+                optimize=False,
+                transcript_store_dir=None,
+                extraction_cache_dir=None,
+                backend=backend,
+                extractor_factory=lambda api_key: SimulatedExtractor(extract_latency),
+                thumbnails_dir=os.path.join(work_dir, 'thumbnails')
+            )
+
+        with open(trace_path_for(output_file), 'r', encoding='utf-8') as f:
+            trace = json.load(f)['otherData']
+        with open(output_file, 'r', encoding='utf-8') as f:
+            processed = len(json.load(f))
+
+    seconds = trace['elapsed_seconds']
+    return {
+        'corpus': episodes,
+        'workers': workers,
+        'episodes': processed,
+        'seconds': round(seconds, 3),
+        'episodes_per_minute': round(processed / seconds * 60, 1) if seconds else 0.0,
+        'p95': {stage: round(stats['p95'], 4) for stage, stats in trace['stages'].items()},
+        'requests': dict(backend.calls),
+    }
+
+def benchmark(sizes=DEFAULT_SIZES, worker_counts=DEFAULT_WORKER_COUNTS, drive_latency=DEFAULT_DRIVE_LATENCY,
+              extract_latency=DEFAULT_EXTRACT_LATENCY, requests_per_second=DEFAULT_RPS):
+    """Run every (corpus size, workers) combination; returns the list of results"""
+    print("\n" + "="*80)
+    print("INGESTION THROUGHPUT BENCHMARK")
+    print("="*80)
+    print(f"Drive latency: {drive_latency * 1000:.0f} ms/request  |  Extraction: {extract_latency:g} s/episode  |  "
+          f"Rate limit: {requests_per_second:g} requests/s\n")
+
+    print(f"{'corpus':>7}{'workers':>9}{'episodes':>10}{'seconds':>10}{'eps/min':>10}{'speedup':>9}"
+          f"{'export p95':>12}{'extract p95':>13}")
+
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix='ingest-corpus-') as corpus_dir:
+            generate_corpus(corpus_dir, size)
+            baseline = None
+            for workers in worker_counts:
+                result = run_once(corpus_dir, size, workers, drive_latency, extract_latency, requests_per_second)
+                results.append(result)
+
+                baseline = baseline or result['episodes_per_minute']
+                speedup = result['episodes_per_minute'] / baseline if baseline else 0
+                print(f"{size:>7}{workers:>9}{result['episodes']:>10}{result['seconds']:>10.1f}"
+                      f"{result['episodes_per_minute']:>10.1f}{speedup:>8.1f}x"
+                      f"{result['p95'].get('transcript export', 0):>12.3f}"
+                      f"{result['p95'].get('extraction', 0):>13.3f}")
+
+    print()
+    return results
+
+if __name__ == '__main__':
+    import sys
+
+    args = sys.argv[1:]
+
+    def option(name, default, parse):
+        return parse(args[args.index(name) + 1]) if name in args else default
+
+    def int_list(value):
+        return [int(item) for item in value.split(',')]
+
+    results = benchmark(
+        sizes=option('--sizes', DEFAULT_SIZES, int_list),
+        worker_counts=option('--workers', DEFAULT_WORKER_COUNTS, int_list),
+        drive_latency=option('--drive-latency', DEFAULT_DRIVE_LATENCY, float),
+        extract_latency=option('--extract-latency', DEFAULT_EXTRACT_LATENCY, float),
+        requests_per_second=option('--rps', DEFAULT_RPS, float),
+    )
+
+    if '--json' in args:
+        json_file = args[args.index('--json') + 1]
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Results: {json_file}")
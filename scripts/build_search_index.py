@@ -3,10 +3,108 @@ Build optimized search index for client-side episode search.
 
 This creates a lightweight JSON file that enables fast, instant search
 across episode metadata without needing a backend.
+
+Usage:
+    python3 build_search_index.py                  # Full rebuild
+    python3 build_search_index.py --incremental    # Only re-index changed episodes
+    python3 build_search_index.py --shards         # Also emit lazily loaded shards
+    python3 build_search_index.py --compact        # Also emit delta/varint-coded postings
+    python3 build_search_index.py --bm25           # Include BM25 term statistics
+    python3 build_search_index.py --transcripts    # Also build the positional transcript index
+    python3 build_search_index.py --suggest        # Also emit the autocomplete index
+    python3 build_search_index.py --workers 8      # Tokenize in 8 worker processes
 """
+import base64
+import hashlib
+import heapq
 import json
+import math
+import multiprocessing
+import os
 import re
+import tempfile
 from collections import defaultdict
+from functools import partial
+from pathlib import Path
+
+import cleanup_tags
+from cleanup_tags import TAG_MAPPINGS, normalize_tag
+from optimize_thumbnails import OPTIMIZED_URL, THUMBNAIL_MANIFEST, thumbnail_entry
+from transcript_store import TRANSCRIPT_STORE_DIR, TranscriptStore
+
+# Bump when tokenization or the index layout changes so that
+# incremental builds fall back to a full rebuild.
+INDEX_VERSION = '1.2'
+
+# Sharded output: token-keyed sections are split into posting shards by
+# token prefix, everything else goes into the small manifest
+SHARD_DIR = 'search-index'
+SHARD_PREFIX_LENGTH = 1
+SHARDED_SECTIONS = ['index', 'tf', 'idf']
+# Episode fields loaded up front (cards and filters); the other fields are
+# only needed in the episode modal and are fetched in chunks of rows.
+# Every field episodes.js reads outside the modal must be listed here.
+CARD_FIELDS = ['id', 'title', 'guest', 'summary', 'date', 'duration', 'youtube',
+               'industry_category', 'industry_subcategory', 'thumbnail']
+# Card fields shortened to an excerpt up front; the details chunks carry them in full
+CARD_EXCERPTS = {'summary': 160}
+DETAIL_CHUNK_SIZE = 25
+
+# Compact encoding: posting lists hold episode *rows* (positions in the
+# episodes array), delta-coded as LEB128 varints and base64 encoded
+COMPACT_ENCODING = 'delta-varint-base64'
+
+# Transcript index: positional postings over the full transcripts, kept in
+# a separate sharded index so the metadata search never has to load it
+TRANSCRIPTS_DIR = '../resources/episodes/transcripts'
+TRANSCRIPT_INDEX_DIR = 'transcript-index'
+TRANSCRIPT_SHARD_PREFIX_LENGTH = 2
+# Max positions buffered in memory before a sorted run is spilled to disk
+TRANSCRIPT_MEMORY_BUDGET = 500_000
+
+# Autocomplete: every token prefix up to SUGGEST_MAX_PREFIX characters gets
+# its top completions (and, from SUGGEST_MIN_EPISODE_PREFIX characters on,
+# its top episodes) precomputed. Only tokens in at least SUGGEST_MIN_DF
+# episodes are suggested, which keeps the file well below the index's eager
+# payload it is loaded before
+SUGGEST_MAX_PREFIX = 2
+SUGGEST_MIN_EPISODE_PREFIX = 2
+SUGGEST_MIN_DF = 2
+SUGGEST_TOP_K = 5
+
+# Episode row fields with precomputed facet id lists
+FACET_FIELDS = ['industry_category', 'industry_subcategory']
+
+# Source fields that are tokenized into the inverted index
+SEARCHABLE_FIELDS = [
+    'Episode Title',
+    'Episode Summary',
+    'Guest Name',
+    'Business Name',
+    'Topics',
+    'Tags',
+    'Business Activity',
+    'Industry Category',
+    'Industry Subcategory',
+    'Key Takeaways',
+]
+
+# BM25F parameters. Field names/weights follow SEARCHABLE_FIELDS order;
+# the weights mirror the title/guest/tag boosts in episode-search.js.
+BM25_FIELDS = [
+    ('title', 3.0),
+    ('summary', 1.0),
+    ('guest', 2.5),
+    ('business_name', 1.5),
+    ('topics', 1.5),
+    ('tags', 2.0),
+    ('business_activity', 1.0),
+    ('industry_category', 1.0),
+    ('industry_subcategory', 1.0),
+    ('takeaways', 1.0),
+]
+BM25_K1 = 1.2
+BM25_B = 0.75
 
 def tokenize(text):
     """Convert text to searchable tokens"""
@@ -19,133 +117,1158 @@ def tokenize(text):
     tokens = re.findall(r'\b[\w-]+\b', text)
     return [t for t in tokens if len(t) > 2]  # Filter out 1-2 char tokens
 
-def build_search_index():
-    """Build search index from episodes_final.json"""
+def hashes_path_for(output_file):
+    """Path of the per-episode hash manifest kept next to the index"""
+    base, _ = os.path.splitext(output_file)
+    return f"{base}.hashes.json"
 
-    print("\n" + "="*80)
-    print("BUILDING SEARCH INDEX")
-    print("="*80 + "\n")
+def episode_hash(ep):
+    """Content hash of a source episode record"""
+    payload = json.dumps(ep, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{INDEX_VERSION}:{payload}".encode('utf-8')).hexdigest()
 
-    # Load episodes
-    with open('episodes_final.json', 'r', encoding='utf-8') as f:
-        episodes = json.load(f)
+def tag_rules_digest():
+    """
+    Digest of the compiled tag mapping table
 
-    print(f"✓ Loaded {len(episodes)} episodes")
+    Recorded with the build options: index_episode() output depends on the
+    mappings, so editing TAG_MAPPINGS must force a full rebuild.
+    """
+    payload = json.dumps(cleanup_tags.TAG_TABLE, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-    # Build inverted index: token -> [episode_ids]
-    inverted_index = defaultdict(set)
+def normalize_tags(raw_tags):
+    """Apply the cleanup_tags normalization rules, dropping deleted tags and duplicates"""
+    tags = []
+    for tag in raw_tags:
+        normalized = normalize_tag(tag)
+        if normalized and normalized not in tags:
+            tags.append(normalized)
+    return tags
 
-    # Build searchable episodes
-    searchable_episodes = []
+def index_episode(ep):
+    """
+    Tokenize a single episode
 
-    for ep in episodes:
-        ep_num = ep.get('Episode #')
-        if not ep_num:
-            continue
+    Tags are normalized with cleanup_tags.normalize_tag() first, so the
+    index only ever contains canonical tags.
 
-        # Collect searchable text from key fields
-        searchable_fields = [
-            ep.get('Episode Title', ''),
-            ep.get('Episode Summary', ''),
-            ep.get('Guest Name', ''),
-            ep.get('Business Name', ''),
-            ep.get('Topics', ''),
-            ep.get('Tags', ''),
-            ep.get('Business Activity', ''),
-            ep.get('Industry Category', ''),
-            ep.get('Industry Subcategory', ''),
-            ep.get('Key Takeaways', ''),
-        ]
+    Returns:
+        (searchable_ep, field_tokens) where field_tokens holds the token
+        list of each SEARCHABLE_FIELDS entry, in order
+    """
+    ep_num = ep.get('Episode #')
+    tags = normalize_tags(ep.get('Tags', '').split(',') if ep.get('Tags') else [])
 
-        # Combine and tokenize
-        combined_text = ' '.join(str(f) for f in searchable_fields if f)
-        tokens = tokenize(combined_text)
-
-        # Add to inverted index
-        for token in set(tokens):  # Use set to avoid duplicates
-            inverted_index[token].add(ep_num)
-
-        # Create searchable episode object (full version with all display fields)
-        searchable_ep = {
-            'id': ep_num,
-            'title': ep.get('Episode Title', ''),
-            'guest': ep.get('Guest Name', ''),
-            'summary': ep.get('Episode Summary', ''),  # Full summary
-            'date': ep.get('Episode Date', ''),
-            'duration': ep.get('Episode Duration', ''),
-            'business_name': ep.get('Business Name', ''),  # Added
-            'industry_category': ep.get('Industry Category', ''),
-            'industry_subcategory': ep.get('Industry Subcategory', ''),
-            'business_activity': ep.get('Business Activity', ''),
-            'topics': ep.get('Topics', '').split(',') if ep.get('Topics') else [],  # All topics
-            'tags': ep.get('Tags', '').split(',') if ep.get('Tags') else [],  # All tags
-            'Key Takeaways': ep.get('Key Takeaways', ''),  # Added
-            'Revenue': ep.get('Revenue', ''),  # Added
-            'youtube': ep.get('youtube_url', ''),
-            'spotify': ep.get('spotify_url', ''),
-            'apple': ep.get('apple_url', ''),
-        }
+    field_values = {field: ep.get(field) for field in SEARCHABLE_FIELDS}
+    field_values['Tags'] = ', '.join(tags)
 
-        # Clean up topics and tags
-        searchable_ep['topics'] = [t.strip() for t in searchable_ep['topics'] if t.strip()]
-        searchable_ep['tags'] = [t.strip() for t in searchable_ep['tags'] if t.strip()]
+    # Tokenize each searchable field separately so term statistics keep
+    # their field of origin (the union equals tokenizing the combined text)
+    field_tokens = [
+        tokenize(str(field_values[field])) if field_values[field] else []
+        for field in SEARCHABLE_FIELDS
+    ]
 
-        searchable_episodes.append(searchable_ep)
+    # Create searchable episode object (full version with all display fields)
+    searchable_ep = {
+        'id': ep_num,
+        'title': ep.get('Episode Title', ''),
+        'guest': ep.get('Guest Name', ''),
+        'summary': ep.get('Episode Summary', ''),  # Full summary
+        'date': ep.get('Episode Date', ''),
+        'duration': ep.get('Episode Duration', ''),
+        'business_name': ep.get('Business Name', ''),  # Added
+        'industry_category': ep.get('Industry Category', ''),
+        'industry_subcategory': ep.get('Industry Subcategory', ''),
+        'business_activity': ep.get('Business Activity', ''),
+        'topics': ep.get('Topics', '').split(',') if ep.get('Topics') else [],  # All topics
+        'tags': tags,  # All tags (normalized)
+        'Key Takeaways': ep.get('Key Takeaways', ''),  # Added
+        'Revenue': ep.get('Revenue', ''),  # Added
+        'youtube': ep.get('youtube_url', ''),
+        'spotify': ep.get('spotify_url', ''),
+        'apple': ep.get('apple_url', ''),
+    }
 
-    # Convert inverted index sets to lists for JSON serialization
-    inverted_index_json = {
-        token: sorted(list(ep_ids))
-        for token, ep_ids in inverted_index.items()
+    # Clean up topics and tags
+    searchable_ep['topics'] = [t.strip() for t in searchable_ep['topics'] if t.strip()]
+    searchable_ep['tags'] = [t.strip() for t in searchable_ep['tags'] if t.strip()]
+
+    return searchable_ep, field_tokens
+
+def unique_tokens(field_tokens):
+    """Sorted unique tokens across all fields"""
+    return sorted({token for tokens in field_tokens for token in tokens})
+
+def field_term_freqs(field_tokens):
+    """
+    Per-field term frequencies of one episode
+
+    Returns:
+        {token: [field, tf, field, tf, ...]} listing only fields where the
+        token occurs (field = position in BM25_FIELDS)
+    """
+    term_freqs = defaultdict(list)
+    for field, tokens in enumerate(field_tokens):
+        counts = defaultdict(int)
+        for token in tokens:
+            counts[token] += 1
+        for token in sorted(counts):
+            term_freqs[token].extend([field, counts[token]])
+    return term_freqs
+
+def index_chunk(episodes_chunk, bm25=False):
+    """
+    Map step: build a partial index over a chunk of episodes
+
+    Runs in a worker process for parallel builds. The partial postings are
+    unioned by merge_partial_index(); since the final index is sorted, the
+    result does not depend on how episodes were chunked.
+    """
+    partial_index = {
+        'rows': [],
+        'tokens': [],
+        'postings': defaultdict(list),
+        'tf': defaultdict(dict),
+        'doc_lengths': {},
     }
+    for ep in episodes_chunk:
+        ep_num = ep.get('Episode #')
+        searchable_ep, field_tokens = index_episode(ep)
+        tokens = unique_tokens(field_tokens)
+
+        partial_index['rows'].append(searchable_ep)
+        partial_index['tokens'].append(tokens)
+        for token in tokens:
+            partial_index['postings'][token].append(ep_num)
+
+        if bm25:
+            for token, freqs in field_term_freqs(field_tokens).items():
+                partial_index['tf'][token][ep_num] = freqs
+            partial_index['doc_lengths'][ep_num] = [len(field) for field in field_tokens]
+
+    partial_index['postings'] = dict(partial_index['postings'])
+    partial_index['tf'] = dict(partial_index['tf'])
+    return partial_index
+
+def merge_partial_index(partial_index, inverted_index, term_freqs=None, doc_lengths=None):
+    """Reduce step: fold a partial index into the full postings"""
+    for token, ep_ids in partial_index['postings'].items():
+        inverted_index[token].update(ep_ids)
+    if term_freqs is not None:
+        for token, freqs in partial_index['tf'].items():
+            term_freqs[token].update(freqs)
+        doc_lengths.update(partial_index['doc_lengths'])
+
+def map_in_order(func, items, workers=1, window=None):
+    """
+    Yield func(item) for each item, in input order
+
+    With workers > 1 the items are processed by a process pool, at most
+    `window` at a time so results never pile up in memory.
+    """
+    if workers <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    window = window or workers * 4
+    with multiprocessing.Pool(workers) as pool:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= window:
+                yield from pool.map(func, batch)
+                batch = []
+        if batch:
+            yield from pool.map(func, batch)
+
+def chunked(items, chunk_count):
+    """Split a list into at most chunk_count contiguous chunks"""
+    if not items:
+        return []
+    size = math.ceil(len(items) / max(chunk_count, 1))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def bm25_idf(doc_freq, total_docs):
+    """BM25 inverse document frequency (always positive)"""
+    return math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+def tag_terms(tag):
+    """Query tokens that should match a tag: the whole tag and its hyphen parts"""
+    hyphenated = tag.strip().lower().replace(' ', '-')
+    terms = set(tokenize(hyphenated))
+    for token in list(terms):
+        terms.update(part for part in token.split('-') if len(part) > 2)
+    return terms
+
+def build_tag_synonyms(searchable_episodes):
+    """
+    Expanded query term -> canonical tags table
+
+    Covers every canonical tag used in the corpus, its hyphen-separated
+    parts, and every TAG_MAPPINGS variant that normalizes to it, so the
+    client matches tags with one hash lookup per query token instead of
+    substring-scanning each result's tags.
+    """
+    corpus_tags = {tag for ep in searchable_episodes for tag in ep['tags']}
+
+    synonyms = defaultdict(set)
+    for tag in corpus_tags:
+        for term in tag_terms(tag):
+            synonyms[term].add(tag)
+
+    for variant in TAG_MAPPINGS:
+        canonical = normalize_tag(variant)
+        if canonical in corpus_tags:
+            for term in tag_terms(variant):
+                synonyms[term].add(canonical)
 
-    # Get unique values for filters
+    return {term: sorted(synonyms[term]) for term in sorted(synonyms)}
+
+def collect_facets(searchable_episodes):
+    """
+    Sorted episode id lists for every value of each facet field
+
+    'missing' lists episodes without a value; the client filters treat
+    those as matching any value, so they are kept separately.
+    """
+    facets = {}
+    for field in FACET_FIELDS:
+        values = defaultdict(set)
+        missing = []
+        for ep in searchable_episodes:
+            if not ep.get(field):
+                missing.append(ep['id'])
+                continue
+            for value in ep[field].split(','):
+                if value.strip():
+                    values[value.strip()].add(ep['id'])
+
+        facets[field] = {
+            'values': {value: sorted(values[value]) for value in sorted(values)},
+            'missing': sorted(missing)
+        }
+    return facets
+
+def collect_filters(searchable_episodes):
+    """Get unique values for the industry/subcategory filters"""
     all_industries = set()
     all_subcategories = set()
 
-    for ep in episodes:
-        if ep.get('Industry Category') and ep.get('Industry Category') != 'N/A':
+    for ep in searchable_episodes:
+        if ep.get('industry_category') and ep.get('industry_category') != 'N/A':
             # Handle multiple categories (comma-separated)
-            cats = ep.get('Industry Category', '').split(',')
+            cats = ep['industry_category'].split(',')
             all_industries.update(c.strip() for c in cats if c.strip())
 
-        if ep.get('Industry Subcategory') and ep.get('Industry Subcategory') != 'N/A':
+        if ep.get('industry_subcategory') and ep.get('industry_subcategory') != 'N/A':
             # Handle multiple subcategories
-            subcats = ep.get('Industry Subcategory', '').split(',')
+            subcats = ep['industry_subcategory'].split(',')
             all_subcategories.update(s.strip() for s in subcats if s.strip())
 
-    # Build final index
+    return {
+        'industries': sorted(list(all_industries)),
+        'subcategories': sorted(list(all_subcategories))
+    }
+
+def assemble_index(searchable_episodes, inverted_index, term_freqs=None, doc_lengths=None):
+    """
+    Build the final index structure (deterministic key and posting order)
+
+    When term_freqs/doc_lengths are given, BM25 statistics are included:
+        'tf':   token -> per-field frequencies, aligned with index[token]
+        'idf':  token -> BM25 idf
+        'bm25': field names/weights, k1, b, per-row field lengths and averages
+    """
+    # Convert inverted index sets to lists for JSON serialization
+    inverted_index_json = {
+        token: sorted(inverted_index[token])
+        for token in sorted(inverted_index)
+        if inverted_index[token]
+    }
+
     search_index = {
         'episodes': searchable_episodes,
         'index': inverted_index_json,
-        'filters': {
-            'industries': sorted(list(all_industries)),
-            'subcategories': sorted(list(all_subcategories))
-        },
+        'filters': collect_filters(searchable_episodes),
+        'facets': collect_facets(searchable_episodes),
+        'tag_synonyms': build_tag_synonyms(searchable_episodes),
         'metadata': {
             'total_episodes': len(searchable_episodes),
             'total_tokens': len(inverted_index_json),
-            'version': '1.0'
+            'version': INDEX_VERSION
+        }
+    }
+
+    if term_freqs is not None:
+        total_docs = len(searchable_episodes)
+        lengths = [doc_lengths[ep['id']] for ep in searchable_episodes]
+        avg_lengths = [
+            round(sum(row[field] for row in lengths) / max(total_docs, 1), 4)
+            for field in range(len(BM25_FIELDS))
+        ]
+
+        search_index['tf'] = {
+            token: [term_freqs[token][ep_id] for ep_id in ep_ids]
+            for token, ep_ids in inverted_index_json.items()
+        }
+        search_index['idf'] = {
+            token: round(bm25_idf(len(ep_ids), total_docs), 4)
+            for token, ep_ids in inverted_index_json.items()
+        }
+        search_index['bm25'] = {
+            'fields': [name for name, _ in BM25_FIELDS],
+            'field_weights': [weight for _, weight in BM25_FIELDS],
+            'k1': BM25_K1,
+            'b': BM25_B,
+            'doc_lengths': lengths,
+            'avg_lengths': avg_lengths
+        }
+
+    return search_index
+
+def thumbnail_key(value):
+    """Episode number as used in thumbnail file names ('07' and 7 -> '7')"""
+    value = str(value).strip()
+    if value.isdigit():
+        return value.lstrip('0') or '0'
+    return value
+
+def load_thumbnails(manifest_file):
+    """
+    Responsive thumbnail variants from the optimize_thumbnails.py manifest
+
+    Returns:
+        (settings, entries): settings is the index's 'thumbnails' section
+        ({'base_url', 'formats': {format: extension}}) or None if there is
+        no manifest; entries maps thumbnail_key -> thumbnail_entry()
+    """
+    if not manifest_file or not os.path.exists(manifest_file):
+        return None, {}
+
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    settings = {
+        'base_url': manifest.get('base_url', OPTIMIZED_URL),
+        'formats': {fmt: options['extension'] for fmt, options in manifest['formats'].items()},
+    }
+    entries = {
+        thumbnail_key(stem): thumbnail_entry(entry)
+        for stem, entry in manifest.get('images', {}).items()
+    }
+    return settings, entries
+
+def attach_thumbnails(rows, thumbnails):
+    """
+    Set each row's 'thumbnail' from the manifest entries
+
+    Rows reused from a previous build are re-attached too, so incremental
+    builds pick up re-optimized images without re-tokenizing anything.
+    """
+    attached = []
+    for row in rows:
+        thumbnail = thumbnails.get(thumbnail_key(row['id']))
+        if thumbnail or 'thumbnail' in row:
+            row = {key: value for key, value in row.items() if key != 'thumbnail'}
+            if thumbnail:
+                row['thumbnail'] = thumbnail
+        attached.append(row)
+    return attached
+
+def load_previous_build(output_file, options):
+    """
+    Load the previous index and its hash manifest for an incremental build
+
+    Returns:
+        (search_index, hashes) or (None, None) if a full rebuild is required
+    """
+    hashes_file = hashes_path_for(output_file)
+    if not os.path.exists(output_file) or not os.path.exists(hashes_file):
+        return None, None
+
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            search_index = json.load(f)
+        with open(hashes_file, 'r', encoding='utf-8') as f:
+            hashes = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not load previous build: {str(e)}")
+        return None, None
+
+    if hashes.get('version') != INDEX_VERSION:
+        print("⚠️  Index version changed - falling back to full rebuild")
+        return None, None
+
+    if hashes.get('options') != options:
+        print("⚠️  Build options or tag mappings changed - falling back to full rebuild")
+        return None, None
+
+    return search_index, hashes
+
+def encode_varints(numbers):
+    """Delta-code a sorted list of non-negative ints as LEB128 varints"""
+    out = bytearray()
+    previous = 0
+    for number in numbers:
+        delta = number - previous
+        previous = number
+        while delta >= 0x80:
+            out.append((delta & 0x7f) | 0x80)
+            delta >>= 7
+        out.append(delta)
+    return bytes(out)
+
+def decode_varints(data):
+    """Inverse of encode_varints()"""
+    numbers = []
+    value = shift = previous = 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        previous += value
+        numbers.append(previous)
+        value = shift = 0
+    return numbers
+
+def decode_postings(encoded, episodes):
+    """Decode a compact posting list back to episode ids"""
+    return [episodes[row]['id'] for row in decode_varints(base64.b64decode(encoded))]
+
+def encode_compact(search_index):
+    """
+    Re-encode the inverted index with compact posting lists
+
+    Episode ids are mapped to their dense row number in 'episodes', so a
+    posting list becomes a short run of small deltas. Everything else is
+    left as-is.
+    """
+    row_of = {ep['id']: row for row, ep in enumerate(search_index['episodes'])}
+
+    compact_index = {}
+    compact_tf = {}
+    for token, ep_ids in search_index['index'].items():
+        # Posting order switches from episode id to row; keep tf aligned
+        order = sorted(range(len(ep_ids)), key=lambda i: row_of[ep_ids[i]])
+        compact_index[token] = base64.b64encode(
+            encode_varints([row_of[ep_ids[i]] for i in order])
+        ).decode('ascii')
+        if 'tf' in search_index:
+            compact_tf[token] = [search_index['tf'][token][i] for i in order]
+
+    compact = dict(search_index)
+    compact['index'] = compact_index
+    if 'tf' in search_index:
+        compact['tf'] = compact_tf
+    compact['metadata'] = dict(search_index['metadata'], encoding=COMPACT_ENCODING)
+    return compact
+
+def compact_path_for(output_file):
+    """Path of the compact-encoded variant of the index"""
+    base, ext = os.path.splitext(output_file)
+    return f"{base}.compact{ext}"
+
+def json_size(data):
+    """Size in bytes of the serialized JSON"""
+    return len(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+def shard_file_name(key):
+    """File name for a posting shard (non filename-safe chars are escaped)"""
+    safe = ''.join(
+        c if c.isascii() and (c.isalnum() or c in '-_') else f"~{ord(c):x}"
+        for c in key
+    )
+    return f"postings-{safe}.json"
+
+def write_if_changed(path, data):
+    """Write serialized JSON only when the content differs (keeps CDN caches warm)"""
+    content = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            if f.read() == content:
+                return False
+    with open(path, 'wb') as f:
+        f.write(content)
+    return True
+
+def build_tag_matches(search_index):
+    """
+    Query term -> ids of episodes carrying one of its canonical tags
+
+    tag_synonyms resolved against the episode tags, so a sharded index
+    fetches the tag boost per query term instead of loading the whole
+    synonym table and every episode's tags up front.
+    """
+    tagged = defaultdict(set)
+    for ep in search_index['episodes']:
+        for tag in ep.get('tags', []):
+            tagged[tag].add(ep['id'])
+
+    return {
+        term: sorted(set().union(*(tagged[tag] for tag in tags)))
+        for term, tags in search_index['tag_synonyms'].items()
+    }
+
+def excerpt(text, length):
+    """Text cut to at most `length` characters at a word boundary, with an ellipsis"""
+    if len(text) <= length:
+        return text
+    cut = text[:length - 1].rsplit(' ', 1)[0] or text[:length - 1]
+    return cut.rstrip(' ,.;:') + '…'
+
+def card_row(ep):
+    """The CARD_FIELDS of an episode row, with CARD_EXCERPTS fields shortened"""
+    row = {field: ep[field] for field in CARD_FIELDS if field in ep}
+    for field, length in CARD_EXCERPTS.items():
+        if isinstance(row.get(field), str):
+            row[field] = excerpt(row[field], length)
+    return row
+
+def write_shards(search_index, shard_dir=SHARD_DIR, prefix_length=SHARD_PREFIX_LENGTH,
+                 detail_chunk_size=DETAIL_CHUNK_SIZE):
+    """
+    Write the index as a small manifest plus posting shards keyed by token prefix
+
+    Layout:
+        <shard_dir>/manifest.json     filters, metadata and the shard table
+        <shard_dir>/episodes.json     CARD_FIELDS of every episode row (see card_row)
+        <shard_dir>/details-<n>.json  other fields (and full CARD_EXCERPTS fields)
+                                      of detail_chunk_size rows
+        <shard_dir>/postings-<p>.json token-keyed sections for tokens starting with <p>
+
+    The client loads the manifest and card rows up front, fetches a posting
+    shard only when a query token falls into it, and a details chunk only
+    when an episode is opened. tag_synonyms becomes the sharded
+    'tag_matches' section (see build_tag_matches).
+
+    Returns:
+        Stats dict with shard counts and sizes
+    """
+    Path(shard_dir).mkdir(parents=True, exist_ok=True)
+
+    sectioned = {section: search_index[section] for section in SHARDED_SECTIONS if section in search_index}
+    if 'tag_synonyms' in search_index:
+        sectioned['tag_matches'] = build_tag_matches(search_index)
+    sections = list(sectioned)
+
+    # Group every token-keyed section by shard key
+    shards = defaultdict(lambda: {section: {} for section in sections})
+    for section, values in sectioned.items():
+        for token, value in values.items():
+            shards[token[:prefix_length]][section][token] = value
+
+    shard_table = {}
+    written = 0
+    for key in sorted(shards):
+        file_name = shard_file_name(key)
+        shard_table[key] = {
+            'file': file_name,
+            'tokens': len(shards[key]['index'])
+        }
+        written += write_if_changed(os.path.join(shard_dir, file_name), shards[key])
+
+    # Card fields up front, the rest in chunks of rows
+    episodes = search_index['episodes']
+    cards = [card_row(ep) for ep in episodes]
+    detail_files = []
+    for start in range(0, len(episodes), detail_chunk_size):
+        file_name = f'details-{start // detail_chunk_size}.json'
+        details = [{field: value for field, value in ep.items()
+                    if field not in CARD_FIELDS or field in CARD_EXCERPTS}
+                   for ep in episodes[start:start + detail_chunk_size]]
+        written += write_if_changed(os.path.join(shard_dir, file_name), details)
+        detail_files.append(file_name)
+
+    manifest = {
+        key: value
+        for key, value in search_index.items()
+        if key not in sections and key not in ('episodes', 'tag_synonyms')
+    }
+    manifest['episodes_file'] = 'episodes.json'
+    manifest['details'] = {
+        'chunk_size': detail_chunk_size,
+        'files': detail_files
+    }
+    manifest['shards'] = {
+        'prefix_length': prefix_length,
+        'sections': sections,
+        'table': shard_table
+    }
+
+    written += write_if_changed(os.path.join(shard_dir, 'episodes.json'), cards)
+    written += write_if_changed(os.path.join(shard_dir, 'manifest.json'), manifest)
+
+    # Remove shards and detail chunks left over from tokens/episodes that no longer exist
+    expected = {entry['file'] for entry in shard_table.values()} | set(detail_files)
+    removed = 0
+    for pattern in ('postings-*.json', 'details-*.json'):
+        for path in Path(shard_dir).glob(pattern):
+            if path.name not in expected:
+                path.unlink()
+                removed += 1
+
+    shard_sizes = [os.path.getsize(os.path.join(shard_dir, entry['file'])) for entry in shard_table.values()]
+    detail_sizes = [os.path.getsize(os.path.join(shard_dir, file_name)) for file_name in detail_files]
+    return {
+        'shards': len(shard_table),
+        'written': written,
+        'removed': removed,
+        'manifest_kb': os.path.getsize(os.path.join(shard_dir, 'manifest.json')) / 1024,
+        'episodes_kb': os.path.getsize(os.path.join(shard_dir, 'episodes.json')) / 1024,
+        'largest_shard_kb': max(shard_sizes, default=0) / 1024,
+        'largest_details_kb': max(detail_sizes, default=0) / 1024,
+    }
+
+def build_suggest_index(search_index, max_prefix=SUGGEST_MAX_PREFIX, top_k=SUGGEST_TOP_K,
+                        min_df=SUGGEST_MIN_DF, min_episode_prefix=SUGGEST_MIN_EPISODE_PREFIX):
+    """
+    Build the autocomplete index from a finished search index
+
+    'tokens' is the sorted dictionary of tokens found in at least min_df
+    episodes, so the tokens sharing a prefix form one contiguous range, and
+    'df' holds each token's document frequency. Each prefix of up to
+    max_prefix characters maps to [start, end, completions, episodes]:
+        start, end:  the prefix's range in 'tokens'
+        completions: top_k token positions by document frequency
+        episodes:    top_k episode ids by number of matching tokens (empty
+                     for prefixes shorter than min_episode_prefix)
+    A lookup is a single dict access; longer prefixes binary-search their
+    sub-range inside the max_prefix entry and rank it by 'df'. 'titles'
+    lets the client show episode suggestions before the main index has
+    loaded.
+    """
+    inverted_index = search_index['index']
+    tokens = sorted(token for token, ep_ids in inverted_index.items() if len(ep_ids) >= min_df)
+
+    # Contiguous token range of every prefix
+    ranges = {}
+    for position, token in enumerate(tokens):
+        for length in range(1, min(max_prefix, len(token)) + 1):
+            prefix = token[:length]
+            if prefix in ranges:
+                ranges[prefix][1] = position + 1
+            else:
+                ranges[prefix] = [position, position + 1]
+
+    prefixes = {}
+    suggested_ids = set()
+    for prefix in sorted(ranges):
+        start, end = ranges[prefix]
+        completions = sorted(
+            range(start, end),
+            key=lambda position: (-len(inverted_index[tokens[position]]), tokens[position])
+        )[:top_k]
+
+        top_episodes = []
+        if len(prefix) >= min_episode_prefix:
+            episode_hits = defaultdict(int)
+            for position in range(start, end):
+                for ep_id in inverted_index[tokens[position]]:
+                    episode_hits[ep_id] += 1
+            top_episodes = sorted(episode_hits, key=lambda ep_id: (-episode_hits[ep_id], ep_id))[:top_k]
+            suggested_ids.update(top_episodes)
+
+        prefixes[prefix] = [start, end, completions, top_episodes]
+
+    return {
+        'max_prefix': max_prefix,
+        'top_k': top_k,
+        'tokens': tokens,
+        'df': [len(inverted_index[token]) for token in tokens],
+        'prefixes': prefixes,
+        'titles': {
+            str(ep['id']): ep['title']
+            for ep in search_index['episodes']
+            if ep['id'] in suggested_ids
+        },
+        'version': INDEX_VERSION
+    }
+
+def suggest_path_for(output_file):
+    """Path of the autocomplete index written next to the search index"""
+    return os.path.join(os.path.dirname(output_file), 'search-suggest.json')
+
+def normalize_episode_id(value):
+    """Transcript files store '07'-style strings; the index uses ints"""
+    text = str(value).strip()
+    return int(text) if text.isdigit() else text
+
+def transcript_paths(transcripts_dir=TRANSCRIPTS_DIR, transcript_store_dir=None):
+    """
+    Transcript files in episode order
+
+    Episodes missing from transcripts_dir are read from the local transcript
+    store (transcript_store.py) when one exists; its objects are README-schema
+    records too, just gzip-compressed.
+    """
+    paths = {
+        normalize_episode_id(path.stem.split('-')[-1]): path
+        for path in Path(transcripts_dir).glob('episode-*.json')
+    }
+
+    if transcript_store_dir and os.path.exists(transcript_store_dir):
+        for key, path in TranscriptStore(transcript_store_dir).object_paths().items():
+            paths.setdefault(normalize_episode_id(key), path)
+
+    return [paths[episode_id] for episode_id in sorted(paths, key=lambda value: (isinstance(value, str), value))]
+
+def read_transcript(path):
+    """Return (episode_id, transcript_text), or None if unreadable/empty"""
+    path = Path(path)
+    try:
+        if path.suffix == '.gz':
+            data = TranscriptStore.read_object(path)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"  ⚠️  Skipping {path.name}: {str(e)}")
+        return None
+
+    if not data.get('transcript'):
+        return None
+    return normalize_episode_id(data.get('episode_number', path.stem.split('-')[-1])), data['transcript']
+
+def transcript_postings(path):
+    """
+    Map step for the transcript index: tokenize one transcript
+
+    Returns:
+        (episode_id, {token: [first_position, delta, ...]}, length) or None
+    """
+    transcript = read_transcript(path)
+    if transcript is None:
+        return None
+    episode_id, text = transcript
+
+    positions = defaultdict(list)
+    length = 0
+    for position, token in enumerate(tokenize(text)):
+        positions[token].append(position)
+        length = position + 1
+
+    deltas = {
+        token: [token_positions[0]] + [b - a for a, b in zip(token_positions, token_positions[1:])]
+        for token, token_positions in positions.items()
+    }
+    return episode_id, deltas, length
+
+def spill_run(buffer, run_dir, run_number):
+    """Write buffered postings to a token-sorted run file"""
+    path = os.path.join(run_dir, f"run-{run_number:05d}.jsonl")
+    with open(path, 'w', encoding='utf-8') as f:
+        for token in sorted(buffer):
+            f.write(json.dumps([token, buffer[token]], ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+    return path
+
+def read_run(path, run_number):
+    """Stream (token, run_number, postings) from a run file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            token, postings = json.loads(line)
+            yield token, run_number, postings
+
+def merge_runs(run_paths):
+    """
+    K-way merge of sorted run files
+
+    Yields (token, postings of one run) in token order, and for the same
+    token in run order. Runs hold documents in ingestion order, so writing
+    the pieces of a token one after another keeps its postings ordered
+    without ever holding the whole list.
+    """
+    streams = [read_run(path, number) for number, path in enumerate(run_paths)]
+    for token, _, postings in heapq.merge(*streams):
+        yield token, postings
+
+def build_transcript_index(transcripts_dir=TRANSCRIPTS_DIR,
+                           output_dir=TRANSCRIPT_INDEX_DIR,
+                           prefix_length=TRANSCRIPT_SHARD_PREFIX_LENGTH,
+                           memory_budget=TRANSCRIPT_MEMORY_BUDGET,
+                           workers=1,
+                           transcript_store_dir=TRANSCRIPT_STORE_DIR):
+    """
+    Build a positional index over full transcripts with bounded memory
+
+    Transcripts are streamed one at a time and their postings buffered until
+    memory_budget positions are held; the buffer is then spilled to a sorted
+    run file on disk. The runs are k-way merged straight into shard files
+    keyed by token prefix, one run's piece of a posting list at a time, so
+    peak memory depends on the budget, not on the corpus size (a common
+    token's full posting list is never held). With workers > 1
+    transcripts are tokenized in a process pool (a few files in flight per
+    worker) and consumed in file order, so the output is unchanged.
+    Episodes without a file in transcripts_dir are read from the local
+    transcript store filled by Drive ingestion.
+
+    Layout:
+        <output_dir>/manifest.json       transcript lengths, shard table, metadata
+        <output_dir>/postings-<p>.json   {"postings": {token: [[episode_id, pos, delta, ...], ...]}}
+
+    Positions count tokens produced by tokenize(), delta-coded within each
+    posting, so a phrase matches where consecutive query tokens sit at
+    consecutive positions.
+
+    Returns:
+        Stats dict for the build summary
+    """
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    transcripts = []
+    run_paths = []
+    total_positions = 0
+
+    with tempfile.TemporaryDirectory(prefix='transcript-runs-') as run_dir:
+        buffer = defaultdict(list)
+        buffered = 0
+
+        for result in map_in_order(transcript_postings, transcript_paths(transcripts_dir, transcript_store_dir), workers):
+            if result is None:
+                continue
+            episode_id, token_deltas, length = result
+
+            for token, deltas in token_deltas.items():
+                buffer[token].append([episode_id] + deltas)
+                buffered += len(deltas)
+
+            transcripts.append({'id': episode_id, 'length': length})
+            total_positions += length
+
+            if buffered >= memory_budget:
+                run_paths.append(spill_run(buffer, run_dir, len(run_paths)))
+                buffer = defaultdict(list)
+                buffered = 0
+
+        if buffer:
+            run_paths.append(spill_run(buffer, run_dir, len(run_paths)))
+        del buffer
+
+        # Merge runs into shards; tokens arrive sorted so each shard is
+        # written start to finish before the next one is opened, and each
+        # run's postings for the current token are appended as they arrive
+        shard_table = {}
+        total_tokens = 0
+        shard_file = None
+        shard_key = None
+        current_token = None
+        first_posting = True
+        for token, postings in merge_runs(run_paths):
+            if token != current_token:
+                if current_token is not None:
+                    shard_file.write(']')
+                key = token[:prefix_length]
+                if key != shard_key:
+                    if shard_file:
+                        shard_file.write('}}')
+                        shard_file.close()
+                    shard_key = key
+                    file_name = shard_file_name(key)
+                    shard_table[key] = {'file': file_name, 'tokens': 0}
+                    shard_file = open(os.path.join(output_dir, file_name), 'w', encoding='utf-8')
+                    shard_file.write('{"postings":{')
+                if shard_table[key]['tokens']:
+                    shard_file.write(',')
+                shard_file.write(json.dumps(token, ensure_ascii=False))
+                shard_file.write(':[')
+                shard_table[key]['tokens'] += 1
+                total_tokens += 1
+                current_token = token
+                first_posting = True
+
+            for posting in postings:
+                if not first_posting:
+                    shard_file.write(',')
+                shard_file.write(json.dumps(posting, separators=(',', ':')))
+                first_posting = False
+        if shard_file:
+            shard_file.write(']}}')
+            shard_file.close()
+
+    # Remove shards left over from tokens that no longer exist
+    expected = {entry['file'] for entry in shard_table.values()}
+    for path in Path(output_dir).glob('postings-*.json'):
+        if path.name not in expected:
+            path.unlink()
+
+    manifest = {
+        'transcripts': transcripts,
+        'shards': {
+            'prefix_length': prefix_length,
+            'sections': ['postings'],
+            'table': shard_table
+        },
+        'metadata': {
+            'total_transcripts': len(transcripts),
+            'total_tokens': total_tokens,
+            'total_positions': total_positions,
+            'positions': 'delta',
+            'version': INDEX_VERSION
         }
     }
+    write_if_changed(os.path.join(output_dir, 'manifest.json'), manifest)
+
+    total_size = sum(os.path.getsize(path) for path in Path(output_dir).glob('*.json'))
+    return {
+        'transcripts': len(transcripts),
+        'tokens': total_tokens,
+        'positions': total_positions,
+        'runs': len(run_paths),
+        'shards': len(shard_table),
+        'size_kb': total_size / 1024,
+    }
+
+def build_search_index(input_file='episodes_final.json',
+                       output_file='search-index.json',
+                       incremental=False,
+                       shards=False,
+                       shard_dir=SHARD_DIR,
+                       compact=False,
+                       bm25=False,
+                       transcripts=False,
+                       transcripts_dir=TRANSCRIPTS_DIR,
+                       transcript_index_dir=TRANSCRIPT_INDEX_DIR,
+                       suggest=False,
+                       workers=1,
+                       thumbnail_manifest=THUMBNAIL_MANIFEST):
+    """
+    Build search index from episodes_final.json
+
+    Args:
+        input_file: Source episodes JSON (default: episodes_final.json)
+        output_file: Index file to write (default: search-index.json)
+        incremental: If True, re-tokenize only episodes whose content hash
+            changed since the last build and patch the previous index
+        shards: If True, also write the sharded layout to shard_dir
+        shard_dir: Directory for the manifest and posting shards
+        compact: If True, also write search-index.compact.json with
+            delta/varint-coded posting lists (shards use it too)
+        bm25: If True, include per-field term frequencies, document
+            lengths and IDF so clients can rank with BM25F
+        transcripts: If True, also build the positional transcript index
+        transcripts_dir: Directory with episode-XXX.json transcripts
+        transcript_index_dir: Output directory for the transcript index
+        suggest: If True, also write search-suggest.json for autocomplete
+        workers: Number of worker processes for tokenization (map) with a
+            deterministic merge (reduce); output is identical to workers=1
+        thumbnail_manifest: optimize_thumbnails.py manifest; if it exists,
+            episode rows get a 'thumbnail' entry for srcset and the index a
+            'thumbnails' section (variant URL scheme and default image)
+    """
+
+    print("\n" + "="*80)
+    print(f"BUILDING SEARCH INDEX{' (INCREMENTAL)' if incremental else ''}")
+    print("="*80 + "\n")
+
+    # Load episodes
+    with open(input_file, 'r', encoding='utf-8') as f:
+        episodes = json.load(f)
+
+    print(f"✓ Loaded {len(episodes)} episodes")
+
+    options = {'bm25': bm25, 'tag_rules': tag_rules_digest()}
+    previous_index, previous_hashes = (None, None)
+    if incremental:
+        previous_index, previous_hashes = load_previous_build(output_file, options)
+        if previous_index is None:
+            print("⚠️  No usable previous build - running full rebuild")
+
+    # Build inverted index: token -> {episode_ids}
+    inverted_index = defaultdict(set)
+    # BM25 statistics: token -> {episode_id: per-field tf}, episode_id -> field lengths
+    term_freqs = defaultdict(dict) if bm25 else None
+    doc_lengths = {} if bm25 else None
+    rows_by_id = {}
+    episode_entries = {}
+    previous_entries = {}
+
+    if previous_index is not None:
+        # Start from the previous build
+        for token, ep_ids in previous_index['index'].items():
+            inverted_index[token].update(ep_ids)
+            if bm25:
+                term_freqs[token].update(zip(ep_ids, previous_index['tf'][token]))
+        if bm25:
+            doc_lengths = {
+                row['id']: lengths
+                for row, lengths in zip(previous_index['episodes'], previous_index['bm25']['doc_lengths'])
+            }
+        rows_by_id = {str(row['id']): row for row in previous_index['episodes']}
+        previous_entries = previous_hashes.get('episodes', {})
+
+    def drop_episode(entry):
+        """Remove a previously indexed episode from the postings"""
+        for token in entry['tokens']:
+            inverted_index[token].discard(entry['id'])
+            if bm25:
+                term_freqs[token].pop(entry['id'], None)
+        if bm25:
+            doc_lengths.pop(entry['id'], None)
+
+    current_ids = set()
+    added = changed = unchanged = 0
+    pending = []
+
+    for ep in episodes:
+        ep_num = ep.get('Episode #')
+        if not ep_num:
+            continue
+
+        key = str(ep_num)
+        current_ids.add(key)
+        content_hash = episode_hash(ep)
+        previous_entry = previous_entries.get(key)
+
+        if previous_entry and previous_entry['hash'] == content_hash and key in rows_by_id:
+            episode_entries[key] = previous_entry
+            unchanged += 1
+            continue
+
+        if previous_entry:
+            # Drop the stale postings before re-adding this episode
+            drop_episode(previous_entry)
+            changed += 1
+        else:
+            added += 1
+
+        pending.append((ep, content_hash))
+
+    # Tokenize new/changed episodes (map) and fold them into the index (reduce)
+    episode_workers = max(1, min(workers, len(pending)))
+    chunks = chunked(pending, episode_workers * 4)
+    partial_indexes = map_in_order(
+        partial(index_chunk, bm25=bm25),
+        [[ep for ep, _ in chunk] for chunk in chunks],
+        episode_workers
+    )
+    for chunk, partial_index in zip(chunks, partial_indexes):
+        merge_partial_index(partial_index, inverted_index, term_freqs, doc_lengths)
+        for (ep, content_hash), searchable_ep, tokens in zip(chunk, partial_index['rows'], partial_index['tokens']):
+            key = str(ep['Episode #'])
+            rows_by_id[key] = searchable_ep
+            episode_entries[key] = {'id': ep['Episode #'], 'hash': content_hash, 'tokens': tokens}
+
+    # Remove episodes that no longer exist in the source data
+    removed = 0
+    for key, previous_entry in previous_entries.items():
+        if key in current_ids:
+            continue
+        drop_episode(previous_entry)
+        rows_by_id.pop(key, None)
+        removed += 1
+
+    # Keep episode rows in source order
+    searchable_episodes = [
+        rows_by_id[str(ep.get('Episode #'))]
+        for ep in episodes
+        if ep.get('Episode #')
+    ]
+
+    if incremental:
+        print(f"✓ Added: {added}, changed: {changed}, removed: {removed}, unchanged: {unchanged}")
+
+    # Embed responsive thumbnail variants for srcset
+    thumbnail_settings, thumbnails = load_thumbnails(thumbnail_manifest)
+    searchable_episodes = attach_thumbnails(searchable_episodes, thumbnails)
+
+    # Build final index
+    search_index = assemble_index(searchable_episodes, inverted_index, term_freqs, doc_lengths)
+    if thumbnail_settings:
+        search_index['thumbnails'] = dict(thumbnail_settings)
+        if 'default' in thumbnails:
+            search_index['thumbnails']['default'] = thumbnails['default']
+    inverted_index_json = search_index['index']
 
     # Write to file
-    output_file = 'search-index.json'
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(search_index, f, ensure_ascii=False, separators=(',', ':'))
 
+    # Write hash manifest used by the next incremental build
+    with open(hashes_path_for(output_file), 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': INDEX_VERSION,
+            'options': options,
+            'episodes': episode_entries
+        }, f, ensure_ascii=False, separators=(',', ':'))
+
     # Get file size
-    import os
     size_kb = os.path.getsize(output_file) / 1024
 
+    compact_stats = None
+    published_index = search_index
+    if compact:
+        published_index = encode_compact(search_index)
+        compact_file = compact_path_for(output_file)
+        with open(compact_file, 'w', encoding='utf-8') as f:
+            json.dump(published_index, f, ensure_ascii=False, separators=(',', ':'))
+        compact_stats = {
+            'file': compact_file,
+            'plain_index_kb': json_size(search_index['index']) / 1024,
+            'compact_index_kb': json_size(published_index['index']) / 1024,
+            'size_kb': os.path.getsize(compact_file) / 1024,
+        }
+
+    shard_stats = write_shards(published_index, shard_dir) if shards else None
+
+    suggest_stats = None
+    if suggest:
+        suggest_file = suggest_path_for(output_file)
+        suggest_index = build_suggest_index(search_index)
+        write_if_changed(suggest_file, suggest_index)
+        suggest_stats = {
+            'file': suggest_file,
+            'prefixes': len(suggest_index['prefixes']),
+            'size_kb': os.path.getsize(suggest_file) / 1024,
+        }
+
+    transcript_stats = None
+    if transcripts:
+        print("Indexing transcripts...")
+        transcript_stats = build_transcript_index(transcripts_dir, transcript_index_dir, workers=workers)
+
     print(f"\n{'='*80}")
     print(f"SEARCH INDEX BUILT")
     print(f"{'='*80}\n")
     print(f"✓ Episodes indexed: {len(searchable_episodes)}")
     print(f"✓ Unique search tokens: {len(inverted_index_json):,}")
-    print(f"✓ Industry categories: {len(all_industries)}")
-    print(f"✓ Industry subcategories: {len(all_subcategories)}")
+    print(f"✓ Industry categories: {len(search_index['filters']['industries'])}")
+    print(f"✓ Industry subcategories: {len(search_index['filters']['subcategories'])}")
+    if thumbnails:
+        with_thumbnail = sum(1 for row in searchable_episodes if 'thumbnail' in row)
+        print(f"✓ Responsive thumbnails: {with_thumbnail} episodes")
     print(f"\n✓ Output file: {output_file}")
     print(f"✓ File size: {size_kb:.1f} KB")
+    if compact_stats:
+        savings = 100 * (1 - compact_stats['compact_index_kb'] / max(compact_stats['plain_index_kb'], 1e-9))
+        print(f"\n✓ Compact file: {compact_stats['file']} ({compact_stats['size_kb']:.1f} KB)")
+        print(f"✓ Postings (plain JSON):      {compact_stats['plain_index_kb']:.1f} KB")
+        print(f"✓ Postings ({COMPACT_ENCODING}): {compact_stats['compact_index_kb']:.1f} KB "
+              f"({savings:.1f}% smaller)")
+    if shard_stats:
+        print(f"\n✓ Shards: {shard_stats['shards']} in {shard_dir}/ "
+              f"({shard_stats['written']} files written, {shard_stats['removed']} removed)")
+        print(f"✓ Manifest: {shard_stats['manifest_kb']:.1f} KB, "
+              f"episodes: {shard_stats['episodes_kb']:.1f} KB, "
+              f"largest shard: {shard_stats['largest_shard_kb']:.1f} KB, "
+              f"largest details chunk: {shard_stats['largest_details_kb']:.1f} KB")
+    if suggest_stats:
+        # The autocomplete file is loaded before the index, so it must stay smaller
+        eager_kb = shard_stats['manifest_kb'] + shard_stats['episodes_kb'] if shard_stats else size_kb
+        print(f"\n✓ Autocomplete: {suggest_stats['file']} "
+              f"({suggest_stats['prefixes']:,} prefixes, {suggest_stats['size_kb']:.1f} KB; "
+              f"eager index payload {eager_kb:.1f} KB)")
+        if suggest_stats['size_kb'] >= eager_kb:
+            print("⚠️  Autocomplete file is larger than the index payload it is loaded before")
+    if transcript_stats:
+        print(f"\n✓ Transcripts indexed: {transcript_stats['transcripts']} "
+              f"({transcript_stats['positions']:,} positions, {transcript_stats['tokens']:,} tokens)")
+        print(f"✓ Transcript index: {transcript_index_dir}/ "
+              f"({transcript_stats['shards']} shards, {transcript_stats['size_kb']:.1f} KB, "
+              f"merged from {transcript_stats['runs']} runs)")
     print(f"\n{'='*80}\n")
 
     # Show sample tokens
@@ -157,5 +1280,25 @@ def build_search_index():
 
     print(f"\n{'='*80}\n")
 
+    return search_index
+
 if __name__ == '__main__':
-    build_search_index()
+    import sys
+
+    workers = 1
+    if '--workers' in sys.argv:
+        idx = sys.argv.index('--workers')
+        if idx + 1 < len(sys.argv) and sys.argv[idx + 1].isdigit():
+            workers = int(sys.argv[idx + 1])
+        else:
+            workers = os.cpu_count() or 1
+
+    build_search_index(
+        incremental='--incremental' in sys.argv,
+        shards='--shards' in sys.argv,
+        compact='--compact' in sys.argv,
+        bm25='--bm25' in sys.argv,
+        transcripts='--transcripts' in sys.argv,
+        suggest='--suggest' in sys.argv,
+        workers=workers
+    )
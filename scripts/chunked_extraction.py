@@ -0,0 +1,218 @@
+"""
+Map-reduce metadata extraction for long transcripts
+
+A transcript of tens of thousands of words sent as one blob makes a single
+slow, timeout-prone LLM call. ChunkedExtractor splits long transcripts into
+overlapping word windows, extracts partial metadata from every chunk in
+parallel, and merges the partial records locally (no extra LLM call):
+
+    list fields (Topics, Tags, ...)    union, ranked by how many chunks mention them
+    Key Takeaways / Best Quotes        de-duplicated, renumbered, capped
+    scalar fields (Revenue, ...)       most common real value (first chunk wins ties)
+    Episode Summary                    from the first chunk (the introduction)
+
+Short transcripts are passed to the wrapped extractor unchanged.
+"""
+
+import queue
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+# ~30 minutes of conversation per chunk; overlap keeps answers that straddle a boundary
+CHUNK_WORDS = 4000
+CHUNK_OVERLAP_WORDS = 200
+CHUNK_WORKERS = 4
+
+# Comma-separated fields that are merged as sets
+LIST_FIELDS = [
+    'Topics', 'Tags', 'Industry', 'Business Type', 'Business Stage', 'Customer Type',
+    'Customer Acquisition Channels', 'Guest Expertise Areas', 'Tools/Software Mentioned',
+    'Companies Mentioned', 'Frameworks or Mental Models',
+]
+LIST_FIELD_LIMITS = {'Topics': 12, 'Tags': 15}
+
+MAX_TAKEAWAYS = 5
+MAX_QUOTES = 5
+
+# Values the extractor uses for "nothing found"
+EMPTY_VALUES = {'', 'not available', 'n/a', 'none', 'unknown'}
+
+def is_empty(value):
+    return value is None or (isinstance(value, str) and value.strip().lower() in EMPTY_VALUES)
+
+def split_transcript(text, chunk_words=CHUNK_WORDS, overlap_words=CHUNK_OVERLAP_WORDS):
+    """
+    Split a transcript into overlapping chunks of about chunk_words words
+
+    Chunks are slices of the original text, so line breaks and speaker
+    labels are kept.
+
+    Returns:
+        List of chunk strings (just [text] if it fits in one chunk)
+    """
+    words = [match.span() for match in re.finditer(r'\S+', text)]
+    if len(words) <= chunk_words + overlap_words:
+        return [text]
+
+    step = chunk_words - overlap_words
+    chunks = []
+    for start in range(0, len(words), step):
+        end = min(start + chunk_words, len(words))
+        chunks.append(text[words[start][0]:words[end - 1][1]])
+        if end == len(words):
+            break
+
+    # Fold a short tail into the previous chunk instead of a tiny extra call
+    if len(chunks) > 1 and len(words) - (len(chunks) - 1) * step < 2 * overlap_words:
+        chunks.pop()
+        chunks[-1] = text[words[(len(chunks) - 1) * step][0]:words[-1][1]]
+
+    return chunks
+
+def split_list(value):
+    return [item.strip() for item in str(value).split(',') if not is_empty(item)]
+
+def split_numbered(value):
+    """'1. Foo, 2. Bar' -> ['Foo', 'Bar']"""
+    items = re.split(r'(?:^|[,;\n]\s*)\d+[.)]\s+', str(value).strip())
+    return [item.strip(' ,;') for item in items if not is_empty(item.strip(' ,;'))]
+
+def ranked_union(values_per_chunk, limit=None):
+    """Case-insensitive union ranked by chunk count, then first appearance"""
+    counts = Counter()
+    first = {}
+    for values in values_per_chunk:
+        for value in dict.fromkeys(v.lower() for v in values):
+            counts[value] += 1
+        for value in values:
+            first.setdefault(value.lower(), value)
+
+    order = {key: i for i, key in enumerate(first)}
+    ranked = sorted(first, key=lambda key: (-counts[key], order[key]))
+    return [first[key] for key in ranked[:limit]]
+
+def merge_metadata(partials):
+    """
+    Reduce per-chunk metadata records into one episode record
+
+    Args:
+        partials: Metadata dicts in chunk order (falsy entries are skipped)
+
+    Returns:
+        Merged metadata dict, or None if no chunk produced any
+    """
+    partials = [partial for partial in partials if partial]
+    if not partials:
+        return None
+    if len(partials) == 1:
+        return partials[0]
+
+    merged = {}
+    keys = list(dict.fromkeys(key for partial in partials for key in partial))
+    for key in keys:
+        values = [partial[key] for partial in partials if key in partial and not is_empty(partial[key])]
+
+        if not values:
+            merged[key] = partials[0].get(key, next(p[key] for p in partials if key in p))
+        elif key in ('Episode #', 'Episode Title', 'Episode Summary'):
+            merged[key] = values[0]
+        elif key in LIST_FIELDS and all(isinstance(value, str) for value in values):
+            merged[key] = ', '.join(ranked_union([split_list(v) for v in values], LIST_FIELD_LIMITS.get(key)))
+        elif key == 'Key Takeaways' and all(isinstance(value, str) for value in values):
+            takeaways = ranked_union([split_numbered(v) for v in values], MAX_TAKEAWAYS)
+            merged[key] = ', '.join(f"{i}. {takeaway}" for i, takeaway in enumerate(takeaways, 1))
+        elif key == 'Best Quotes' and all(isinstance(value, str) for value in values):
+            quotes = ranked_union([[q.strip() for q in v.split('\n') if q.strip()] for v in values], MAX_QUOTES)
+            merged[key] = '\n'.join(quotes)
+        else:
+            # Scalars: the value most chunks agree on
+            counts = Counter(repr(value) for value in values)
+            merged[key] = max(values, key=lambda value: counts[repr(value)])
+
+    return merged
+
+class ChunkedExtractor:
+    """
+    Drop-in wrapper for EpisodeExtractor that extracts long transcripts
+    chunk by chunk in parallel and merges the results
+
+    Extractors are not shared between threads: every concurrent chunk
+    borrows its own from a pool filled by extractor_factory (at most
+    `workers` are created), and `usage` sums their token counts.
+
+    Args:
+        extractor_factory: Callable returning a new EpisodeExtractor (or
+            anything with process_episode_folder())
+        chunk_words: Words per chunk
+        overlap_words: Words shared by consecutive chunks
+        workers: Chunks extracted concurrently per episode
+    """
+
+    def __init__(self, extractor_factory, chunk_words=CHUNK_WORDS, overlap_words=CHUNK_OVERLAP_WORDS,
+                 workers=CHUNK_WORKERS):
+        self.extractor_factory = extractor_factory
+        self.extractors = [extractor_factory()]  # every extractor created, for usage totals
+        self.idle = queue.SimpleQueue()
+        self.idle.put(self.extractors[0])
+        self.lock = threading.Lock()
+        self.chunk_words = chunk_words
+        self.overlap_words = overlap_words
+        self.workers = workers
+        # Chunked results differ from whole-transcript ones: keep them apart in the extraction cache
+        base_version = getattr(self.extractors[0], 'prompt_version', None)
+        self.prompt_version = f"{base_version or ''}+chunked-{chunk_words}-{overlap_words}"
+
+    @contextmanager
+    def borrow(self):
+        """An extractor no other thread is using (a new one if all are busy)"""
+        try:
+            extractor = self.idle.get_nowait()
+        except queue.Empty:
+            extractor = self.extractor_factory()
+            with self.lock:
+                self.extractors.append(extractor)
+        try:
+            yield extractor
+        finally:
+            self.idle.put(extractor)
+
+    @property
+    def usage(self):
+        """Token usage summed over the pooled extractors (None if they keep none)"""
+        totals = {}
+        with self.lock:
+            extractors = list(self.extractors)
+        for extractor in extractors:
+            for field, count in (getattr(extractor, 'usage', None) or {}).items():
+                totals[field] = totals.get(field, 0) + (count or 0)
+        return totals or None
+
+    def process_episode_folder(self, folder_name, transcript_text, thumbnail_path=None):
+        chunks = split_transcript(transcript_text, self.chunk_words, self.overlap_words)
+        if len(chunks) == 1:
+            with self.borrow() as extractor:
+                return extractor.process_episode_folder(
+                    folder_name=folder_name,
+                    transcript_text=transcript_text,
+                    thumbnail_path=thumbnail_path
+                )
+
+        def extract(index):
+            with self.borrow() as extractor:
+                return extractor.process_episode_folder(
+                    folder_name=folder_name,
+                    transcript_text=chunks[index],
+                    # The thumbnail only needs to be looked at once
+                    thumbnail_path=thumbnail_path if index == 0 else None
+                )
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+            partials = list(pool.map(extract, range(len(chunks))))
+
+        return merge_metadata(partials)
+
+    def __getattr__(self, name):
+        return getattr(self.extractors[0], name)
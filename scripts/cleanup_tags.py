@@ -3,6 +3,7 @@ Tag cleanup script - standardizes and consolidates episode tags
 """
 import json
 from collections import Counter
+from functools import lru_cache
 
 # Tag normalization rules
 TAG_MAPPINGS = {
@@ -103,16 +104,57 @@ TAG_MAPPINGS = {
     'business-development': 'sales',
 }
 
+def compile_tag_mappings(mappings):
+    """
+    Close a mapping table under transitivity
+
+    Every variant is resolved through the whole chain ('product' ->
+    'product-development' -> 'product-market-fit'), so lookups are a
+    single dict access.
+
+    Args:
+        mappings: Dict of variant -> canonical tag (None deletes the tag)
+
+    Returns:
+        Dict of variant -> final tag (or None)
+
+    Raises:
+        ValueError: If the mappings contain a cycle
+    """
+    table = {}
+    for variant in mappings:
+        chain = [variant]
+        target = mappings[variant]
+        while target in mappings and target not in table:
+            if target in chain:
+                cycle = ' -> '.join(chain[chain.index(target):] + [target])
+                raise ValueError(f"Cycle in TAG_MAPPINGS: {cycle}")
+            chain.append(target)
+            target = mappings[target]
+        final = table.get(target, target)
+
+        for tag in chain:
+            table[tag] = final
+
+    return table
+
+# Compiled once at import: variant -> final tag, and the set of tags variants end up as
+TAG_TABLE = compile_tag_mappings(TAG_MAPPINGS)
+CANONICAL_TAGS = frozenset(tag for tag in TAG_TABLE.values() if tag is not None)
+
+@lru_cache(maxsize=None)
 def normalize_tag(tag):
     """Normalize a single tag"""
     tag = tag.strip().lower()
 
     # Apply mapping if exists
-    if tag in TAG_MAPPINGS:
-        return TAG_MAPPINGS[tag]
+    if tag in TAG_TABLE:
+        return TAG_TABLE[tag]
 
-    # Replace spaces with hyphens
+    # Replace spaces with hyphens (the hyphenated form may itself be mapped)
     tag = tag.replace(' ', '-')
+    if tag in TAG_TABLE:
+        return TAG_TABLE[tag]
 
     # Remove very long tags (likely phrases)
     if len(tag) > 35:
@@ -201,7 +243,7 @@ def cleanup_tags(min_occurrences=2, dry_run=True):
                 continue
 
             if normalized != original_normalized:
-                if normalized in TAG_MAPPINGS.values():
+                if normalized in CANONICAL_TAGS:
                     changes_summary['tags_consolidated'] += 1
                 elif ' ' in tag:
                     changes_summary['format_fixes'] += 1
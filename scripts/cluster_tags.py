@@ -0,0 +1,285 @@
+"""
+Find near-duplicate tags and propose TAG_MAPPINGS entries
+
+LLM extraction keeps inventing tag variants ('ai-automation' /
+'ai-automations', 'saas-business' / 'saas-businesses'). This script clusters
+the normalized tag vocabulary of the whole corpus without comparing every
+pair of tags:
+
+1. Each tag becomes a set of character trigrams, summarized by a MinHash
+   signature
+2. Locality-sensitive hashing (signature bands -> buckets) yields candidate
+   pairs: only tags sharing a bucket are compared
+3. Candidates are kept if their trigram Jaccard similarity is high enough,
+   they have the same words up to inflection ('google' / 'google-drive' is
+   a specialization, not a duplicate) and they rarely appear on the same
+   episode (real duplicates are alternatives; tags often used together are
+   different concepts)
+4. Kept pairs are joined into clusters; each cluster's canonical tag is an
+   existing mapping target, else its most used member
+
+The proposed mappings are printed for review (nothing is changed) and can be
+pasted into TAG_MAPPINGS in cleanup_tags.py.
+
+Usage:
+    python3 cluster_tags.py
+    python3 cluster_tags.py --threshold 0.6
+    python3 cluster_tags.py --input episodes_batch.json --json tag_clusters.json
+"""
+import hashlib
+import json
+import random
+from collections import Counter, defaultdict
+
+from cleanup_tags import CANONICAL_TAGS, TAG_MAPPINGS, compile_tag_mappings, normalize_tag
+
+NGRAM_SIZE = 3
+
+# 32 bands of 4 rows: pairs with Jaccard ~0.42 have a 50% chance to collide,
+# 0.6+ are found almost surely
+NUM_PERMUTATIONS = 128
+BAND_ROWS = 4
+
+SIMILARITY_THRESHOLD = 0.5  # trigram Jaccard needed to merge two tags
+MIN_WORD_PREFIX = 4  # words match if they share a prefix this long...
+WORD_PREFIX_SHARE = 0.6  # ...covering this much of the shorter word
+MAX_SHARED_EPISODES = 0.3  # of the rarer tag's episodes; above this they are distinct concepts
+MAX_BUCKET_SIZE = 100  # buckets this large hold common n-grams, not duplicates
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+def shingles(tag, n=NGRAM_SIZE):
+    """Character n-grams of a tag, with word boundaries marked"""
+    text = f" {tag.replace('-', ' ')} "
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def same_words(first, second):
+    """True if two tags have the same words up to inflection ('data-analysis' / 'data-analytics')"""
+    first_words, second_words = first.split('-'), second.split('-')
+    if len(first_words) != len(second_words):
+        return False
+
+    for a, b in zip(first_words, second_words):
+        prefix = 0
+        while prefix < min(len(a), len(b)) and a[prefix] == b[prefix]:
+            prefix += 1
+        if a != b and prefix < max(MIN_WORD_PREFIX, WORD_PREFIX_SHARE * min(len(a), len(b))):
+            return False
+    return True
+
+class MinHasher:
+    """MinHash signatures from NUM_PERMUTATIONS universal hash functions"""
+
+    def __init__(self, num_permutations=NUM_PERMUTATIONS, seed=1):
+        rng = random.Random(seed)
+        self.permutations = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+                             for _ in range(num_permutations)]
+        self.base_hashes = {}
+
+    def base_hash(self, shingle):
+        if shingle not in self.base_hashes:
+            digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest()
+            self.base_hashes[shingle] = int.from_bytes(digest, 'little')
+        return self.base_hashes[shingle]
+
+    def signature(self, shingle_set):
+        hashes = [self.base_hash(shingle) for shingle in shingle_set]
+        return [min(((a * h + b) % MERSENNE_PRIME) & MAX_HASH for h in hashes)
+                for a, b in self.permutations]
+
+def candidate_pairs(signatures, band_rows=BAND_ROWS, max_bucket_size=MAX_BUCKET_SIZE):
+    """
+    Tag pairs whose signatures agree on at least one whole band
+
+    Args:
+        signatures: Dict of tag -> MinHash signature
+
+    Returns:
+        Set of (tag, tag) tuples, each sorted
+    """
+    buckets = defaultdict(list)
+    for tag, signature in signatures.items():
+        for start in range(0, len(signature), band_rows):
+            buckets[(start, tuple(signature[start:start + band_rows]))].append(tag)
+
+    pairs = set()
+    for members in buckets.values():
+        if len(members) < 2 or len(members) > max_bucket_size:
+            continue
+        for i, first in enumerate(members):
+            for second in members[i + 1:]:
+                pairs.add((first, second) if first < second else (second, first))
+    return pairs
+
+def collect_tags(episodes):
+    """
+    Normalized tags of every episode (deleted and duplicate tags dropped)
+
+    Returns:
+        (Counter of tag -> episode count, list of per-episode tag sets)
+    """
+    episode_tags = []
+    for ep in episodes:
+        tags = {normalize_tag(tag) for tag in (ep.get('Tags') or '').split(',') if tag.strip()}
+        tags.discard(None)
+        episode_tags.append(tags)
+
+    counts = Counter(tag for tags in episode_tags for tag in tags)
+    return counts, episode_tags
+
+def co_occurrence(episode_tags, pairs):
+    """Number of episodes carrying both tags, for each candidate pair"""
+    partners = defaultdict(set)
+    for first, second in pairs:
+        partners[first].add(second)
+
+    shared = Counter()
+    for tags in episode_tags:
+        for tag in tags:
+            for other in partners.get(tag, ()):
+                if other in tags:
+                    shared[(tag, other)] += 1
+    return shared
+
+def pick_canonical(members, counts):
+    """Existing mapping target, else the most used tag (shorter, then alphabetical, on ties)"""
+    return min(members, key=lambda tag: (tag not in CANONICAL_TAGS, -counts[tag], len(tag), tag))
+
+def cluster_tags(episodes, threshold=SIMILARITY_THRESHOLD, max_shared=MAX_SHARED_EPISODES,
+                 num_permutations=NUM_PERMUTATIONS, band_rows=BAND_ROWS):
+    """
+    Cluster near-duplicate tags
+
+    Args:
+        episodes: Episode dicts with a comma-separated 'Tags' field
+        threshold: Minimum trigram Jaccard similarity of a merged pair
+        max_shared: Maximum share of the rarer tag's episodes that may carry both tags
+
+    Returns:
+        (clusters, stats): clusters is a list of dicts (canonical, members with
+        counts, pairs with similarity and shared episodes), largest first
+    """
+    counts, episode_tags = collect_tags(episodes)
+    shingle_sets = {tag: shingles(tag) for tag in counts}
+
+    hasher = MinHasher(num_permutations)
+    signatures = {tag: hasher.signature(shingle_set) for tag, shingle_set in shingle_sets.items()}
+    candidates = candidate_pairs(signatures, band_rows)
+    shared = co_occurrence(episode_tags, candidates)
+
+    # Union-find over accepted pairs
+    parent = {tag: tag for tag in counts}
+
+    def find(tag):
+        while parent[tag] != tag:
+            parent[tag] = parent[parent[tag]]
+            tag = parent[tag]
+        return tag
+
+    accepted = []
+    for first, second in candidates:
+        similarity = jaccard(shingle_sets[first], shingle_sets[second])
+        if similarity < threshold or not same_words(first, second):
+            continue
+        both = shared[(first, second)] + shared[(second, first)]
+        if both > max_shared * min(counts[first], counts[second]):
+            continue
+        accepted.append((first, second, similarity, both))
+        parent[find(first)] = find(second)
+
+    groups = defaultdict(list)
+    for tag in counts:
+        groups[find(tag)].append(tag)
+
+    pairs_by_root = defaultdict(list)
+    for first, second, similarity, both in accepted:
+        pairs_by_root[find(first)].append({
+            'tags': [first, second], 'similarity': round(similarity, 3), 'shared_episodes': both,
+        })
+
+    clusters = []
+    for root, members in groups.items():
+        if len(members) < 2:
+            continue
+        clusters.append({
+            'canonical': pick_canonical(members, counts),
+            'members': {tag: counts[tag] for tag in sorted(members, key=lambda tag: (-counts[tag], tag))},
+            'pairs': sorted(pairs_by_root[root], key=lambda pair: -pair['similarity']),
+        })
+    clusters.sort(key=lambda cluster: (-sum(cluster['members'].values()), cluster['canonical']))
+
+    stats = {
+        'episodes': len(episodes),
+        'tags': len(counts),
+        'candidate_pairs': len(candidates),
+        'all_pairs': len(counts) * (len(counts) - 1) // 2,
+        'merged_pairs': len(accepted),
+    }
+    return clusters, stats
+
+def proposed_mappings(clusters):
+    """variant -> canonical entries for every non-canonical cluster member"""
+    proposals = {}
+    for cluster in clusters:
+        for tag in cluster['members']:
+            if tag != cluster['canonical']:
+                proposals[tag] = cluster['canonical']
+    return proposals
+
+if __name__ == '__main__':
+    import sys
+
+    input_file = 'episodes_batch.json'
+    threshold = SIMILARITY_THRESHOLD
+    json_file = None
+
+    if '--input' in sys.argv:
+        input_file = sys.argv[sys.argv.index('--input') + 1]
+    if '--threshold' in sys.argv:
+        threshold = float(sys.argv[sys.argv.index('--threshold') + 1])
+    if '--json' in sys.argv:
+        json_file = sys.argv[sys.argv.index('--json') + 1]
+
+    with open(input_file, 'r', encoding='utf-8') as f:
+        episodes = json.load(f)
+
+    clusters, stats = cluster_tags(episodes, threshold=threshold)
+    proposals = proposed_mappings(clusters)
+
+    print(f"\n{'='*80}")
+    print("TAG CLUSTERS")
+    print(f"{'='*80}\n")
+    print(f"Episodes:               {stats['episodes']}")
+    print(f"Unique tags:            {stats['tags']}")
+    print(f"Candidate pairs (LSH):  {stats['candidate_pairs']:,} of {stats['all_pairs']:,}")
+    print(f"Merged pairs:           {stats['merged_pairs']}")
+    print(f"Clusters:               {len(clusters)}\n")
+
+    for cluster in clusters:
+        members = ', '.join(f"{tag} ({count})" for tag, count in cluster['members'].items())
+        print(f"  {cluster['canonical']:30s} ← {members}")
+
+    if proposals:
+        # Proposed entries must keep the mapping table acyclic
+        compile_tag_mappings({**TAG_MAPPINGS, **proposals})
+
+        print(f"\nProposed TAG_MAPPINGS entries (review before adding to cleanup_tags.py):\n")
+        print("    # Near-duplicates found by cluster_tags.py")
+        for variant, canonical in sorted(proposals.items(), key=lambda item: (item[1], item[0])):
+            print(f"    '{variant}': '{canonical}',")
+    else:
+        print("\n✓ No near-duplicate tags found")
+
+    if json_file:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump({'stats': stats, 'clusters': clusters, 'proposed_mappings': proposals},
+                      f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Saved clusters to: {json_file}")
+
+    print(f"\n{'='*80}\n")
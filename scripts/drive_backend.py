@@ -0,0 +1,381 @@
+"""
+Pluggable Drive backends for the batch processor
+
+A backend connects once and then hands out service objects with the subset
+of the Drive v3 API the scripts use: files().list (query, orderBy,
+pagination), files().export_media, files().get_media and changes().
+
+    GoogleDriveBackend   the real Drive, through a service account
+    LocalDriveBackend    a local directory laid out like the Drive folder,
+                         with optional injected latency and errors, so
+                         ingestion can be run and benchmarked offline
+
+Local directory layout (same as the Drive folder):
+
+    corpus/
+        07 - Sam Thompson/
+            Transcript.gdoc          exported as text/plain (a Google Doc)
+            thumbnail.jpg
+        08 - Jane Doe/
+            Transcript.txt
+            art/cover.png            thumbnails may sit in a subfolder
+"""
+
+import hashlib
+import mimetypes
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+from drive_cache import FOLDER_MIME_TYPE
+
+SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+SERVICE_ACCOUNT_FILE = 'service_account.json'
+
+GOOGLE_DOC_MIME_TYPE = 'application/vnd.google-apps.document'
+
+# Local files with this extension stand in for Google Docs
+GOOGLE_DOC_EXTENSION = '.gdoc'
+
+LOCAL_ROOT_ID = 'root'
+LOCAL_PAGE_SIZE = 100  # Drive's default page size
+MAX_PAGE_SIZE = 1000
+
+def authenticate_google_drive(service_account_file=SERVICE_ACCOUNT_FILE):
+    """Authenticate with Google Drive API using Service Account"""
+    if not os.path.exists(service_account_file):
+        print(f"\n❌ ERROR: {service_account_file} not found")
+        return None
+
+    try:
+        from google.oauth2 import service_account
+
+        creds = service_account.Credentials.from_service_account_file(
+            service_account_file, scopes=SCOPES)
+        return creds
+    except Exception as e:
+        print(f"\n❌ ERROR: Failed to load service account credentials: {str(e)}\n")
+        return None
+
+def media_downloader(fd, request, chunk_size):
+    """Chunked downloader for a media request (backends may supply their own)"""
+    if hasattr(request, 'downloader'):
+        return request.downloader(fd, chunk_size)
+
+    from googleapiclient.http import MediaIoBaseDownload
+
+    return MediaIoBaseDownload(fd, request, chunksize=chunk_size)
+
+class GoogleDriveBackend:
+    """The real Google Drive (google-api-python-client + a service account)"""
+
+    def __init__(self, folder_id, service_account_file=SERVICE_ACCOUNT_FILE):
+        self.root_id = folder_id
+        self.service_account_file = service_account_file
+        self.name = 'Google Drive'
+        self.creds = None
+
+    def connect(self):
+        self.creds = authenticate_google_drive(self.service_account_file)
+        return self.creds is not None
+
+    def service(self):
+        """A new Drive service (httplib2 is not thread-safe: one per thread)"""
+        from googleapiclient.discovery import build
+
+        return build('drive', 'v3', credentials=self.creds)
+
+class LocalDriveError(Exception):
+    """Error from the local backend, with an HTTP status like googleapiclient's HttpError"""
+
+    def __init__(self, status_code, message):
+        super().__init__(f"HTTP {status_code}: {message}")
+        self.status_code = status_code
+
+class LocalDriveBackend:
+    """
+    A directory served through the Drive API subset the scripts use
+
+    Args:
+        root: Directory standing in for the Drive folder
+        latency: Seconds added to every request (list page, changes page,
+            media chunk)
+        page_size: Maximum files per list page (requests may ask for fewer)
+        error_rate: Fraction of requests failing with a transient 503
+    """
+
+    def __init__(self, root, latency=0.0, page_size=LOCAL_PAGE_SIZE, error_rate=0.0):
+        self.root = os.path.abspath(root)
+        self.root_id = LOCAL_ROOT_ID
+        self.name = f"local directory {root}"
+        self.latency = latency
+        self.page_size = page_size
+        self.error_rate = error_rate
+        self.lock = threading.Lock()
+        self.paths = {LOCAL_ROOT_ID: self.root}
+        self.change_log = []
+        self.calls = {'list': 0, 'media_chunks': 0, 'changes': 0}
+        self.files = self.scan()
+
+    def connect(self):
+        return os.path.isdir(self.root)
+
+    def service(self):
+        return LocalDriveService(self)
+
+    def request(self, kind):
+        """Account for one request: count it, wait out the latency, maybe fail"""
+        with self.lock:
+            self.calls[kind] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            raise LocalDriveError(503, 'injected backend error')
+
+    def file_id(self, path):
+        return hashlib.sha1(os.path.relpath(path, self.root).encode('utf-8')).hexdigest()[:16]
+
+    def scan(self):
+        """File dicts of the whole directory tree, keyed by id"""
+        files = {}
+        paths = {LOCAL_ROOT_ID: self.root}
+
+        def walk(path, parent_id):
+            for name in sorted(os.listdir(path)):
+                full_path = os.path.join(path, name)
+                stat = os.stat(full_path)
+                file_id = self.file_id(full_path)
+                is_dir = os.path.isdir(full_path)
+                modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+
+                if is_dir:
+                    mime_type = FOLDER_MIME_TYPE
+                elif name.endswith(GOOGLE_DOC_EXTENSION):
+                    mime_type = GOOGLE_DOC_MIME_TYPE
+                else:
+                    mime_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+                file = {
+                    'id': file_id,
+                    'name': name,
+                    'mimeType': mime_type,
+                    'parents': [parent_id],
+                    'trashed': False,
+                    'modifiedTime': modified.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z',
+                }
+                if not is_dir:
+                    file['size'] = str(stat.st_size)
+                    # Like Drive, Google Docs have no md5Checksum
+                    if mime_type != GOOGLE_DOC_MIME_TYPE:
+                        with open(full_path, 'rb') as f:
+                            file['md5Checksum'] = hashlib.md5(f.read()).hexdigest()
+
+                files[file_id] = file
+                paths[file_id] = full_path
+                if is_dir:
+                    walk(full_path, file_id)
+
+        walk(self.root, LOCAL_ROOT_ID)
+        self.paths = paths
+        return files
+
+    def rescan(self):
+        """Pick up edits to the directory as entries of the changes feed"""
+        with self.lock:
+            old_files = self.files
+            self.files = self.scan()
+            for file_id, file in self.files.items():
+                if old_files.get(file_id) != file:
+                    self.change_log.append({'fileId': file_id, 'removed': False, 'file': dict(file)})
+            for file_id in old_files:
+                if file_id not in self.files:
+                    self.change_log.append({'fileId': file_id, 'removed': True})
+
+    def read(self, file_id):
+        path = self.paths.get(file_id)
+        if not path or not os.path.isfile(path):
+            raise LocalDriveError(404, f"File not found: {file_id}")
+        with open(path, 'rb') as f:
+            return f.read()
+
+class LocalDriveService:
+    """Service object of a LocalDriveBackend (cheap; one per thread is fine)"""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def files(self):
+        return LocalFiles(self.backend)
+
+    def changes(self):
+        return LocalChanges(self.backend)
+
+class LocalCall:
+    """Deferred request, run by execute() like a googleapiclient HttpRequest"""
+
+    def __init__(self, run):
+        self.run = run
+
+    def execute(self, num_retries=0):
+        return self.run()
+
+class LocalFiles:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def list(self, q='', fields=None, orderBy=None, pageSize=LOCAL_PAGE_SIZE, pageToken=None, **kwargs):
+        def run():
+            self.backend.request('list')
+            matches = parse_query(q)
+            files = [file for file in self.backend.files.values() if matches(file)]
+            files.sort(key=lambda file: (file['name'], file['id']))
+
+            start = int(pageToken or 0)
+            size = min(pageSize or LOCAL_PAGE_SIZE, self.backend.page_size, MAX_PAGE_SIZE)
+            result = {'files': [dict(file) for file in files[start:start + size]]}
+            if start + size < len(files):
+                result['nextPageToken'] = str(start + size)
+            return result
+
+        return LocalCall(run)
+
+    def export_media(self, fileId, mimeType):
+        return LocalMediaRequest(self.backend, fileId)
+
+    def get_media(self, fileId):
+        return LocalMediaRequest(self.backend, fileId)
+
+class LocalChanges:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def getStartPageToken(self):
+        def run():
+            self.backend.request('changes')
+            self.backend.rescan()
+            return {'startPageToken': str(len(self.backend.change_log))}
+
+        return LocalCall(run)
+
+    def list(self, pageToken, pageSize=LOCAL_PAGE_SIZE, **kwargs):
+        def run():
+            self.backend.request('changes')
+            self.backend.rescan()
+            log = self.backend.change_log
+            start = int(pageToken)
+            result = {'changes': log[start:start + pageSize]}
+            if start + pageSize < len(log):
+                result['nextPageToken'] = str(start + pageSize)
+            else:
+                result['newStartPageToken'] = str(len(log))
+            return result
+
+        return LocalCall(run)
+
+class LocalMediaRequest:
+    def __init__(self, backend, file_id):
+        self.backend = backend
+        self.file_id = file_id
+
+    def execute(self):
+        self.backend.request('media_chunks')
+        return self.backend.read(self.file_id)
+
+    def downloader(self, fd, chunk_size):
+        return LocalMediaDownload(fd, self, chunk_size)
+
+class LocalMediaDownload:
+    """Same interface as MediaIoBaseDownload: next_chunk() -> (progress, done)"""
+
+    def __init__(self, fd, request, chunk_size):
+        self.fd = fd
+        self.request = request
+        self.chunk_size = chunk_size
+        self.offset = 0
+        self.data = None
+
+    def next_chunk(self):
+        self.request.backend.request('media_chunks')
+        if self.data is None:
+            self.data = self.request.backend.read(self.request.file_id)
+
+        chunk = self.data[self.offset:self.offset + self.chunk_size]
+        self.fd.write(chunk)
+        self.offset += len(chunk)
+        done = self.offset >= len(self.data)
+        return (self.offset / len(self.data) if self.data else 1.0), done
+
+def parse_query(q):
+    """
+    Compile a Drive query into a predicate over file dicts
+
+    Supports what the scripts send: `'<id>' in parents`, `field = 'value'`,
+    `field != 'value'`, `field contains 'text'`, true/false literals,
+    and/or and parentheses.
+    """
+    tokens = re.findall(r"\(|\)|'(?:[^'\\]|\\.)*'|!=|=|[A-Za-z_]+", q or '')
+    position = [0]
+
+    def peek():
+        return tokens[position[0]] if position[0] < len(tokens) else None
+
+    def take():
+        token = peek()
+        if token is None:
+            raise ValueError(f"Unexpected end of query: {q}")
+        position[0] += 1
+        return token
+
+    def literal(token):
+        if token.startswith("'"):
+            return token[1:-1].replace("\\'", "'")
+        return token == 'true'
+
+    def term():
+        if peek() == '(':
+            take()
+            predicate = expression()
+            if take() != ')':
+                raise ValueError(f"Unbalanced parentheses: {q}")
+            return predicate
+
+        left = take()
+        if left.startswith("'"):
+            if take() != 'in' or take() != 'parents':
+                raise ValueError(f"Unsupported query term: {q}")
+            value = literal(left)
+            return lambda file: value in file.get('parents', [])
+
+        operator = take()
+        value = literal(take())
+        if operator == 'contains':
+            return lambda file: str(value).lower() in str(file.get(left, '')).lower()
+        if operator == '=':
+            return lambda file: file.get(left) == value
+        if operator == '!=':
+            return lambda file: file.get(left) != value
+        raise ValueError(f"Unsupported operator {operator}: {q}")
+
+    def conjunction():
+        predicates = [term()]
+        while peek() == 'and':
+            take()
+            predicates.append(term())
+        return lambda file: all(predicate(file) for predicate in predicates)
+
+    def expression():
+        predicates = [conjunction()]
+        while peek() == 'or':
+            take()
+            predicates.append(conjunction())
+        return lambda file: any(predicate(file) for predicate in predicates)
+
+    if not tokens:
+        return lambda file: True
+    predicate = expression()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()} in query: {q}")
+    return predicate
@@ -0,0 +1,328 @@
+"""
+Google Drive folder listing: batched tree listing and a persistent cache
+
+list_folder_tree() lists many folders per files().list request.
+DriveListingCache keeps an on-disk copy of the whole DRIVE_FOLDER_ID tree
+(ids, names, mimeTypes, modifiedTime, md5Checksum) and keeps it current
+with Drive's changes feed, so a run only pays for what changed since the
+last one instead of re-listing everything.
+
+Episode folders reported as changed stay in the cache's `pending` set until
+the caller marks them processed, so changes that did not fit in a batch (or
+whose run was interrupted) are picked up by the next run.
+
+Usage:
+    python3 drive_cache.py            # Sync the cache and print what changed
+    python3 drive_cache.py --rebuild  # Discard the cache and re-list from scratch
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+from request_executor import RequestExecutor, run_request
+
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Folder tree listing: parents OR'd per files().list query (keeps q short)
+PARENTS_PER_QUERY = 40
+TREE_FILE_FIELDS = 'id, name, mimeType, parents, modifiedTime, md5Checksum, size'
+
+# Persistent listing cache
+DRIVE_CACHE_FILE = 'drive_listing_cache.json'
+DRIVE_CACHE_VERSION = 1
+CACHE_TREE_DEPTH = 3  # root -> episode folders -> files -> subfolder files
+CHANGE_FIELDS = f"nextPageToken, newStartPageToken, changes(fileId, removed, file({TREE_FILE_FIELDS}, trashed))"
+
+def list_children(service, folder_ids, rate_limiter=None):
+    """
+    List the children of many folders with as few requests as possible
+
+    Folder ids are OR'd into one `in parents` query per PARENTS_PER_QUERY
+    folders, and each query is paginated.
+
+    Returns:
+        Dict of folder_id -> list of child file dicts (sorted by name)
+    """
+    children = {folder_id: [] for folder_id in folder_ids}
+    folder_ids = list(children)
+
+    for start in range(0, len(folder_ids), PARENTS_PER_QUERY):
+        batch = folder_ids[start:start + PARENTS_PER_QUERY]
+        parents = ' or '.join(f"'{folder_id}' in parents" for folder_id in batch)
+        query = f"({parents}) and trashed=false"
+        page_token = None
+
+        while True:
+            results = run_request(rate_limiter, service.files().list(
+                q=query,
+                fields=f"nextPageToken, files({TREE_FILE_FIELDS})",
+                orderBy="name",
+                pageSize=1000,
+                pageToken=page_token
+            ).execute)
+
+            for file in results.get('files', []):
+                for parent in file.get('parents', []):
+                    if parent in children:
+                        children[parent].append(file)
+
+            page_token = results.get('nextPageToken')
+            if not page_token:
+                break
+
+    return children
+
+def list_folder_tree(service, folder_ids, depth=2, rate_limiter=None):
+    """
+    Build an in-memory folder -> files map for folders and their subfolders
+
+    Args:
+        service: Google Drive service
+        folder_ids: Top-level folders to list (e.g. the episode folders of a batch)
+        depth: Levels to descend (2 = episode folders and their subfolders)
+        rate_limiter: Shared TokenBucket or RequestExecutor
+
+    Returns:
+        Dict of folder_id -> list of child file dicts
+    """
+    folder_tree = {}
+    level = list(folder_ids)
+
+    for _ in range(depth):
+        if not level:
+            break
+        children = list_children(service, level, rate_limiter)
+        folder_tree.update(children)
+        level = [file['id']
+                 for files in children.values()
+                 for file in files
+                 if file['mimeType'] == FOLDER_MIME_TYPE and file['id'] not in folder_tree]
+
+    return folder_tree
+
+class DriveListingCache:
+    """On-disk copy of the Drive folder tree under one root folder"""
+
+    def __init__(self, root_id, cache_file=DRIVE_CACHE_FILE):
+        self.root_id = root_id
+        self.cache_file = cache_file
+        self.files = {}  # file_id -> file dict (TREE_FILE_FIELDS)
+        self.start_page_token = None
+        self.synced_at = None
+        self.pending = set()  # changed episode folder ids not yet reprocessed
+        self._children = None
+        self.load()
+
+    def load(self):
+        """Load the cache file; a missing, stale or unreadable cache starts empty"""
+        if not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable Drive cache: {str(e)}")
+            return
+
+        if data.get('version') != DRIVE_CACHE_VERSION or data.get('root_id') != self.root_id:
+            return
+
+        self.files = data.get('files', {})
+        self.start_page_token = data.get('start_page_token')
+        self.synced_at = data.get('synced_at')
+        self.pending = set(data.get('pending', []))
+        self._children = None
+
+    def save(self):
+        """Write the cache atomically (temp file + rename)"""
+        data = {
+            'version': DRIVE_CACHE_VERSION,
+            'root_id': self.root_id,
+            'start_page_token': self.start_page_token,
+            'synced_at': self.synced_at,
+            'pending': sorted(self.pending),
+            'files': self.files,
+        }
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, self.cache_file)
+
+    def clear(self):
+        # Pending folders are kept: they still need reprocessing after a re-list
+        self.files = {}
+        self.start_page_token = None
+        self.synced_at = None
+        self._children = None
+
+    def sync(self, service, rate_limiter=None):
+        """
+        Bring the cache up to date with Drive
+
+        The first sync lists the whole tree; later syncs only read the
+        changes feed from the stored start page token. Changed episode
+        folders are added to `pending`, which is saved with the cache.
+
+        Returns:
+            Set of episode folder ids changed and not yet marked processed
+            (including those left over from earlier syncs), or None after a
+            full listing without pending folders (everything is new)
+        """
+        if not self.start_page_token:
+            # Take the token before listing so no change made during the listing is missed
+            start = run_request(rate_limiter, service.changes().getStartPageToken().execute)
+            self.start_page_token = start['startPageToken']
+
+            folder_tree = list_folder_tree(service, [self.root_id], CACHE_TREE_DEPTH, rate_limiter)
+            self.files = {file['id']: file for files in folder_tree.values() for file in files}
+            self._children = None
+            self._touch()
+            self.prune_pending()
+            return set(self.pending) if self.pending else None
+
+        changed_files = []
+        page_token = self.start_page_token
+        while page_token:
+            results = run_request(rate_limiter, service.changes().list(
+                pageToken=page_token,
+                fields=CHANGE_FIELDS,
+                pageSize=1000,
+                includeRemoved=True,
+                spaces='drive'
+            ).execute)
+
+            changed_files.extend(results.get('changes', []))
+            if results.get('newStartPageToken'):
+                self.start_page_token = results['newStartPageToken']
+            page_token = results.get('nextPageToken')
+
+        changed_ids = set()
+        for change in changed_files:
+            changed_ids.update(self.apply_change(change))
+
+        # Drop whatever is no longer reachable from the root (moved out,
+        # parent deleted, or never part of this tree)
+        self.prune()
+        self._touch()
+
+        for file_id in changed_ids:
+            episode_folder = self.episode_folder_of(file_id)
+            if episode_folder:
+                self.pending.add(episode_folder)
+        self.prune_pending()
+        return set(self.pending)
+
+    def prune_pending(self):
+        """Forget pending folders that are no longer episode folders"""
+        self.pending &= {folder['id'] for folder in self.episode_folders()}
+
+    def mark_processed(self, folder_id):
+        """Clear a changed folder once its episode record has been written"""
+        self.pending.discard(folder_id)
+
+    def apply_change(self, change):
+        """
+        Apply one changes().list entry
+
+        Returns:
+            Ids whose subtree changed (the file itself, old and new parents)
+        """
+        file_id = change['fileId']
+        old = self.files.get(file_id)
+        file = change.get('file')
+        touched = {file_id}
+        if old:
+            touched.update(old.get('parents', []))
+
+        if change.get('removed') or not file or file.get('trashed'):
+            self.files.pop(file_id, None)
+        else:
+            file = {key: value for key, value in file.items() if key != 'trashed'}
+            self.files[file_id] = file
+            touched.update(file.get('parents', []))
+
+        self._children = None
+        return touched
+
+    def prune(self):
+        """Remove entries that are not descendants of the root folder"""
+        reachable = set()
+        stack = [self.root_id]
+        children = self.children_map()
+        while stack:
+            folder_id = stack.pop()
+            for file in children.get(folder_id, []):
+                if file['id'] not in reachable:
+                    reachable.add(file['id'])
+                    stack.append(file['id'])
+
+        if len(reachable) != len(self.files):
+            self.files = {file_id: file for file_id, file in self.files.items() if file_id in reachable}
+            self._children = None
+
+    def _touch(self):
+        self.synced_at = datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+    def children_map(self):
+        """Folder id -> children sorted by name (same shape as list_folder_tree)"""
+        if self._children is None:
+            children = {}
+            for file in self.files.values():
+                for parent in file.get('parents', []):
+                    children.setdefault(parent, []).append(file)
+            for files in children.values():
+                files.sort(key=lambda file: (file['name'], file['id']))
+            self._children = children
+        return self._children
+
+    def folder_tree(self):
+        """Folder -> files map for every cached folder, for get_*_from_folder()"""
+        children = self.children_map()
+        return {file_id: children.get(file_id, [])
+                for file_id, file in self.files.items()
+                if file['mimeType'] == FOLDER_MIME_TYPE}
+
+    def episode_folders(self):
+        """Episode folders (direct subfolders of the root), sorted by name"""
+        return [file for file in self.children_map().get(self.root_id, [])
+                if file['mimeType'] == FOLDER_MIME_TYPE]
+
+    def episode_folder_of(self, file_id):
+        """The episode folder containing file_id (or file_id itself), if any"""
+        seen = set()
+        while file_id in self.files and file_id not in seen:
+            seen.add(file_id)
+            parents = self.files[file_id].get('parents', [])
+            if self.root_id in parents:
+                return file_id
+            if not parents:
+                return None
+            file_id = parents[0]
+        return None
+
+if __name__ == '__main__':
+    import sys
+
+    from drive_backend import GoogleDriveBackend
+    from google_drive_batch_with_thumbnails import DRIVE_FOLDER_ID
+
+    backend = GoogleDriveBackend(DRIVE_FOLDER_ID)
+    if not backend.connect():
+        sys.exit(1)
+
+    cache = DriveListingCache(DRIVE_FOLDER_ID)
+    if '--rebuild' in sys.argv:
+        cache.clear()
+
+    changed = cache.sync(backend.service(), RequestExecutor(max_concurrency=1, name='Drive'))
+    cache.save()
+
+    folders = {folder['id']: folder['name'] for folder in cache.episode_folders()}
+    print(f"✓ {len(cache.files)} files cached, {len(folders)} episode folders ({cache.cache_file})")
+    if changed is None:
+        print("✓ Full listing (no previous cache)")
+    else:
+        print(f"✓ {len(changed)} changed episode folders not yet reprocessed")
+        for folder_id in sorted(changed, key=lambda folder_id: folders.get(folder_id, '')):
+            print(f"  - {folders.get(folder_id, folder_id)}")
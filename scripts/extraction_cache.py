@@ -0,0 +1,237 @@
+"""
+Persistent response cache for EpisodeExtractor metadata extraction
+
+Each extraction costs an LLM call (~$0.05). Results are cached on disk under
+a key built from everything that determines the output: the transcript, the
+thumbnail bytes, the folder name, the model and the prompt version. A
+re-run after a crash, schema tweak or data wipe then returns the stored
+metadata instantly. The cache is size-bounded (least recently used entries
+are evicted) and keeps hit/miss/dollars-saved statistics.
+
+    extraction_cache/
+        stats.json                      lifetime hits, misses, dollars saved
+        entries/ab/abcdef....json       one cached extraction
+
+Usage:
+    python3 extraction_cache.py              # Stats report
+    python3 extraction_cache.py --clear      # Delete every entry
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+EXTRACTION_CACHE_DIR = 'extraction_cache'
+EXTRACTION_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Bump when the extraction prompt/schema changes so old results are not reused
+PROMPT_VERSION = '1'
+
+# Estimated cost of one extraction call (used when a hit saves one)
+COST_PER_EXTRACTION = 0.05
+
+def file_sha256(path):
+    """SHA-256 of a file, or None if there is no file"""
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_key(folder_name, transcript_text, thumbnail_path, model, prompt_version):
+    """Cache key covering every input of an extraction"""
+    parts = {
+        'folder_name': folder_name,
+        'transcript_sha256': hashlib.sha256(transcript_text.encode('utf-8')).hexdigest(),
+        'thumbnail_sha256': file_sha256(thumbnail_path),
+        'model': model,
+        'prompt_version': prompt_version,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+class ExtractionCache:
+    """On-disk extraction results with LRU eviction and hit/miss statistics"""
+
+    def __init__(self, cache_dir=EXTRACTION_CACHE_DIR, max_bytes=EXTRACTION_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.entries_dir = self.cache_dir / 'entries'
+        self.stats_file = self.cache_dir / 'stats.json'
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.session = {'hits': 0, 'misses': 0, 'dollars_saved': 0.0, 'evicted': 0}
+        self.lifetime = self.load_stats()
+        self._total_bytes = None  # Running size estimate; a full scan only happens when over budget
+
+    def load_stats(self):
+        stats = {'hits': 0, 'misses': 0, 'dollars_saved': 0.0, 'evicted': 0}
+        if self.stats_file.exists():
+            try:
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    stats.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+        return stats
+
+    def save_stats(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        with self.lock:
+            stats = dict(self.lifetime)
+        tmp_file = f"{self.stats_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+        os.replace(tmp_file, self.stats_file)
+
+    def entry_path(self, key):
+        return self.entries_dir / key[:2] / f"{key}.json"
+
+    def _count(self, field, amount=1):
+        with self.lock:
+            self.session[field] += amount
+            self.lifetime[field] += amount
+
+    def get(self, key):
+        """Cached metadata for a key (None on a miss); counts the hit/miss"""
+        path = self.entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count('misses')
+            return None
+
+        # Touch the entry: mtime is the LRU clock used for eviction
+        os.utime(path)
+        self._count('hits')
+        self._count('dollars_saved', entry.get('cost', COST_PER_EXTRACTION))
+        return entry['metadata']
+
+    def put(self, key, metadata, cost=COST_PER_EXTRACTION):
+        """Store an extraction result, then evict old entries over max_bytes"""
+        path = self.entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': metadata, 'cost': cost, 'stored_at': time.time()}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self.entries())
+            else:
+                self._total_bytes += path.stat().st_size
+            over_budget = self._total_bytes > self.max_bytes
+
+        if over_budget:
+            self.evict()
+
+    def entries(self):
+        """(path, size, last_used) of every entry"""
+        if not self.entries_dir.exists():
+            return []
+        result = []
+        for path in self.entries_dir.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            result.append((path, stat.st_size, stat.st_mtime))
+        return result
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        with self.lock:
+            self._total_bytes = total
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for path, size, _ in sorted(entries, key=lambda entry: entry[2]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self.lock:
+            self._total_bytes = total
+        self._count('evicted', evicted)
+        return evicted
+
+    def clear(self):
+        removed = 0
+        for path, _, _ in self.entries():
+            path.unlink()
+            removed += 1
+        self._total_bytes = 0
+        return removed
+
+    def report(self):
+        """Print session and lifetime statistics"""
+        entries = self.entries()
+        size_mb = sum(size for _, size, _ in entries) / 1024 / 1024
+
+        def line(label, stats):
+            lookups = stats['hits'] + stats['misses']
+            hit_rate = 100 * stats['hits'] / lookups if lookups else 0
+            return (f"{label}{stats['hits']} hits, {stats['misses']} misses ({hit_rate:.0f}% hit rate), "
+                    f"${stats['dollars_saved']:.2f} saved, {stats['evicted']} evicted")
+
+        print(f"🗄️  Extraction cache: {len(entries)} entries, {size_mb:.1f} MB "
+              f"(max {self.max_bytes / 1024 / 1024:.0f} MB) in {self.cache_dir}/")
+        print(line("   This run: ", self.session))
+        print(line("   Lifetime: ", self.lifetime))
+
+class CachedExtractor:
+    """
+    Drop-in wrapper for EpisodeExtractor that answers repeated extractions
+    from an ExtractionCache
+
+    The model and prompt version are read from the extractor's `model` and
+    `prompt_version` attributes when it has them.
+    """
+
+    def __init__(self, extractor, cache, model=None, prompt_version=PROMPT_VERSION):
+        self.extractor = extractor
+        self.cache = cache
+        self.model = model or getattr(extractor, 'model', None)
+        self.prompt_version = getattr(extractor, 'prompt_version', prompt_version)
+
+    def process_episode_folder(self, folder_name, transcript_text, thumbnail_path=None):
+        key = cache_key(folder_name, transcript_text, thumbnail_path, self.model, self.prompt_version)
+
+        metadata = self.cache.get(key)
+        if metadata is not None:
+            return metadata
+
+        metadata = self.extractor.process_episode_folder(
+            folder_name=folder_name,
+            transcript_text=transcript_text,
+            thumbnail_path=thumbnail_path
+        )
+        # Failed extractions are not cached so they are retried next run
+        if metadata:
+            self.cache.put(key, metadata)
+        return metadata
+
+    def __getattr__(self, name):
+        return getattr(self.extractor, name)
+
+if __name__ == '__main__':
+    import sys
+
+    cache = ExtractionCache()
+    if '--clear' in sys.argv:
+        print(f"✓ Removed {cache.clear()} cached extractions")
+    cache.report()
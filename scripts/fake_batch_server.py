@@ -0,0 +1,213 @@
+"""
+Local stand-in for the Message Batches API
+
+Serves the three endpoints batch_extraction.py uses (create, retrieve,
+results) from memory, so batch mode can be exercised without an API key or
+real spend. Replies come from a responder function that receives each
+request's Messages API params and returns the assistant's text.
+
+Usage:
+    python3 fake_batch_server.py                          # http://127.0.0.1:8765
+    python3 fake_batch_server.py --port 9000 --processing-time 10 --reply '{}'
+
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 python3 google_drive_batch_with_thumbnails.py 20 --batch
+"""
+
+import itertools
+import json
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+class FakeBatchServer:
+    """
+    In-memory Message Batches endpoint on a background thread
+
+    Args:
+        responder: Callable(params) -> reply text; an exception makes that
+            request 'errored' (default: reply '{}')
+        processing_time: Seconds a batch stays 'in_progress' before it ends
+        port: Port to listen on (0 picks a free one)
+    """
+
+    def __init__(self, responder=None, processing_time=0.0, host='127.0.0.1', port=0):
+        self.responder = responder or (lambda params: '{}')
+        self.processing_time = processing_time
+        self.batches = {}
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def create(self, requests):
+        with self.lock:
+            batch_id = f"msgbatch_fake{next(self.ids):06d}"
+            self.batches[batch_id] = {
+                'requests': requests,
+                'created': time.monotonic(),
+                'created_at': now_iso(),
+                'results': None,
+            }
+        return self.batch_object(batch_id)
+
+    def batch_object(self, batch_id):
+        batch = self.batches[batch_id]
+        ended = time.monotonic() - batch['created'] >= self.processing_time
+        if ended and batch['results'] is None:
+            batch['results'] = [self.result_for(request) for request in batch['requests']]
+            batch['ended_at'] = now_iso()
+
+        counts = {'processing': len(batch['requests']), 'succeeded': 0, 'errored': 0, 'canceled': 0, 'expired': 0}
+        if ended:
+            counts['processing'] = 0
+            for line in batch['results']:
+                counts[line['result']['type']] += 1
+
+        return {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'ended' if ended else 'in_progress',
+            'request_counts': counts,
+            'created_at': batch['created_at'],
+            'ended_at': batch.get('ended_at'),
+            'results_url': f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def result_for(self, request):
+        params = request.get('params', {})
+        try:
+            text = self.responder(params)
+        except Exception as e:
+            return {
+                'custom_id': request['custom_id'],
+                'result': {'type': 'errored', 'error': {'type': 'error', 'error': {
+                    'type': 'api_error', 'message': str(e)}}},
+            }
+
+        return {
+            'custom_id': request['custom_id'],
+            'result': {'type': 'succeeded', 'message': {
+                'id': f"msg_{request['custom_id']}",
+                'type': 'message',
+                'role': 'assistant',
+                'model': params.get('model', 'fake'),
+                'content': [{'type': 'text', 'text': text}],
+                'stop_reason': 'end_turn',
+                'usage': {
+                    # Rough token counts (~4 characters per token)
+                    'input_tokens': len(json.dumps(params.get('messages', []))) // 4,
+                    'output_tokens': len(text) // 4,
+                },
+            }},
+        }
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def send_json(self, status, body, content_type='application/json'):
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def error(self, status, error_type, message):
+                self.send_json(status, {'type': 'error', 'error': {'type': error_type, 'message': message}})
+
+            def authorized(self):
+                if not self.headers.get('x-api-key'):
+                    self.error(401, 'authentication_error', 'x-api-key header is required')
+                    return False
+                return True
+
+            def do_POST(self):
+                if not self.authorized():
+                    return
+                if self.path != '/v1/messages/batches':
+                    return self.error(404, 'not_found_error', self.path)
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                    requests = body['requests']
+                except (ValueError, KeyError):
+                    return self.error(400, 'invalid_request_error', 'body must be {"requests": [...]}')
+                if not requests or any(not re.fullmatch(r'[a-zA-Z0-9_-]{1,64}', r.get('custom_id', ''))
+                                       for r in requests):
+                    return self.error(400, 'invalid_request_error', 'every request needs a valid custom_id')
+                self.send_json(200, server.create(requests))
+
+            def do_GET(self):
+                if not self.authorized():
+                    return
+                match = re.fullmatch(r'/v1/messages/batches/([^/]+)(/results)?', self.path)
+                if not match or match.group(1) not in server.batches:
+                    return self.error(404, 'not_found_error', self.path)
+
+                with server.lock:
+                    batch = server.batch_object(match.group(1))
+                    results = server.batches[match.group(1)]['results']
+
+                if not match.group(2):
+                    return self.send_json(200, batch)
+                if results is None:
+                    return self.error(400, 'invalid_request_error', 'batch is still processing')
+                lines = ''.join(json.dumps(line) + '\n' for line in results)
+                self.send_json(200, lines.encode('utf-8'), 'application/x-jsonl')
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+if __name__ == '__main__':
+    import sys
+
+    args = sys.argv[1:]
+
+    port = DEFAULT_PORT
+    if '--port' in args:
+        port = int(args[args.index('--port') + 1])
+
+    processing_time = 0.0
+    if '--processing-time' in args:
+        processing_time = float(args[args.index('--processing-time') + 1])
+
+    reply = '{}'
+    if '--reply' in args:
+        reply = args[args.index('--reply') + 1]
+
+    server = FakeBatchServer(lambda params: reply, processing_time, port=port)
+    print(f"✓ Fake Message Batches API on {server.base_url} (batches end after {processing_time:g}s)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -1,21 +1,42 @@
 """
 Batch process episodes directly from Google Drive
 Automatically downloads transcripts, thumbnails, and processes metadata
+
+Usage:
+    python3 google_drive_batch_with_thumbnails.py [batch_size]
+    python3 google_drive_batch_with_thumbnails.py 50 --workers 4 --rps 4
+    python3 google_drive_batch_with_thumbnails.py 20 --no-cache   # Re-list Drive instead of syncing the cache
+    python3 google_drive_batch_with_thumbnails.py 20 --chunk-size 4194304   # Download chunk size (bytes)
+    python3 google_drive_batch_with_thumbnails.py 20 --no-optimize   # Skip thumbnail variants
+    python3 google_drive_batch_with_thumbnails.py 20 --no-extract-cache   # Always call the LLM
+    python3 google_drive_batch_with_thumbnails.py 500 --batch   # Backfill: one Message Batches job
+    python3 google_drive_batch_with_thumbnails.py 500 --batch --poll-interval 60
+    python3 google_drive_batch_with_thumbnails.py 20 --chunked   # Long transcripts: parallel chunk extraction
+    python3 google_drive_batch_with_thumbnails.py 20 --chunked --chunk-words 3000
+
+Every run writes per-stage timings as a Chrome trace next to the output
+file (episodes_batch.trace.json) and prints p50/p95 per stage.
 """
 
 import os
-import io
+import hashlib
 import json
-import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload
-
-from extract_episode_metadata import EpisodeExtractor
 
-# Google Drive API scopes
-SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
+from drive_backend import GoogleDriveBackend, media_downloader
+from drive_cache import DRIVE_CACHE_FILE, FOLDER_MIME_TYPE, DriveListingCache, list_folder_tree
+from rate_limiter import TokenBucket
+from stage_timer import StageTimer, timed
+from request_executor import RequestExecutor, RetryingExtractor, run_request
+import optimize_thumbnails
+from extraction_cache import COST_PER_EXTRACTION, EXTRACTION_CACHE_DIR, CachedExtractor, ExtractionCache
+from transcript_store import TRANSCRIPT_STORE_DIR, TranscriptStore, source_for, transcript_record
+from chunked_extraction import CHUNK_WORDS, CHUNK_WORKERS, ChunkedExtractor
+from batch_extraction import (ANTHROPIC_API_URL, BATCH_DISCOUNT, BATCH_POLL_INTERVAL, BatchError,
+                              MessageBatchClient, extract_in_batch)
 
 # Your Google Drive folder ID
 DRIVE_FOLDER_ID = '1RneILflekH6dK4qk6j5nZ0eqlZbj-5Gr'
@@ -23,39 +44,34 @@ DRIVE_FOLDER_ID = '1RneILflekH6dK4qk6j5nZ0eqlZbj-5Gr'
 # Thumbnail storage directory
 THUMBNAILS_DIR = '../resources/episodes/thumbnails'
 
-def authenticate_google_drive():
-    """Authenticate with Google Drive API using Service Account"""
-    service_account_file = 'service_account.json'
+# Media downloads are streamed to disk in chunks of this size (--chunk-size)
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
 
-    if not os.path.exists(service_account_file):
-        print("\n❌ ERROR: service_account.json not found")
-        return None
+# Concurrent ingestion defaults (overridable with --workers / --rps)
+DEFAULT_WORKERS = 1
+DEFAULT_REQUESTS_PER_SECOND = 4.0
 
-    try:
-        creds = service_account.Credentials.from_service_account_file(
-            service_account_file, scopes=SCOPES)
-        return creds
-    except Exception as e:
-        print(f"\n❌ ERROR: Failed to load service account credentials: {str(e)}\n")
-        return None
+# Extraction pricing (USD per million tokens) for the measured cost line;
+# COST_PER_EXTRACTION is only used when the extractor reports no token usage
+PRICE_PER_MILLION_TOKENS = {'input_tokens': 3.00, 'output_tokens': 15.00}
 
-def get_episode_folders(service, folder_id):
+def get_episode_folders(service, folder_id, rate_limiter=None):
     """Get ALL episode folders from Google Drive (with pagination)"""
     print(f"\n📁 Fetching episode folders from Google Drive...")
 
     folders = []
     page_token = None
 
-    query = f"'{folder_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
+    query = f"'{folder_id}' in parents and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
 
     while True:
-        results = service.files().list(
+        results = run_request(rate_limiter, service.files().list(
             q=query,
             fields="nextPageToken, files(id, name)",
             orderBy="name",
             pageSize=1000,  # Max allowed by API
             pageToken=page_token
-        ).execute()
+        ).execute)
 
         folders.extend(results.get('files', []))
         page_token = results.get('nextPageToken')
@@ -66,85 +82,93 @@ def get_episode_folders(service, folder_id):
     print(f"✓ Found {len(folders)} episode folders")
     return folders
 
-def get_transcript_from_folder(service, folder_id, folder_name):
-    """Get transcript file from an episode folder"""
-    try:
-        query = f"'{folder_id}' in parents and trashed=false and (name contains 'transcript' or name contains 'Transcript')"
-        results = service.files().list(
-            q=query,
-            fields="files(id, name, mimeType)"
-        ).execute()
-
-        files = results.get('files', [])
+def get_transcript_from_folder(folder_tree, folder_id):
+    """Get transcript file from an episode folder listing"""
+    files = [file for file in folder_tree.get(folder_id, [])
+             if 'transcript' in file['name'].lower() and file['mimeType'] != FOLDER_MIME_TYPE]
 
-        if not files:
-            return None
-
-        # Prefer Google Doc, then text file
-        transcript_file = None
-        for file in files:
-            if 'google-apps.document' in file['mimeType']:
-                transcript_file = file
-                break
-            elif 'text/plain' in file['mimeType']:
-                transcript_file = file
-
-        if not transcript_file:
-            transcript_file = files[0]
-
-        return transcript_file
-
-    except Exception as e:
-        print(f"  ✗ Error finding transcript: {str(e)}")
+    if not files:
         return None
 
-def get_thumbnail_from_folder(service, folder_id, folder_name):
-    """Get thumbnail image from an episode folder (searches recursively in subfolders)"""
-    try:
-        # First, look for image files directly in the episode folder
-        query = f"'{folder_id}' in parents and trashed=false and (mimeType contains 'image/')"
-        results = service.files().list(
-            q=query,
-            fields="files(id, name, mimeType)",
-            pageSize=5
-        ).execute()
+    # Prefer Google Doc, then text file
+    transcript_file = None
+    for file in files:
+        if 'google-apps.document' in file['mimeType']:
+            transcript_file = file
+            break
+        elif 'text/plain' in file['mimeType']:
+            transcript_file = file
 
-        files = results.get('files', [])
+    if not transcript_file:
+        transcript_file = files[0]
 
-        if files:
-            return files[0]
+    return transcript_file
 
-        # If no images found directly, look in subfolders
-        # First get all subfolders
-        query = f"'{folder_id}' in parents and trashed=false and mimeType='application/vnd.google-apps.folder'"
-        subfolders = service.files().list(
-            q=query,
-            fields="files(id, name)"
-        ).execute()
+def get_thumbnail_from_folder(folder_tree, folder_id):
+    """
+    Get thumbnail image from an episode folder listing (falls back to subfolders)
 
-        subfolder_list = subfolders.get('files', [])
+    Returns:
+        (image file dict, subfolder dict it was found in or None), or (None, None)
+    """
+    files = folder_tree.get(folder_id, [])
 
-        # Search for images in each subfolder
-        for subfolder in subfolder_list:
-            query = f"'{subfolder['id']}' in parents and trashed=false and (mimeType contains 'image/')"
-            results = service.files().list(
-                q=query,
-                fields="files(id, name, mimeType)",
-                pageSize=5
-            ).execute()
+    # First, look for image files directly in the episode folder
+    for file in files:
+        if file['mimeType'].startswith('image/'):
+            return file, None
 
-            files = results.get('files', [])
-            if files:
-                print(f"    Found in subfolder: {subfolder['name']}")
-                return files[0]
+    # If no images found directly, look in subfolders
+    for subfolder in files:
+        if subfolder['mimeType'] != FOLDER_MIME_TYPE:
+            continue
+        for file in folder_tree.get(subfolder['id'], []):
+            if file['mimeType'].startswith('image/'):
+                return file, subfolder
+
+    return None, None
+
+def file_md5(path, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """MD5 hex digest of a local file (same format as Drive's md5Checksum)"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stream_download(request, dest_path, chunk_size=DOWNLOAD_CHUNK_SIZE, rate_limiter=None):
+    """
+    Stream a Drive media request to disk, one chunk at a time
+
+    Chunks go to a temp file next to dest_path, which is renamed over
+    dest_path only once the download is complete, so an interrupted
+    download never leaves a truncated file behind. Each chunk is a
+    separate request; a failed chunk is retried from where it stopped.
+
+    Returns:
+        Number of bytes written
+    """
+    dest_dir = os.path.dirname(dest_path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=dest_dir, prefix=f".{os.path.basename(dest_path)}.", suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            downloader = media_downloader(f, request, chunk_size)
 
-        return None
+            done = False
+            while not done:
+                status, done = run_request(rate_limiter, downloader.next_chunk)
 
-    except Exception as e:
-        print(f"  ⚠️  Error finding thumbnail: {str(e)}")
-        return None
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return os.path.getsize(dest_path)
 
-def download_transcript(service, file_id, mime_type):
+def download_transcript(service, file_id, mime_type, rate_limiter=None, chunk_size=DOWNLOAD_CHUNK_SIZE):
     """Download transcript content from Google Drive"""
     try:
         if 'google-apps.document' in mime_type:
@@ -155,23 +179,29 @@ def download_transcript(service, file_id, mime_type):
         else:
             request = service.files().get_media(fileId=file_id)
 
-        file_stream = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_stream, request)
-
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
-
-        file_stream.seek(0)
-        content = file_stream.read().decode('utf-8', errors='ignore')
+        with tempfile.TemporaryDirectory(prefix='transcript-') as tmp_dir:
+            tmp_path = os.path.join(tmp_dir, f"{file_id}.txt")
+            stream_download(request, tmp_path, chunk_size, rate_limiter)
+            with open(tmp_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
         return content
 
     except Exception as e:
         print(f"  ✗ Error downloading transcript: {str(e)}")
         return None
 
-def download_thumbnail(service, file_id, file_name, episode_number, thumbnails_dir):
-    """Download thumbnail image from Google Drive"""
+def download_thumbnail(service, file_id, file_name, episode_number, thumbnails_dir, rate_limiter=None,
+                       md5_checksum=None, chunk_size=DOWNLOAD_CHUNK_SIZE):
+    """
+    Download thumbnail image from Google Drive
+
+    Args:
+        md5_checksum: Drive's md5Checksum for the file; when the local copy
+            has the same checksum the download is skipped
+
+    Returns:
+        (local path or None, True if the local copy was already up to date)
+    """
     try:
         # Create thumbnails directory if it doesn't exist
         Path(thumbnails_dir).mkdir(parents=True, exist_ok=True)
@@ -183,183 +213,616 @@ def download_thumbnail(service, file_id, file_name, episode_number, thumbnails_d
         local_filename = f"{episode_number}{extension}"
         local_path = Path(thumbnails_dir) / local_filename
 
-        # Download the file
+        # Skip unchanged images entirely
+        if md5_checksum and local_path.exists() and file_md5(local_path, chunk_size) == md5_checksum:
+            return str(local_path), True
+
+        # Stream the file to disk
         request = service.files().get_media(fileId=file_id)
-        file_stream = io.BytesIO()
-        downloader = MediaIoBaseDownload(file_stream, request)
+        stream_download(request, str(local_path), chunk_size, rate_limiter)
+
+        return str(local_path), False
+
+    except Exception as e:
+        print(f"  ⚠️  Error downloading thumbnail: {str(e)}")
+        return None, False
+
+def journal_path_for(output_file):
+    """Checkpoint journal kept next to the output file (episodes_batch.journal.jsonl)"""
+    base, _ = os.path.splitext(output_file)
+    return f"{base}.journal.jsonl"
+
+def trace_path_for(output_file):
+    """Stage timing trace written next to the output file (episodes_batch.trace.json)"""
+    base, _ = os.path.splitext(output_file)
+    return f"{base}.trace.json"
+
+def open_journal(journal_file):
+    """Open the journal for appending, first terminating a torn last line"""
+    if os.path.exists(journal_file) and os.path.getsize(journal_file):
+        with open(journal_file, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+    return open(journal_file, 'a', encoding='utf-8')
+
+def append_journal(journal, record):
+    """Append one episode record to an open journal and fsync it"""
+    journal.write(json.dumps(record, ensure_ascii=False) + '\n')
+    journal.flush()
+    os.fsync(journal.fileno())
+
+def read_journal(journal_file):
+    """Records from a checkpoint journal; a torn line from a crash mid-write is skipped"""
+    records = []
+    if not os.path.exists(journal_file):
+        return records
+
+    with open(journal_file, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                print(f"⚠️  Skipping unreadable line {line_number} of {journal_file}")
+    return records
+
+def compact_journal(output_file, journal_file, episodes_data):
+    """Write the full episode array atomically, then drop the journal it supersedes"""
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(episodes_data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+    if os.path.exists(journal_file):
+        os.remove(journal_file)
+
+def load_existing_episodes(output_file, journal_file):
+    """
+    Episodes already processed with AI metadata, by episode number
+
+    Reads the compacted output file, then replays the checkpoint journal
+    left by an interrupted run (journal records win).
+
+    Returns:
+        (dict of episode number -> episode, True if a journal was replayed)
+    """
+    existing_episodes = {}
+
+    def add(ep):
+        ep_num = ep.get('Episode #', '').strip()
+        # Only consider episodes with meaningful AI metadata as "processed"
+        if ep_num and ep.get('Episode Summary') and len(ep.get('Episode Summary', '')) > 50:
+            existing_episodes[ep_num] = ep
+
+    if os.path.exists(output_file):
+        try:
+            with open(output_file, 'r', encoding='utf-8') as f:
+                existing_data = json.load(f)
+            # Index by episode number for quick lookup
+            for ep in existing_data:
+                add(ep)
+            print(f"\n✓ Loaded {len(existing_data)} existing episodes")
+        except Exception as e:
+            print(f"\n⚠️  Could not load existing data: {str(e)}")
+
+    journal_records = read_journal(journal_file)
+    for ep in journal_records:
+        add(ep)
+    if journal_records:
+        print(f"✓ Recovered {len(journal_records)} episodes from checkpoint journal {journal_file}")
+
+    print(f"✓ Found {len(existing_episodes)} episodes already processed with AI metadata")
+    return existing_episodes, bool(journal_records)
+
+def thread_local_factory(factory):
+    """Wrap a factory so each worker thread lazily gets its own instance"""
+    local = threading.local()
+
+    def get():
+        if not hasattr(local, 'value'):
+            local.value = factory()
+        return local.value
+
+    return get
+
+def prepare_episode(service, folder, folder_tree, rate_limiter=None,
+                    chunk_size=DOWNLOAD_CHUNK_SIZE, transcript_store=None, timer=None,
+                    thumbnails_dir=THUMBNAILS_DIR):
+    """
+    Fetch the transcript and thumbnail of one episode folder
+
+    Args:
+        service: Google Drive service (not shared between threads)
+        folder: Drive folder dict with 'id' and 'name'
+        folder_tree: Folder -> files map from list_folder_tree()
+        rate_limiter: Shared RequestExecutor (or TokenBucket) every Drive
+            request goes through
+        chunk_size: Download chunk size in bytes
+        transcript_store: TranscriptStore; transcripts already stored from the
+            same Drive revision are read locally, new downloads are added
+        timer: Optional StageTimer recording each stage of the episode
+        thumbnails_dir: Where thumbnails are saved (as <episode number>.<ext>)
+
+    Returns:
+        (dict with the extraction inputs or None, list of log lines)
+    """
+    folder_name = folder['name']
+    folder_id = folder['id']
+    log = []
+
+    # Extract episode number from folder name (e.g., "07 - Sam Thompson" -> "07")
+    episode_number = folder_name.split(' - ')[0].strip()
+    guest_name = folder_name.split(' - ', 1)[1].strip() if ' - ' in folder_name else ''
+
+    try:
+        # Get transcript file
+        transcript_file = get_transcript_from_folder(folder_tree, folder_id)
+
+        if not transcript_file:
+            log.append(f"  ⚠️  No transcript found")
+            return None, log
+
+        log.append(f"  📄 Found: {transcript_file['name']}")
+
+        # Read the transcript from the local store if it holds this Drive revision
+        source = source_for(transcript_file)
+        transcript = None
+        if transcript_store is not None and transcript_store.matches_source(episode_number, source):
+            with timed(timer, 'transcript export', episode_number, source='store'):
+                transcript = transcript_store.get_text(episode_number)
+            if transcript:
+                log.append(f"  ✓ Transcript from local store ({len(transcript)} characters)")
+
+        if transcript is None:
+            # Download transcript
+            with timed(timer, 'transcript export', episode_number, source='drive'):
+                transcript = download_transcript(
+                    service,
+                    transcript_file['id'],
+                    transcript_file['mimeType'],
+                    rate_limiter,
+                    chunk_size
+                )
+
+            if not transcript or len(transcript) < 100:
+                log.append(f"  ⚠️  Transcript too short or empty")
+                return None, log
+
+            log.append(f"  ✓ Downloaded transcript ({len(transcript)} characters)")
+            if timer is not None:
+                timer.add_bytes('transcript export', len(transcript.encode('utf-8')))
+
+            if transcript_store is not None:
+                transcript_store.put(transcript_record(episode_number, transcript, guest_name=guest_name), source)
+
+        # Get and download thumbnail
+        with timed(timer, 'thumbnail search', episode_number):
+            thumbnail_file, subfolder = get_thumbnail_from_folder(folder_tree, folder_id)
+        thumbnail_path = None
+
+        if thumbnail_file:
+            if subfolder:
+                log.append(f"    Found in subfolder: {subfolder['name']}")
+            log.append(f"  🖼️  Found: {thumbnail_file['name']}")
+
+            with timed(timer, 'thumbnail download', episode_number):
+                thumbnail_path, unchanged = download_thumbnail(
+                    service,
+                    thumbnail_file['id'],
+                    thumbnail_file['name'],
+                    episode_number,
+                    thumbnails_dir,
+                    rate_limiter,
+                    md5_checksum=thumbnail_file.get('md5Checksum'),
+                    chunk_size=chunk_size
+                )
+
+            if thumbnail_path and unchanged:
+                log.append(f"  ✓ Thumbnail unchanged ({thumbnail_path})")
+            elif thumbnail_path:
+                log.append(f"  ✓ Downloaded thumbnail to {thumbnail_path}")
+                if timer is not None:
+                    timer.add_bytes('thumbnail download', os.path.getsize(thumbnail_path))
+        else:
+            log.append(f"  ⚠️  No thumbnail found")
 
-        done = False
-        while not done:
-            status, done = downloader.next_chunk()
+        return {
+            'folder_name': folder_name,
+            'episode_number': episode_number,
+            'guest_name': guest_name,
+            'transcript': transcript,
+            'thumbnail_path': thumbnail_path,
+            'source': source,
+        }, log
+
+    except Exception as e:
+        log.append(f"  ✗ Error processing episode: {str(e)}")
+        return None, log
+
+def store_metadata(transcript_store, episode, metadata):
+    """Fill in the README fields of a stored transcript from extracted metadata"""
+    if transcript_store is None:
+        return
+    transcript_store.put(transcript_record(
+        episode['episode_number'],
+        episode['transcript'],
+        episode_title=metadata.get('Episode Title', ''),
+        guest_name=metadata.get('Guest Name') or episode['guest_name'],
+        business_name=metadata.get('Business Name', ''),
+        duration=metadata.get('Episode Duration', ''),
+        date=metadata.get('Episode Date', '')
+    ), episode['source'])
+
+def process_episode(service, extractor, folder, folder_tree, rate_limiter=None,
+                    chunk_size=DOWNLOAD_CHUNK_SIZE, transcript_store=None, timer=None,
+                    thumbnails_dir=THUMBNAILS_DIR):
+    """
+    Download and extract metadata for one episode folder
+
+    Args:
+        extractor: EpisodeExtractor instance (wrapped in a RetryingExtractor
+            to retry throttled calls)
+        (the other arguments are those of prepare_episode())
+
+    Returns:
+        (metadata or None, list of log lines)
+    """
+    episode, log = prepare_episode(service, folder, folder_tree, rate_limiter, chunk_size, transcript_store,
+                                   timer, thumbnails_dir)
+    if not episode:
+        return None, log
+
+    try:
+        # Process episode
+        with timed(timer, 'extraction', episode['episode_number']):
+            metadata = extractor.process_episode_folder(
+                folder_name=episode['folder_name'],
+                transcript_text=episode['transcript'],
+                thumbnail_path=episode['thumbnail_path']
+            )
 
-        # Save to disk
-        file_stream.seek(0)
-        with open(local_path, 'wb') as f:
-            f.write(file_stream.read())
+        if metadata:
+            log.append(f"  ✓ Metadata extracted ({len(metadata)} fields)")
+            store_metadata(transcript_store, episode, metadata)
+            return metadata, log
 
-        return str(local_path)
+        log.append(f"  ✗ Failed to extract metadata")
+        return None, log
 
     except Exception as e:
-        print(f"  ⚠️  Error downloading thumbnail: {str(e)}")
-        return None
+        log.append(f"  ✗ Error processing episode: {str(e)}")
+        return None, log
+
+def process_episodes_in_batch(pool, prepare, folders, extractor, client, extraction_cache=None,
+                              transcript_store=None, poll_interval=BATCH_POLL_INTERVAL, timer=None):
+    """
+    Prepare every folder, then extract all of them with one Message Batches job
+
+    Args:
+        pool: Executor the downloads run on
+        prepare: Callable(folder) -> prepare_episode() result
+        folders: Episode folders to process
+        extractor: EpisodeExtractor (needs build_request()/parse_response())
+        client: MessageBatchClient
+        extraction_cache: Cached episodes are not submitted
+        transcript_store: Updated with the extracted README fields
+        poll_interval: Seconds between batch status checks
+        timer: Optional StageTimer; the whole batch job is one 'extraction'
+
+    Returns:
+        List of (metadata or None, list of log lines), aligned with folders
+    """
+    prepared = list(pool.map(prepare, folders))
+    episodes = [episode for episode, _ in prepared if episode]
+    print(f"✓ Prepared {len(episodes)}/{len(folders)} episodes for batch extraction")
 
-def process_batch_from_drive(batch_size=20, output_file='episodes_batch.json'):
-    """Process episodes directly from Google Drive"""
+    try:
+        with timed(timer, 'extraction', episodes=len(episodes), mode='batch'):
+            results = extract_in_batch(episodes, extractor, client, extraction_cache, poll_interval, timer=timer)
+    except BatchError as e:
+        print(f"❌ ERROR: Batch extraction failed: {str(e)}")
+        results = [(None, str(e))] * len(episodes)
+    results = iter(results)
+
+    outcomes = []
+    for episode, log in prepared:
+        if not episode:
+            outcomes.append((None, log))
+            continue
 
-    # Check for Anthropic API key
+        metadata, error = next(results)
+        if metadata:
+            log.append(f"  ✓ Metadata extracted ({len(metadata)} fields)")
+            store_metadata(transcript_store, episode, metadata)
+        else:
+            log.append(f"  ✗ Failed to extract metadata ({error})")
+        outcomes.append((metadata, log))
+
+    return outcomes
+
+def process_batch_from_drive(batch_size=20, output_file='episodes_batch.json',
+                             workers=DEFAULT_WORKERS, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                             use_cache=True, cache_file=DRIVE_CACHE_FILE,
+                             chunk_size=DOWNLOAD_CHUNK_SIZE, optimize=True,
+                             transcript_store_dir=TRANSCRIPT_STORE_DIR,
+                             extraction_cache_dir=EXTRACTION_CACHE_DIR,
+                             batch=False, batch_url=ANTHROPIC_API_URL,
+                             poll_interval=BATCH_POLL_INTERVAL, chunk_words=None,
+                             backend=None, extractor_factory=None, thumbnails_dir=THUMBNAILS_DIR):
+    """
+    Process episodes directly from Google Drive
+
+    Args:
+        batch_size: Maximum number of new episodes to process
+        output_file: Episode JSON file (also used to skip processed episodes)
+        workers: Episodes processed concurrently; Drive downloads and
+            extraction calls of different episodes overlap
+        requests_per_second: Shared API rate limit across all workers; Drive
+            and extraction calls are also retried with backoff on 429/5xx
+            and their concurrency adapts to throttling (request_executor.py)
+        use_cache: Use the persistent Drive listing cache (drive_cache.py);
+            episodes whose folders changed on Drive are reprocessed (changes
+            stay pending in the cache until their record is journaled)
+        cache_file: Listing cache location
+        chunk_size: Download chunk size in bytes (bounds memory per download)
+        optimize: Generate responsive thumbnail variants afterwards
+            (optimize_thumbnails.py; only new/changed images are processed)
+        transcript_store_dir: Local transcript store (transcript_store.py);
+            None disables it
+        extraction_cache_dir: Cache of extraction results (extraction_cache.py);
+            None disables it
+        batch: Download every episode first, then extract them all with one
+            asynchronous Message Batches job (batch_extraction.py): slower to
+            finish, but half the price and no per-request rate limit
+        batch_url: Message Batches endpoint (e.g. a fake_batch_server.py URL)
+        poll_interval: Seconds between batch status checks
+        chunk_words: Split transcripts longer than this many words into
+            overlapping chunks extracted in parallel and merged
+            (chunked_extraction.py); None sends whole transcripts.
+            Not used in batch mode
+        backend: Drive backend (drive_backend.py); defaults to the real
+            Google Drive folder DRIVE_FOLDER_ID, LocalDriveBackend serves a
+            local directory instead
+        extractor_factory: Callable(api_key) -> extractor; defaults to
+            EpisodeExtractor (extract_episode_metadata.py)
+        thumbnails_dir: Where thumbnails are saved
+    """
+
+    # Check for Anthropic API key (an injected extractor may not need one)
     api_key = os.getenv('ANTHROPIC_API_KEY')
-    if not api_key:
+    if not api_key and (extractor_factory is None or batch):
         print("❌ ERROR: ANTHROPIC_API_KEY environment variable not set")
         return
 
+    if extractor_factory is None:
+        try:
+            from extract_episode_metadata import EpisodeExtractor
+        except ImportError as e:
+            print(f"❌ ERROR: Could not load EpisodeExtractor: {str(e)}")
+            return
+        extractor_factory = EpisodeExtractor
+
+    batch_extractor = extractor_factory(api_key) if batch else None
+    if batch and not (hasattr(batch_extractor, 'build_request') and hasattr(batch_extractor, 'parse_response')):
+        print("❌ ERROR: --batch needs EpisodeExtractor.build_request() and parse_response()")
+        return
+
+    # Every stage of every episode is timed; written as a Chrome trace at the end
+    timer = StageTimer()
+
     # Authenticate with Google Drive
     print("\n" + "="*60)
     print("GOOGLE DRIVE AUTHENTICATION")
     print("="*60)
 
-    creds = authenticate_google_drive()
-    if not creds:
+    if backend is None:
+        backend = GoogleDriveBackend(DRIVE_FOLDER_ID)
+    if not backend.connect():
         return
 
-    service = build('drive', 'v3', credentials=creds)
-    print("✓ Successfully authenticated with Google Drive")
-
-    # Load existing episodes data to avoid reprocessing
-    existing_episodes = {}
-    if os.path.exists(output_file):
+    service = backend.service()
+    print(f"✓ Successfully connected to {backend.name}")
+
+    # Load existing episodes data (and any journal of an interrupted run) to avoid reprocessing
+    journal_file = journal_path_for(output_file)
+    existing_episodes, recovered = load_existing_episodes(output_file, journal_file)
+
+    # One token bucket shared by every worker replaces the fixed per-episode sleep;
+    # Drive and the LLM each get an executor that retries transient errors and
+    # backs off its concurrency when throttled
+    rate_limiter = TokenBucket(requests_per_second)
+    drive_executor = RequestExecutor(rate_limiter, max_concurrency=workers, name='Drive')
+    llm_executor = RequestExecutor(rate_limiter, name='Extraction',
+                                   max_concurrency=workers * (CHUNK_WORKERS if chunk_words else 1))
+
+    # Get episode folders: from the listing cache (synced through Drive's
+    # changes feed) or by listing the folder from scratch
+    cache = None
+    changed_folders = set()
+    if use_cache:
+        print(f"\n📁 Syncing Drive listing cache ({cache_file})...")
+        cache = DriveListingCache(backend.root_id, cache_file)
         try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                existing_data = json.load(f)
-                # Index by episode number for quick lookup
-                for ep in existing_data:
-                    ep_num = ep.get('Episode #', '').strip()
-                    # Only consider episodes with meaningful AI metadata as "processed"
-                    if ep_num and ep.get('Episode Summary') and len(ep.get('Episode Summary', '')) > 50:
-                        existing_episodes[ep_num] = ep
-                print(f"\n✓ Loaded {len(existing_data)} existing episodes")
-                print(f"✓ Found {len(existing_episodes)} episodes already processed with AI metadata")
+            with timed(timer, 'listing', source='changes feed'):
+                changed = cache.sync(service, drive_executor)
+            cache.save()
         except Exception as e:
-            print(f"\n⚠️  Could not load existing data: {str(e)}")
-
-    # Get episode folders
-    episode_folders = get_episode_folders(service, DRIVE_FOLDER_ID)
+            print(f"❌ ERROR: Failed to sync Drive listing: {str(e)}")
+            return
+        episode_folders = cache.episode_folders()
+        if changed is None:
+            print(f"✓ Full listing: {len(cache.files)} files cached")
+        else:
+            # Includes changes from earlier syncs that were never reprocessed
+            changed_folders = changed
+            print(f"✓ {len(changed_folders)} changed episode folders to reprocess")
+        print(f"✓ Found {len(episode_folders)} episode folders")
+    else:
+        with timed(timer, 'listing', source='episode folders'):
+            episode_folders = get_episode_folders(service, backend.root_id, drive_executor)
 
     if not episode_folders:
         print("❌ No episode folders found")
         return
 
-    # Filter out already processed episodes
+    # Filter out already processed episodes (unless their folder changed on Drive)
     folders_to_process = []
     for folder in episode_folders:
         folder_name = folder['name']
         # Extract episode number (e.g., "07 - Sam Thompson" -> "07")
         ep_num = folder_name.split(' - ')[0].strip()
-        if ep_num not in existing_episodes:
+        if ep_num not in existing_episodes or folder['id'] in changed_folders:
             folders_to_process.append(folder)
         if len(folders_to_process) >= batch_size:
             break
 
     if not folders_to_process:
+        if recovered:
+            compact_journal(output_file, journal_file, list(existing_episodes.values()))
         print("\n✓ All episodes already processed!")
         return
 
-    print(f"\n{'='*60}")
-    print(f"PROCESSING BATCH: {len(folders_to_process)} new episodes")
-    print(f"Skipping {len(existing_episodes)} already processed")
-    print(f"{'='*60}\n")
-
-    # Initialize extractor
-    extractor = EpisodeExtractor(api_key)
-    # Start with existing episodes
-    episodes_data = list(existing_episodes.values()) if existing_episodes else []
-    successful = 0
-    failed = 0
-
-    for i, folder in enumerate(folders_to_process, 1):
-        folder_name = folder['name']
-        folder_id = folder['id']
-
-        print(f"\n[{i}/{len(folders_to_process)}] {folder_name}")
-
+    # Changed episodes are reprocessed; their old record stays in the output
+    # until a new one is journaled, so a failed reprocess loses nothing
+    reprocessed = sum(folder['name'].split(' - ')[0].strip() in existing_episodes
+                      for folder in folders_to_process)
+
+    if cache:
+        # Transcript/thumbnail selection runs against the cached tree: no list requests
+        folder_tree = cache.folder_tree()
+    else:
+        # List every folder of the batch (and their subfolders) up front, so
+        # transcript/thumbnail selection needs no per-episode list requests
+        print(f"\n📂 Listing {len(folders_to_process)} episode folders...")
         try:
-            # Get transcript file
-            transcript_file = get_transcript_from_folder(service, folder_id, folder_name)
+            with timed(timer, 'listing', source='folder tree'):
+                folder_tree = list_folder_tree(
+                    service, [folder['id'] for folder in folders_to_process], rate_limiter=drive_executor)
+        except Exception as e:
+            print(f"❌ ERROR: Failed to list episode folders: {str(e)}")
+            return
+        print(f"✓ Listed {len(folder_tree)} folders, "
+              f"{sum(len(files) for files in folder_tree.values())} files")
 
-            if not transcript_file:
-                print(f"  ⚠️  No transcript found")
-                failed += 1
-                continue
+    workers = max(1, min(workers, len(folders_to_process)))
 
-            print(f"  📄 Found: {transcript_file['name']}")
+    print(f"\n{'='*60}")
+    print(f"PROCESSING BATCH: {len(folders_to_process) - reprocessed} new episodes")
+    if reprocessed:
+        print(f"Reprocessing {reprocessed} episodes changed on Drive")
+    print(f"Skipping {len(existing_episodes) - reprocessed} already processed")
+    print(f"Workers: {workers}  |  Rate limit: {requests_per_second:g} requests/s")
+    if batch:
+        print(f"Extraction: one Message Batches job ({batch_url})")
+    elif chunk_words:
+        print(f"Extraction: transcripts over {chunk_words} words split into parallel chunks")
+    print(f"{'='*60}\n")
 
-            # Download transcript
-            transcript = download_transcript(
-                service,
-                transcript_file['id'],
-                transcript_file['mimeType']
-            )
+    # The Drive client (httplib2) is not thread-safe, so every worker
+    # thread builds its own service and extractor on first use
+    if workers == 1:
+        get_service = lambda: service
+    else:
+        get_service = thread_local_factory(backend.service)
 
-            if not transcript or len(transcript) < 100:
-                print(f"  ⚠️  Transcript too short or empty")
-                failed += 1
-                continue
+    # Identical extraction inputs are answered from the on-disk cache;
+    # long transcripts are optionally extracted chunk by chunk
+    extraction_cache = ExtractionCache(extraction_cache_dir) if extraction_cache_dir else None
 
-            print(f"  ✓ Downloaded transcript ({len(transcript)} characters)")
+    extractors = []
 
-            # Get and download thumbnail
-            thumbnail_file = get_thumbnail_from_folder(service, folder_id, folder_name)
-            thumbnail_path = None
+    def new_retrying_extractor():
+        return RetryingExtractor(extractor_factory(api_key), llm_executor)
 
-            if thumbnail_file:
-                print(f"  🖼️  Found: {thumbnail_file['name']}")
+    def new_extractor():
+        if chunk_words:
+            # Chunks run on their own threads, each with its own extractor
+            extractor = ChunkedExtractor(new_retrying_extractor, chunk_words)
+        else:
+            extractor = new_retrying_extractor()
+        if extraction_cache:
+            extractor = CachedExtractor(extractor, extraction_cache)
+        extractors.append(extractor)
+        return extractor
 
-                # Extract episode number from folder name (e.g., "07 - Sam Thompson" -> "07")
-                episode_number = folder_name.split(' - ')[0].strip()
+    get_extractor = thread_local_factory(new_extractor)
 
-                thumbnail_path = download_thumbnail(
-                    service,
-                    thumbnail_file['id'],
-                    thumbnail_file['name'],
-                    episode_number,
-                    THUMBNAILS_DIR
-                )
+    transcript_store = TranscriptStore(transcript_store_dir) if transcript_store_dir else None
 
-                if thumbnail_path:
-                    print(f"  ✓ Downloaded thumbnail to {thumbnail_path}")
-            else:
-                print(f"  ⚠️  No thumbnail found")
+    def run(folder):
+        return process_episode(get_service(), get_extractor(), folder, folder_tree, drive_executor,
+                               chunk_size, transcript_store, timer, thumbnails_dir)
 
-            # Process episode
-            metadata = extractor.process_episode_folder(
-                folder_name=folder_name,
-                transcript_text=transcript,
-                thumbnail_path=thumbnail_path
-            )
+    def prepare(folder):
+        return prepare_episode(get_service(), folder, folder_tree, drive_executor, chunk_size,
+                               transcript_store, timer, thumbnails_dir)
 
-            if metadata:
-                episodes_data.append(metadata)
-                successful += 1
-                print(f"  ✓ Metadata extracted ({len(metadata)} fields)")
-            else:
-                failed += 1
-                print(f"  ✗ Failed to extract metadata")
+    # Start with existing episodes (by episode number; a reprocessed record replaces its old one)
+    episodes_by_number = dict(existing_episodes)
+    successful = 0
+    failed = 0
 
-        except Exception as e:
-            print(f"  ✗ Error processing episode: {str(e)}")
-            failed += 1
-            continue
+    # Progress is checkpointed by appending each episode to a JSONL journal
+    # (one fsync'd line per episode); the array file is written once at the end
+    with ThreadPoolExecutor(max_workers=workers) as pool, \
+            open_journal(journal_file) as journal:
+        if batch:
+            outcomes = process_episodes_in_batch(
+                pool, prepare, folders_to_process, batch_extractor,
+                MessageBatchClient(api_key, batch_url, executor=llm_executor),
+                extraction_cache, transcript_store, poll_interval, timer)
+        else:
+            futures = [pool.submit(run, folder) for folder in folders_to_process]
+            outcomes = (future.result() for future in futures)
 
-        # Rate limiting (be nice to APIs)
-        time.sleep(0.5)
+        # Collect in folder order so the output file and log are deterministic
+        # regardless of which worker finishes first
+        for i, (folder, (metadata, log)) in enumerate(zip(folders_to_process, outcomes), 1):
+            print(f"\n[{i}/{len(folders_to_process)}] {folder['name']}")
+            for line in log:
+                print(line)
 
-        # Save progress after each episode (in case of crash)
-        if episodes_data:
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(episodes_data, f, indent=2, ensure_ascii=False)
+            if not metadata:
+                failed += 1
+                continue
 
-    # Final save
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(episodes_data, f, indent=2, ensure_ascii=False)
+            episodes_by_number[folder['name'].split(' - ')[0].strip()] = metadata
+            successful += 1
+
+            # Save progress after each episode (in case of crash)
+            with timed(timer, 'checkpoint write', metadata.get('Episode #')):
+                append_journal(journal, metadata)
+            # Only a journaled record clears a folder's pending change
+            if cache:
+                cache.mark_processed(folder['id'])
+
+    # Final save: materialize the array file and drop the journal
+    episodes_data = list(episodes_by_number.values())
+    with timed(timer, 'checkpoint write', mode='compact'):
+        compact_journal(output_file, journal_file, episodes_data)
+        if cache:
+            cache.save()
+
+    if extraction_cache:
+        extraction_cache.save_stats()
+
+    # One index write for the whole batch, then drop the stored transcript
+    # records that were superseded during it
+    if transcript_store is not None:
+        transcript_store.save()
+        transcript_store.collect_garbage()
+
+    # Build the resized WebP/JPEG variants of any new thumbnails
+    if optimize and successful:
+        if optimize_thumbnails.Image is None:
+            print("\n⚠️  Pillow not installed - skipping thumbnail optimization")
+        else:
+            optimize_thumbnails.optimize_thumbnails(thumbnails_dir)
 
     print(f"\n{'='*60}")
     print(f"BATCH COMPLETE")
@@ -368,17 +831,72 @@ def process_batch_from_drive(batch_size=20, output_file='episodes_batch.json'):
     print(f"✗ Failed: {failed}")
     print(f"📊 Total episodes in file: {len(episodes_data)}")
     print(f"📁 Output: {output_file}")
-    print(f"🖼️  Thumbnails: {THUMBNAILS_DIR}")
-    print(f"\n💰 Estimated cost (this batch): ${successful * 0.05:.2f}")
-    print(f"⏱️  Time taken: ~{successful * 2} minutes\n")
+    print(f"🖼️  Thumbnails: {thumbnails_dir}")
+    if transcript_store is not None:
+        print(f"📝 Transcripts: {transcript_store_dir}/ ({len(transcript_store.entries)} stored)")
+
+    # Token usage: batch results carry it; synchronous extractors report it
+    # through a `usage` dict ({'input_tokens', 'output_tokens'}) when they keep one
+    if not batch:
+        for extractor in extractors:
+            timer.add_tokens(getattr(extractor, 'usage', None))
+
+    timer.report()
+    trace_file = trace_path_for(output_file)
+    timer.write_trace(trace_file)
+    print(f"🧭 Trace: {trace_file} (open in chrome://tracing or ui.perfetto.dev)")
+    print(f"🔁 {drive_executor.report()}")
+    print(f"🔁 {llm_executor.report()}")
+
+    discount = BATCH_DISCOUNT if batch else 1
+    if any(timer.tokens.values()):
+        cost = sum(timer.tokens[field] * price for field, price in PRICE_PER_MILLION_TOKENS.items()) / 1e6
+        print(f"\n💰 Cost (this batch, measured tokens): ${cost * discount:.2f}")
+    else:
+        cache_hits = extraction_cache.session['hits'] if extraction_cache else 0
+        print(f"\n💰 Estimated cost (this batch, no token usage reported): "
+              f"${(successful - cache_hits) * COST_PER_EXTRACTION * discount:.2f}")
+    if extraction_cache:
+        extraction_cache.report()
+
+    elapsed = timer.elapsed()
+    print(f"⏱️  Time taken: {elapsed / 60:.1f} minutes ({successful / elapsed * 60:.1f} episodes/minute)\n")
 
 if __name__ == "__main__":
     import sys
 
-    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    args = sys.argv[1:]
+
+    workers = DEFAULT_WORKERS
+    if '--workers' in args:
+        workers = int(args[args.index('--workers') + 1])
+
+    requests_per_second = DEFAULT_REQUESTS_PER_SECOND
+    if '--rps' in args:
+        requests_per_second = float(args[args.index('--rps') + 1])
+
+    chunk_size = DOWNLOAD_CHUNK_SIZE
+    if '--chunk-size' in args:
+        chunk_size = int(args[args.index('--chunk-size') + 1])
+
+    poll_interval = BATCH_POLL_INTERVAL
+    if '--poll-interval' in args:
+        poll_interval = float(args[args.index('--poll-interval') + 1])
+
+    chunk_words = None
+    if '--chunked' in args or '--chunk-words' in args:
+        chunk_words = CHUNK_WORDS
+    if '--chunk-words' in args:
+        chunk_words = int(args[args.index('--chunk-words') + 1])
+
+    batch_size = int(args[0]) if args and not args[0].startswith('--') else 20
 
     print("\n" + "="*60)
     print("NIKONOMICS PODCAST - BATCH PROCESSOR WITH THUMBNAILS")
     print("="*60)
 
-    process_batch_from_drive(batch_size)
+    process_batch_from_drive(batch_size, workers=workers, requests_per_second=requests_per_second,
+                             use_cache='--no-cache' not in args, chunk_size=chunk_size,
+                             optimize='--no-optimize' not in args,
+                             extraction_cache_dir=None if '--no-extract-cache' in args else EXTRACTION_CACHE_DIR,
+                             batch='--batch' in args, poll_interval=poll_interval, chunk_words=chunk_words)
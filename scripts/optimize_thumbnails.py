@@ -0,0 +1,249 @@
+"""
+Generate responsive, compressed variants of the episode thumbnails
+
+Every image in resources/episodes/thumbnails is resized to a few widths and
+saved as WebP and JPEG in thumbnails/optimized/. A manifest records the
+variants of each image (embedded by build_search_index.py so the episodes
+grid can use srcset) together with the source hash, so images that did not
+change are never reprocessed.
+
+Requires Pillow (pip install Pillow).
+
+Usage:
+    python3 optimize_thumbnails.py              # Process new/changed thumbnails
+    python3 optimize_thumbnails.py --force      # Reprocess everything
+    python3 optimize_thumbnails.py --workers 4  # Size of the process pool
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Checked in optimize_thumbnails()
+    Image = None
+
+THUMBNAILS_DIR = '../resources/episodes/thumbnails'
+OPTIMIZED_DIR = '../resources/episodes/thumbnails/optimized'
+THUMBNAIL_MANIFEST = f'{OPTIMIZED_DIR}/manifest.json'
+
+# URL prefix of OPTIMIZED_DIR as seen by the site (episodes.html is at the root)
+OPTIMIZED_URL = 'resources/episodes/thumbnails/optimized'
+
+# Episode cards are ~192-300px wide (full width on mobile)
+VARIANT_WIDTHS = [320, 640, 960]
+VARIANT_FORMATS = {
+    'webp': {'extension': 'webp', 'options': {'quality': 80, 'method': 6}},
+    'jpeg': {'extension': 'jpg', 'options': {'quality': 82, 'optimize': True, 'progressive': True}},
+}
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+
+# Bump when the resize/encode logic changes so every image is redone
+MANIFEST_VERSION = 1
+
+def source_hash(path):
+    """SHA-256 of a source image"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def variant_widths(source_width):
+    """Target widths for a source image (never upscaled)"""
+    widths = [width for width in VARIANT_WIDTHS if width < source_width]
+    if len(widths) < len(VARIANT_WIDTHS):
+        widths.append(source_width)
+    return widths
+
+def optimize_image(source_path, output_dir, content_hash):
+    """
+    Write all variants of one image (runs in a worker process)
+
+    Returns:
+        Manifest entry for the image
+    """
+    stem = Path(source_path).stem
+
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        variants = []
+        for width in variant_widths(image.width):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+            for fmt, settings in VARIANT_FORMATS.items():
+                output = resized
+                if fmt == 'jpeg' and has_alpha:
+                    # JPEG has no alpha channel: flatten onto white
+                    output = Image.new('RGB', resized.size, (255, 255, 255))
+                    output.paste(resized, mask=resized.getchannel('A'))
+
+                file_name = f"{stem}-{width}.{settings['extension']}"
+                output_path = os.path.join(output_dir, file_name)
+                tmp_path = f"{output_path}.tmp"
+                output.save(tmp_path, format=fmt.upper(), **settings['options'])
+                os.replace(tmp_path, output_path)
+
+                variants.append({
+                    'format': fmt,
+                    'width': width,
+                    'height': height,
+                    'file': file_name,
+                    'bytes': os.path.getsize(output_path),
+                })
+
+        return {
+            'source': os.path.basename(source_path),
+            'sha256': content_hash,
+            'width': image.width,
+            'height': image.height,
+            'bytes': os.path.getsize(source_path),
+            'variants': variants,
+        }
+
+def load_manifest(manifest_file):
+    """Previous manifest, or an empty one if missing/outdated"""
+    if os.path.exists(manifest_file):
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if (manifest.get('version') == MANIFEST_VERSION
+                    and manifest.get('widths') == VARIANT_WIDTHS
+                    and manifest.get('formats') == VARIANT_FORMATS):
+                return manifest
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable manifest: {str(e)}")
+
+    return {
+        'version': MANIFEST_VERSION,
+        'widths': VARIANT_WIDTHS,
+        'formats': VARIANT_FORMATS,
+        'base_url': OPTIMIZED_URL,
+        'images': {},
+    }
+
+def thumbnail_entry(image_entry):
+    """
+    Compact description of one manifest image, as embedded in the search
+    index episode rows; the client rebuilds the srcset URLs from it as
+    <base_url>/<name>-<width>.<extension>
+
+    Returns:
+        {'name', 'widths', 'width', 'height'} (width/height of the smallest variant)
+    """
+    smallest = min(image_entry['variants'], key=lambda variant: variant['width'])
+    return {
+        'name': Path(image_entry['source']).stem,
+        'widths': sorted({variant['width'] for variant in image_entry['variants']}),
+        'width': smallest['width'],
+        'height': smallest['height'],
+    }
+
+def srcset_bytes(image_entry):
+    """Size of the variant a 1x desktop card downloads (smallest WebP)"""
+    webps = [variant for variant in image_entry['variants'] if variant['format'] == 'webp']
+    return min(webps, key=lambda variant: variant['width'])['bytes'] if webps else image_entry['bytes']
+
+def optimize_thumbnails(thumbnails_dir=THUMBNAILS_DIR, output_dir=OPTIMIZED_DIR,
+                        manifest_file=THUMBNAIL_MANIFEST, workers=None, force=False):
+    """
+    Generate variants for new/changed thumbnails and write the manifest
+
+    Args:
+        thumbnails_dir: Source images (named by episode number, e.g. 07.jpg)
+        output_dir: Where variants are written
+        manifest_file: Manifest path (keyed by source file stem)
+        workers: Process pool size (default: CPU count)
+        force: Reprocess images even if their hash is unchanged
+
+    Returns:
+        Manifest dict, or None if Pillow is not installed
+    """
+    if Image is None:
+        print("❌ ERROR: Pillow is required (pip install Pillow)")
+        return None
+
+    print("\n" + "="*60)
+    print("OPTIMIZING THUMBNAILS")
+    print("="*60 + "\n")
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(manifest_file)
+    previous_images = {} if force else manifest['images']
+
+    sources = sorted(
+        path for path in Path(thumbnails_dir).iterdir()
+        if path.is_file() and path.suffix.lower() in SOURCE_EXTENSIONS
+    )
+
+    images = {}
+    pending = []
+    for path in sources:
+        if path.stem in images or any(path.stem == other.stem for other, _ in pending):
+            print(f"  ⚠️  Skipping {path.name}: another image is already named {path.stem}.*")
+            continue
+        content_hash = source_hash(path)
+        previous = previous_images.get(path.stem)
+        if (previous and previous['sha256'] == content_hash
+                and previous['source'] == path.name
+                and all(os.path.exists(os.path.join(output_dir, v['file'])) for v in previous['variants'])):
+            images[path.stem] = previous
+        else:
+            pending.append((path, content_hash))
+
+    print(f"✓ {len(sources)} thumbnails, {len(images)} unchanged, {len(pending)} to process")
+
+    failed = 0
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (path, pool.submit(optimize_image, str(path), output_dir, content_hash))
+                for path, content_hash in pending
+            ]
+            for path, future in futures:
+                try:
+                    images[path.stem] = future.result()
+                    print(f"  ✓ {path.name}")
+                except Exception as e:
+                    failed += 1
+                    print(f"  ✗ {path.name}: {str(e)}")
+
+    # Remove variants of images that were deleted or re-encoded under new names
+    keep = {variant['file'] for entry in images.values() for variant in entry['variants']}
+    removed = 0
+    for path in Path(output_dir).iterdir():
+        if path.is_file() and path.name != os.path.basename(manifest_file) and path.name not in keep:
+            path.unlink()
+            removed += 1
+
+    manifest['images'] = dict(sorted(images.items()))
+    tmp_file = f"{manifest_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_file, manifest_file)
+
+    source_bytes = sum(entry['bytes'] for entry in images.values())
+    card_bytes = sum(srcset_bytes(entry) for entry in images.values())
+
+    print(f"\n✓ Processed: {len(pending) - failed}, failed: {failed}, stale variants removed: {removed}")
+    print(f"✓ Originals:            {source_bytes / 1024 / 1024:.1f} MB")
+    print(f"✓ Smallest WebP (1x):   {card_bytes / 1024 / 1024:.1f} MB")
+    print(f"✓ Manifest: {manifest_file}\n")
+
+    return manifest
+
+if __name__ == '__main__':
+    import sys
+
+    workers = None
+    if '--workers' in sys.argv:
+        workers = int(sys.argv[sys.argv.index('--workers') + 1])
+
+    optimize_thumbnails(workers=workers, force='--force' in sys.argv)
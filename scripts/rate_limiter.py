@@ -0,0 +1,56 @@
+"""
+Shared rate limiting for API calls made by the batch scripts
+
+A single TokenBucket is shared by every worker thread, so the combined
+request rate stays under the limit no matter how many workers run.
+"""
+
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket: refills at `rate` tokens/second, holds up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            capacity: Maximum burst size (defaults to max(1, rate))
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them"""
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def try_acquire(self, tokens=1):
+        """Take `tokens` if available right now; returns True on success"""
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+def throttle(rate_limiter):
+    """Wait for a token from the shared rate limiter (no-op without one)"""
+    if rate_limiter is not None:
+        rate_limiter.acquire()
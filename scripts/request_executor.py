@@ -0,0 +1,216 @@
+"""
+Shared executor for Drive and LLM API calls
+
+Every request goes through RequestExecutor.call(), which:
+
+- waits for a token from the shared TokenBucket (requests per second)
+- waits for one of a limited number of in-flight slots; the limit adapts
+  with AIMD: +1 slot per window of successful requests, halved whenever the
+  API throttles us (429, Drive's 403 rateLimitExceeded)
+- retries transient failures (429, 5xx, dropped connections, timeouts) with
+  full-jitter exponential backoff, never sooner than the server's
+  Retry-After
+
+so a brief quota hiccup no longer turns into a failed episode.
+"""
+
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from rate_limiter import throttle
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+THROTTLE_STATUS = {429}
+
+# Drive reports quota errors as 403 with one of these reasons
+DRIVE_RATE_LIMIT_REASONS = (b'rateLimitExceeded', b'userRateLimitExceeded')
+
+# Connection-level errors from httplib2 / urllib / the anthropic client
+TRANSIENT_ERROR_NAMES = {'ServerNotFoundError', 'APIConnectionError', 'APITimeoutError', 'RemoteDisconnected'}
+
+MAX_RETRIES = 5
+BASE_DELAY = 1.0  # seconds; attempt n waits up to BASE_DELAY * 2**n
+MAX_DELAY = 60.0
+MAX_RETRY_AFTER = 300.0
+
+def error_status(error):
+    """HTTP status of an API exception (googleapiclient, anthropic, urllib, BatchError), or None"""
+    for attr in ('status_code', 'status', 'code'):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    resp = getattr(error, 'resp', None)
+    status = getattr(resp, 'status', None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def error_headers(error):
+    for headers in (getattr(error, 'headers', None),
+                    getattr(getattr(error, 'response', None), 'headers', None),
+                    getattr(error, 'resp', None)):
+        if headers is not None and hasattr(headers, 'get'):
+            return headers
+    return {}
+
+def retry_after(error):
+    """Seconds the server asked us to wait (Retry-After), or None"""
+    value = getattr(error, 'retry_after', None)
+    if value is None:
+        headers = error_headers(error)
+        value = headers.get('retry-after') or headers.get('Retry-After')
+    if value is None:
+        return None
+
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(MAX_RETRY_AFTER, max(0.0, seconds))
+
+def is_throttled(error):
+    """True if the API rejected the request for exceeding a rate limit"""
+    status = error_status(error)
+    if status in THROTTLE_STATUS:
+        return True
+    content = getattr(error, 'content', None)
+    return status == 403 and isinstance(content, bytes) and any(
+        reason in content for reason in DRIVE_RATE_LIMIT_REASONS)
+
+def is_retryable(error):
+    """True for throttling, server errors and connection problems"""
+    if is_throttled(error) or error_status(error) in RETRYABLE_STATUS:
+        return True
+    if isinstance(error, (ConnectionError, TimeoutError, socket.timeout)):
+        return True
+    return type(error).__name__ in TRANSIENT_ERROR_NAMES
+
+class RequestExecutor:
+    """
+    Thread-safe retry/backoff + adaptive concurrency for one API
+
+    Args:
+        rate_limiter: Optional TokenBucket (may be shared between executors)
+        max_concurrency: Upper bound on in-flight requests
+        min_concurrency: Lower bound the limit is never cut below
+        max_retries: Retries after the first attempt
+        name: Label for the stats line
+    """
+
+    def __init__(self, rate_limiter=None, max_concurrency=4, min_concurrency=1,
+                 max_retries=MAX_RETRIES, base_delay=BASE_DELAY, max_delay=MAX_DELAY, name='API'):
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.name = name
+
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+        self.stats = {'requests': 0, 'retries': 0, 'throttled': 0, 'gave_up': 0,
+                      'lowest_limit': self.max_concurrency}
+
+    def _acquire_slot(self):
+        """Wait for an in-flight slot; returns the time the request started"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            return time.monotonic()
+
+    def _release_slot(self, started, throttled=False):
+        with self.condition:
+            self.in_flight -= 1
+            if throttled:
+                # Multiplicative decrease; requests sent before the last cut
+                # saw the old limit, so their rejections don't cut again
+                if started >= self.last_decrease:
+                    self.limit = max(self.min_concurrency, self.limit / 2)
+                    self.last_decrease = time.monotonic()
+                    self.stats['lowest_limit'] = min(self.stats['lowest_limit'], int(self.limit))
+            else:
+                # Additive increase: about +1 slot per `limit` successful requests
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+            self.condition.notify_all()
+
+    def backoff(self, attempt, error):
+        """Full-jitter exponential delay, at least the server's Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        server_delay = retry_after(error)
+        return max(delay, server_delay) if server_delay is not None else delay
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs), retrying transient failures; re-raises anything else"""
+        attempt = 0
+        while True:
+            started = self._acquire_slot()
+            throttled = False
+            # The slot is released whatever fn raises (KeyboardInterrupt
+            # included), or the other workers would wait for it forever
+            try:
+                throttle(self.rate_limiter)
+                with self.condition:
+                    self.stats['requests'] += 1
+                return fn(*args, **kwargs)
+            except Exception as e:
+                throttled = is_throttled(e)
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    if is_retryable(e):
+                        with self.condition:
+                            self.stats['gave_up'] += 1
+                    raise
+                error = e
+            finally:
+                self._release_slot(started, throttled)
+
+            with self.condition:
+                self.stats['retries'] += 1
+                self.stats['throttled'] += throttled
+            time.sleep(self.backoff(attempt, error))
+            attempt += 1
+
+    def report(self):
+        stats = self.stats
+        return (f"{self.name}: {stats['requests']} requests, {stats['retries']} retries "
+                f"({stats['throttled']} throttled), {stats['gave_up']} gave up, concurrency "
+                f"{stats['lowest_limit']}-{self.max_concurrency} (now {int(self.limit)})")
+
+def run_request(executor, fn, *args, **kwargs):
+    """
+    Run one API call through a RequestExecutor (retries, adaptive
+    concurrency), a plain TokenBucket (throttling only), or nothing
+    """
+    if isinstance(executor, RequestExecutor):
+        return executor.call(fn, *args, **kwargs)
+    throttle(executor)
+    return fn(*args, **kwargs)
+
+class RetryingExtractor:
+    """Drop-in EpisodeExtractor wrapper that sends every extraction call through a RequestExecutor"""
+
+    def __init__(self, extractor, executor):
+        self.extractor = extractor
+        self.executor = executor
+
+    def process_episode_folder(self, folder_name, transcript_text, thumbnail_path=None):
+        return self.executor.call(
+            self.extractor.process_episode_folder,
+            folder_name=folder_name,
+            transcript_text=transcript_text,
+            thumbnail_path=thumbnail_path
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.extractor, name)
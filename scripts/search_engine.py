@@ -0,0 +1,351 @@
+"""
+Python reference implementation of the client-side episode search.
+
+Loads the search-index.json produced by build_search_index.py and mirrors
+the tokenize/score/filter behavior of resources/episodes/episode-search.js,
+so search quality and speed can be measured outside a browser.
+
+Usage:
+    python3 search_engine.py "saas marketing"                     # Run one query
+    python3 search_engine.py --benchmark benchmark_queries.txt     # Build + latency report
+    python3 search_engine.py --benchmark queries.txt --index search-index.json --repeat 50
+"""
+import base64
+import contextlib
+import io
+import json
+import math
+import os
+import re
+import tempfile
+import time
+
+from build_search_index import COMPACT_ENCODING, build_search_index, decode_varints
+
+class SearchEngine:
+    """Episode search over a built index (same results as EpisodeSearch in JS)"""
+
+    def __init__(self, search_index):
+        self.search_index = search_index
+        self.episodes = search_index['episodes']
+        self.index = search_index['index']
+        self.filters = search_index['filters']
+        self.encoding = search_index.get('metadata', {}).get('encoding')
+        self.bm25 = search_index.get('bm25')
+        self.tag_synonyms = search_index.get('tag_synonyms')
+        self.row_of = {ep['id']: row for row, ep in enumerate(self.episodes)}
+        self._decoded_postings = {}
+        self._tag_sets = {}
+        self._facet_sets = {}
+
+    @classmethod
+    def load(cls, index_path='search-index.json'):
+        """Load a single-file index (plain or compact encoding)"""
+        with open(index_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def tokenize(text):
+        """Tokenize a query like the JS client (its \\w only matches ASCII)"""
+        if not text:
+            return []
+        tokens = re.findall(r'\b[\w-]+\b', text.lower(), re.ASCII)
+        return [t for t in tokens if len(t) > 2]
+
+    def get_postings(self, token):
+        """Episode ids posted for a token, decoding compact lists on first use"""
+        postings = self.index.get(token)
+        if not postings:
+            return []
+        if self.encoding != COMPACT_ENCODING:
+            return postings
+
+        decoded = self._decoded_postings.get(token)
+        if decoded is None:
+            rows = decode_varints(base64.b64decode(postings))
+            decoded = [self.episodes[row]['id'] for row in rows]
+            self._decoded_postings[token] = decoded
+        return decoded
+
+    def get_episode_by_id(self, ep_id):
+        row = self.row_of.get(ep_id)
+        return None if row is None else self.episodes[row]
+
+    def search(self, query, industry=None, subcategory=None, limit=50):
+        """
+        Search episodes by query and optional filters
+
+        Returns:
+            List of episode dicts with 'score' and 'matchCount' added
+        """
+        # If no query and no filters, return all episodes
+        if not query and not industry and not subcategory:
+            return self.episodes[:limit]
+
+        query_tokens = self.tokenize(query)
+
+        # Find matching episode IDs for each token
+        matching_episode_ids = {}  # episode_id -> match_count (insertion ordered)
+        bm25_scores = {} if self.bm25 else None
+
+        for token in query_tokens:
+            episode_ids = self.get_postings(token)
+            if bm25_scores is not None:
+                term_freqs = self.search_index['tf'].get(token, [])
+                idf = self.search_index['idf'].get(token, 0)
+
+            for i, ep_id in enumerate(episode_ids):
+                matching_episode_ids[ep_id] = matching_episode_ids.get(ep_id, 0) + 1
+                if bm25_scores is not None:
+                    freqs = term_freqs[i] if i < len(term_freqs) else []
+                    bm25_scores[ep_id] = bm25_scores.get(ep_id, 0) + self.bm25_term_score(ep_id, freqs, idf)
+
+        results = []
+        for ep_id, match_count in matching_episode_ids.items():
+            episode = self.get_episode_by_id(ep_id)
+            if not episode:
+                continue
+
+            # Apply filters
+            if industry and not self.matches_industry(episode, industry):
+                continue
+            if subcategory and not self.matches_subcategory(episode, subcategory):
+                continue
+
+            if bm25_scores is not None:
+                score = bm25_scores[ep_id]
+            else:
+                score = self.calculate_score(episode, query_tokens, match_count)
+
+            results.append(dict(episode, score=score, matchCount=match_count))
+
+        # If filters but no query, include all episodes matching filters
+        if not query_tokens and (industry or subcategory):
+            seen = {r['id'] for r in results}
+            for episode in self.filter_candidates(industry, subcategory):
+                if industry and not self.matches_industry(episode, industry):
+                    continue
+                if subcategory and not self.matches_subcategory(episode, subcategory):
+                    continue
+                if episode['id'] not in seen:
+                    results.append(dict(episode, score=1, matchCount=0))
+
+        # Sort by score (descending, stable like Array.prototype.sort)
+        results.sort(key=lambda r: r['score'], reverse=True)
+
+        return results[:limit]
+
+    def calculate_score(self, episode, query_tokens, match_count):
+        """Relevance score used when the index has no BM25 statistics"""
+        score = match_count * 10  # Base score from token matches
+
+        # Boost for title matches
+        title_lower = (episode.get('title') or '').lower()
+        for token in query_tokens:
+            if token in title_lower:
+                score += 20
+
+        # Boost for guest name matches
+        guest_lower = (episode.get('guest') or '').lower()
+        for token in query_tokens:
+            if token in guest_lower:
+                score += 15
+
+        # Boost for tag matches
+        if self.tag_synonyms is not None:
+            # Index-time synonym table: query token -> canonical tags
+            tag_set = self.get_tag_set(episode)
+            for token in query_tokens:
+                if any(tag in tag_set for tag in self.tag_synonyms.get(token, [])):
+                    score += 10
+        else:
+            tags_lower = [t.lower() for t in episode.get('tags', [])]
+            for token in query_tokens:
+                if any(token in tag for tag in tags_lower):
+                    score += 10
+
+        return score
+
+    def get_tag_set(self, episode):
+        """Set of an episode's (normalized) tags, built once per episode"""
+        tag_set = self._tag_sets.get(episode['id'])
+        if tag_set is None:
+            tag_set = set(episode.get('tags', []))
+            self._tag_sets[episode['id']] = tag_set
+        return tag_set
+
+    def bm25_term_score(self, ep_id, term_freqs, idf):
+        """BM25F contribution of one query token to one episode"""
+        weights = self.bm25['field_weights']
+        k1 = self.bm25['k1']
+        b = self.bm25['b']
+        avg_lengths = self.bm25['avg_lengths']
+        lengths = self.bm25['doc_lengths'][self.row_of[ep_id]]
+
+        weighted_tf = 0
+        for i in range(0, len(term_freqs), 2):
+            field = term_freqs[i]
+            avg = avg_lengths[field] or 1
+            norm = 1 - b + b * (lengths[field] / avg)
+            weighted_tf += weights[field] * term_freqs[i + 1] / norm
+
+        return idf * weighted_tf / (k1 + weighted_tf)
+
+    def get_facet_set(self, field, value):
+        """
+        Episode ids matching a facet value (case-insensitive), plus episodes
+        without a value for the field; None if the index has no facets
+        """
+        facet = self.search_index.get('facets', {}).get(field)
+        if facet is None:
+            return None
+
+        wanted = value.lower()
+        ids = self._facet_sets.get((field, wanted))
+        if ids is None:
+            ids = set(facet['missing'])
+            for facet_value, facet_ids in facet['values'].items():
+                if facet_value.lower() == wanted:
+                    ids.update(facet_ids)
+            self._facet_sets[(field, wanted)] = ids
+        return ids
+
+    def filter_candidates(self, industry, subcategory):
+        """Episodes that can pass the filters, in index order (smallest facet list)"""
+        sets = []
+        if industry:
+            sets.append(self.get_facet_set('industry_category', industry))
+        if subcategory:
+            sets.append(self.get_facet_set('industry_subcategory', subcategory))
+        if not sets or None in sets:
+            return self.episodes
+
+        smallest = min(sets, key=len)
+        rows = sorted(self.row_of[ep_id] for ep_id in smallest if ep_id in self.row_of)
+        return [self.episodes[row] for row in rows]
+
+    def get_facet_counts(self, field):
+        """Number of episodes per facet value; None if the index has no facets"""
+        facet = self.search_index.get('facets', {}).get(field)
+        if facet is None:
+            return None
+        return {value: len(ids) for value, ids in facet['values'].items()}
+
+    def matches_industry(self, episode, industry):
+        if not industry or not episode.get('industry_category'):
+            return True
+        facet_set = self.get_facet_set('industry_category', industry)
+        if facet_set is not None:
+            return episode['id'] in facet_set
+        categories = [c.strip().lower() for c in episode['industry_category'].split(',')]
+        return industry.lower() in categories
+
+    def matches_subcategory(self, episode, subcategory):
+        if not subcategory or not episode.get('industry_subcategory'):
+            return True
+        facet_set = self.get_facet_set('industry_subcategory', subcategory)
+        if facet_set is not None:
+            return episode['id'] in facet_set
+        subcategories = [s.strip().lower() for s in episode['industry_subcategory'].split(',')]
+        return subcategory.lower() in subcategories
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def load_queries(query_file):
+    """One query per line; blank lines and # comments are skipped"""
+    with open(query_file, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+def run_benchmark(query_file, index_path=None, repeat=20, limit=50, **build_options):
+    """
+    Benchmark index build time, index size and query latency
+
+    Args:
+        query_file: File with one query per line
+        index_path: Existing index to benchmark; if None the index is built
+            from episodes_final.json into a temp dir and the build is timed
+        repeat: How many times the query file is replayed
+        limit: Result limit passed to every search
+        build_options: Extra keyword arguments for build_search_index()
+    """
+    queries = load_queries(query_file)
+
+    print("\n" + "="*80)
+    print("SEARCH BENCHMARK")
+    print("="*80 + "\n")
+
+    with tempfile.TemporaryDirectory(prefix='search-bench-') as tmp_dir:
+        build_seconds = None
+        if index_path is None:
+            index_path = os.path.join(tmp_dir, 'search-index.json')
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                build_search_index(output_file=index_path, **build_options)
+            build_seconds = time.perf_counter() - start
+
+        index_kb = os.path.getsize(index_path) / 1024
+
+        start = time.perf_counter()
+        engine = SearchEngine.load(index_path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    result_counts = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            results = engine.search(query, limit=limit)
+            latencies.append((time.perf_counter() - start) * 1000)
+            result_counts.append(len(results))
+    latencies.sort()
+
+    if build_seconds is not None:
+        print(f"✓ Build time:      {build_seconds * 1000:.1f} ms")
+    print(f"✓ Index size:      {index_kb:.1f} KB")
+    print(f"✓ Index load:      {load_ms:.1f} ms")
+    print(f"✓ Queries:         {len(queries)} x {repeat} = {len(latencies)} searches")
+    print(f"✓ Avg results:     {sum(result_counts) / max(len(result_counts), 1):.1f}")
+    print(f"\nQuery latency (ms):")
+    print(f"  p50: {percentile(latencies, 50):.3f}")
+    print(f"  p95: {percentile(latencies, 95):.3f}")
+    print(f"  p99: {percentile(latencies, 99):.3f}")
+    print(f"  max: {latencies[-1] if latencies else 0:.3f}")
+    print(f"\n{'='*80}\n")
+
+    return {
+        'build_seconds': build_seconds,
+        'index_kb': index_kb,
+        'load_ms': load_ms,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+    }
+
+if __name__ == '__main__':
+    import sys
+
+    args = sys.argv[1:]
+
+    if '--benchmark' in args:
+        idx = args.index('--benchmark')
+        query_file = args[idx + 1] if idx + 1 < len(args) else 'benchmark_queries.txt'
+
+        index_path = None
+        if '--index' in args:
+            index_path = args[args.index('--index') + 1]
+
+        repeat = 20
+        if '--repeat' in args:
+            repeat = int(args[args.index('--repeat') + 1])
+
+        run_benchmark(query_file, index_path=index_path, repeat=repeat, bm25='--bm25' in args)
+    else:
+        query = ' '.join(a for a in args if not a.startswith('--'))
+        engine = SearchEngine.load('search-index.json')
+        for result in engine.search(query, limit=10):
+            print(f"{result.get('score', 0):8.2f}  #{result['id']:<4} {result['title']}")
@@ -0,0 +1,153 @@
+"""
+Per-stage timing for the Drive batch processor
+
+StageTimer records how long every stage of every episode took (listing,
+transcript export, thumbnail search, thumbnail download, extraction,
+checkpoint write), plus bytes transferred and LLM tokens used. A run writes
+them as a Chrome trace (open in chrome://tracing or https://ui.perfetto.dev
+to see which worker waited on what) and prints p50/p95 per stage, so Drive
+and LLM bottlenecks can be told apart.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+STAGES = ['listing', 'transcript export', 'thumbnail search', 'thumbnail download',
+          'extraction', 'checkpoint write']
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+class StageTimer:
+    """Thread-safe collector of stage durations, byte counts and token usage"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+        self.events = []
+        self.threads = {}
+        self.bytes = {}
+        self.tokens = {'input_tokens': 0, 'output_tokens': 0}
+
+    def _thread_id(self):
+        ident = threading.get_ident()
+        with self.lock:
+            if ident not in self.threads:
+                self.threads[ident] = (len(self.threads) + 1, threading.current_thread().name)
+            return self.threads[ident][0]
+
+    @contextmanager
+    def stage(self, name, episode=None, **args):
+        """Time the enclosed block as one occurrence of a stage"""
+        tid = self._thread_id()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if episode is not None:
+                args['episode'] = episode
+            with self.lock:
+                self.events.append({
+                    'name': name,
+                    'start': start - self.origin,
+                    'duration': end - start,
+                    'tid': tid,
+                    'args': args,
+                })
+
+    def add_bytes(self, stage, count):
+        with self.lock:
+            self.bytes[stage] = self.bytes.get(stage, 0) + count
+
+    def add_tokens(self, usage):
+        """Add an API usage dict ({'input_tokens', 'output_tokens', ...})"""
+        if not usage:
+            return
+        with self.lock:
+            for field in self.tokens:
+                self.tokens[field] += usage.get(field) or 0
+
+    def elapsed(self):
+        return time.perf_counter() - self.origin
+
+    def summary(self):
+        """{stage: {count, total, p50, p95, max}} (seconds), in pipeline order"""
+        with self.lock:
+            events = list(self.events)
+        names = STAGES + sorted({event['name'] for event in events} - set(STAGES))
+
+        summary = {}
+        for name in names:
+            durations = [event['duration'] for event in events if event['name'] == name]
+            if durations:
+                summary[name] = {
+                    'count': len(durations),
+                    'total': sum(durations),
+                    'p50': percentile(durations, 0.50),
+                    'p95': percentile(durations, 0.95),
+                    'max': max(durations),
+                }
+        return summary
+
+    def write_trace(self, trace_file):
+        """Write the events in Chrome trace format (timestamps in microseconds)"""
+        with self.lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+
+        trace_events = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': name}}
+            for tid, name in threads.values()
+        ]
+        for event in sorted(events, key=lambda event: event['start']):
+            trace_events.append({
+                'name': event['name'],
+                'cat': 'stage',
+                'ph': 'X',
+                'ts': round(event['start'] * 1e6),
+                'dur': round(event['duration'] * 1e6),
+                'pid': 1,
+                'tid': event['tid'],
+                'args': event['args'],
+            })
+
+        data = {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'elapsed_seconds': self.elapsed(),
+                'stages': self.summary(),
+                'bytes': self.bytes,
+                'tokens': self.tokens,
+            },
+        }
+        tmp_file = f"{trace_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+        os.replace(tmp_file, trace_file)
+
+    def report(self):
+        """Print the per-stage table, bytes and tokens"""
+        print(f"\n⏱️  Stage timings (seconds):")
+        print(f"   {'stage':<20}{'count':>7}{'total':>10}{'p50':>9}{'p95':>9}{'max':>9}")
+        for name, stats in self.summary().items():
+            print(f"   {name:<20}{stats['count']:>7}{stats['total']:>10.2f}"
+                  f"{stats['p50']:>9.3f}{stats['p95']:>9.3f}{stats['max']:>9.3f}")
+
+        for stage, count in self.bytes.items():
+            print(f"📦 {stage}: {count / 1024 / 1024:.2f} MB transferred")
+        if any(self.tokens.values()):
+            print(f"🔤 Tokens: {self.tokens['input_tokens']:,} input, {self.tokens['output_tokens']:,} output")
+
+def timed(timer, name, episode=None, **args):
+    """timer.stage(...) if there is a timer, otherwise a no-op context"""
+    return timer.stage(name, episode, **args) if timer is not None else nullcontext()
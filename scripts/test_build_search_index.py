@@ -0,0 +1,92 @@
+"""
+Tests for the search index builder: incremental builds and the sharded layout
+
+Usage (from scripts/):
+    python3 -m pytest test_build_search_index.py
+    python3 -m unittest test_build_search_index
+"""
+import contextlib
+import io
+import json
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+import cleanup_tags
+from build_search_index import CARD_EXCERPTS, CARD_FIELDS, build_search_index, write_shards
+from cleanup_tags import TAG_MAPPINGS, compile_tag_mappings, normalize_tag
+
+EPISODES_JS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'episodes.js')
+
+EPISODES = [
+    {'Episode #': '01', 'Episode Title': 'Cold outreach that works', 'Guest Name': 'Guest One',
+     'Episode Summary': 'How a services firm books meetings with cold email.', 'Tags': 'cold email, sales'},
+    {'Episode #': '02', 'Episode Title': 'Buying a laundromat', 'Guest Name': 'Guest Two',
+     'Episode Summary': 'Financing and running a small acquisition.', 'Tags': 'laundromat, business acquisition'},
+]
+
+class IncrementalBuildTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.work_dir.cleanup)
+        self.input_file = os.path.join(self.work_dir.name, 'episodes.json')
+        with open(self.input_file, 'w', encoding='utf-8') as f:
+            json.dump(EPISODES, f)
+        normalize_tag.cache_clear()
+        self.addCleanup(normalize_tag.cache_clear)
+
+    def build(self, name, incremental=False):
+        output_file = os.path.join(self.work_dir.name, name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_search_index(self.input_file, output_file, incremental=incremental, thumbnail_manifest=None)
+        with open(output_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_tag_mapping_change_matches_full_build(self):
+        self.build('incremental.json')
+
+        mappings = {**TAG_MAPPINGS, 'cold email': 'outbound-sales'}
+        with mock.patch.dict(cleanup_tags.TAG_MAPPINGS, mappings), \
+                mock.patch.object(cleanup_tags, 'TAG_TABLE', compile_tag_mappings(mappings)):
+            normalize_tag.cache_clear()
+            incremental = self.build('incremental.json', incremental=True)
+            full = self.build('full.json')
+
+        self.assertIn('outbound-sales', incremental['episodes'][0]['tags'])
+        self.assertEqual(incremental, full)
+
+class ShardedLayoutTest(unittest.TestCase):
+
+    def test_card_fields_cover_episodes_js(self):
+        # Everything but the modal (which calls loadDetails()) renders card rows
+        with open(EPISODES_JS, 'r', encoding='utf-8') as f:
+            source = f.read()
+        bodies = dict(re.findall(r'^(?:async )?function (\w+)\((.*?)^}', source, re.M | re.S))
+        self.assertIn('createEpisodeCard', bodies)
+
+        read = {field
+                for name, body in bodies.items() if name != 'openModal'
+                for field in re.findall(r'\b(?:episode|ep)\.(\w+)', body)}
+        self.assertLessEqual(read, set(CARD_FIELDS))
+
+    def test_cards_carry_excerpts_and_details_the_full_text(self):
+        episodes = [{'id': str(n), 'title': f'Episode {n}', 'summary': 'word ' * 100, 'tags': ['sales']}
+                    for n in range(3)]
+        search_index = {'episodes': episodes, 'index': {'word': ['0', '1', '2']}, 'metadata': {}}
+
+        with tempfile.TemporaryDirectory() as shard_dir:
+            write_shards(search_index, shard_dir, detail_chunk_size=2)
+            with open(os.path.join(shard_dir, 'episodes.json'), 'r', encoding='utf-8') as f:
+                cards = json.load(f)
+            with open(os.path.join(shard_dir, 'details-1.json'), 'r', encoding='utf-8') as f:
+                details = json.load(f)
+
+        self.assertLessEqual(len(cards[0]['summary']), CARD_EXCERPTS['summary'])
+        self.assertNotIn('tags', cards[0])
+        self.assertEqual(details, [{'summary': episodes[2]['summary'], 'tags': ['sales']}])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for the Drive listing cache, run against LocalDriveBackend
+
+Usage (from scripts/):
+    python3 -m pytest test_drive_cache.py
+    python3 -m unittest test_drive_cache
+"""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from drive_backend import LocalDriveBackend
+from drive_cache import DriveListingCache
+from google_drive_batch_with_thumbnails import process_batch_from_drive
+
+EPISODES = 5
+
+class TranscriptEchoExtractor:
+    """Starts the summary with the first transcript line, so stale records are visible"""
+
+    def process_episode_folder(self, folder_name, transcript_text, thumbnail_path=None):
+        return {
+            'Episode #': folder_name.split(' - ')[0].strip(),
+            'Episode Title': folder_name,
+            # Over 50 characters, so the record counts as processed
+            'Episode Summary': f"{transcript_text.splitlines()[0]}: a summary of the conversation",
+        }
+
+class ChangedFoldersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.work_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.work_dir.cleanup)
+        self.corpus = os.path.join(self.work_dir.name, 'corpus')
+        self.output_file = os.path.join(self.work_dir.name, 'episodes.json')
+        self.cache_file = os.path.join(self.work_dir.name, 'drive_listing_cache.json')
+
+        for number in range(1, EPISODES + 1):
+            self.write_transcript(number, 'original')
+        # One backend for all runs: its changes feed stands in for Drive's
+        self.backend = LocalDriveBackend(self.corpus)
+
+    def write_transcript(self, number, version):
+        folder = os.path.join(self.corpus, f"{number:02d} - Guest {number}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, 'Transcript.gdoc'), 'w', encoding='utf-8') as f:
+            f.write(f"{version} transcript of episode {number}\n" + 'Host: hello there. ' * 20)
+
+    def run_batch(self, batch_size):
+        with contextlib.redirect_stdout(io.StringIO()):
+            process_batch_from_drive(
+                batch_size, self.output_file,
+                workers=1,
+                cache_file=self.cache_file,
+                optimize=False,
+                transcript_store_dir=None,
+                extraction_cache_dir=None,
+                backend=self.backend,
+                extractor_factory=lambda api_key: TranscriptEchoExtractor(),
+                thumbnails_dir=os.path.join(self.work_dir.name, 'thumbnails')
+            )
+        with open(self.output_file, 'r', encoding='utf-8') as f:
+            return {ep['Episode #']: ep['Episode Summary'] for ep in json.load(f)}
+
+    def test_changes_past_batch_size_are_reprocessed_by_a_later_run(self):
+        summaries = self.run_batch(EPISODES)
+        self.assertEqual(len(summaries), EPISODES)
+
+        self.write_transcript(1, 'edited')
+        self.write_transcript(5, 'edited')
+
+        # Only one of the two changed episodes fits in this batch...
+        summaries = self.run_batch(1)
+        self.assertTrue(summaries['01'].startswith('edited'))
+        self.assertTrue(summaries['05'].startswith('original'))
+
+        cache = DriveListingCache('root', self.cache_file)
+        self.assertEqual([cache.files[folder_id]['name'] for folder_id in cache.pending], ['05 - Guest 5'])
+
+        # ...the other one stays pending and is picked up by the next run
+        summaries = self.run_batch(EPISODES)
+        self.assertTrue(summaries['05'].startswith('edited'))
+        self.assertEqual(DriveListingCache('root', self.cache_file).pending, set())
+
+    def test_failed_episodes_stay_pending(self):
+        self.run_batch(EPISODES)
+
+        # Too short to extract: the episode fails and its change must not be dropped
+        transcript = os.path.join(self.corpus, '02 - Guest 2', 'Transcript.gdoc')
+        with open(transcript, 'w', encoding='utf-8') as f:
+            f.write('too short')
+        summaries = self.run_batch(EPISODES)
+        self.assertEqual(len(DriveListingCache('root', self.cache_file).pending), 1)
+        # The last good record stays in the output until a new one replaces it
+        self.assertEqual(sorted(summaries), ['01', '02', '03', '04', '05'])
+        self.assertTrue(summaries['02'].startswith('original'))
+
+        self.write_transcript(2, 'fixed')
+        summaries = self.run_batch(EPISODES)
+        self.assertTrue(summaries['02'].startswith('fixed'))
+        self.assertEqual(DriveListingCache('root', self.cache_file).pending, set())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,228 @@
+"""
+Local content-addressed store for episode transcripts
+
+Drive ingestion writes every transcript it downloads here, so later runs
+(and re-extraction with a new prompt) read them from disk instead of
+re-exporting Google Docs. Records follow the transcripts README schema
+(resources/episodes/transcripts/README.md) and are stored gzip-compressed
+under the SHA-256 of their content:
+
+    transcript_store/
+        index.json                          episode number -> object hash + Drive source
+        objects/ab/abcdef....json.gz        one README-schema record
+
+Usage:
+    python3 transcript_store.py                      # Store stats
+    python3 transcript_store.py --import <dir>       # Add episode-XXX.json files
+    python3 transcript_store.py --export <dir>       # Write episode-XXX.json files
+    python3 transcript_store.py --gc                 # Delete unreferenced objects
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+TRANSCRIPT_STORE_DIR = 'transcript_store'
+STORE_VERSION = 1
+
+def episode_key(value):
+    """Store key for an episode number: 3-digit zero-padded like the README files"""
+    text = str(value).strip()
+    return text.zfill(3) if text.isdigit() else text
+
+def transcript_record(episode_number, transcript, episode_title='', guest_name='', business_name='',
+                      duration='', date='', platform_source='Google Drive'):
+    """Build a record following the transcripts README schema"""
+    return {
+        'episode_number': episode_number,
+        'episode_title': episode_title,
+        'guest_name': guest_name,
+        'business_name': business_name,
+        'transcript': transcript,
+        'metadata': {
+            'duration': duration,
+            'date': date,
+            'platform_source': platform_source,
+        },
+    }
+
+class TranscriptStore:
+    """Content-addressed, gzip-compressed transcript records keyed by episode number"""
+
+    def __init__(self, root=TRANSCRIPT_STORE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.index_file = self.root / 'index.json'
+        self.lock = threading.Lock()
+        self.entries = {}  # episode_key -> {'sha256', 'bytes', 'source', 'stored_at'}
+        self.load()
+
+    def load(self):
+        if not self.index_file.exists():
+            return
+        with open(self.index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == STORE_VERSION:
+            self.entries = data.get('episodes', {})
+
+    def save(self):
+        """Write the index atomically (temp file + rename)"""
+        with self.lock:
+            episodes = dict(sorted(self.entries.items()))
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': STORE_VERSION, 'episodes': episodes}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+
+    def object_path(self, sha256):
+        return self.objects_dir / sha256[:2] / f"{sha256}.json.gz"
+
+    def put(self, record, source=None):
+        """
+        Store a README-schema record for its episode_number
+
+        The object is written at once; the index only changes in memory, so
+        a batch of puts costs one index write: call save() when done.
+
+        Args:
+            record: Transcript record (see transcript_record())
+            source: Where it came from, e.g. the Drive file's id,
+                modifiedTime and md5Checksum (see matches_source())
+
+        Returns:
+            SHA-256 of the stored object (identical records share one object)
+        """
+        payload = json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        sha256 = hashlib.sha256(payload).hexdigest()
+        path = self.object_path(sha256)
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        with self.lock:
+            self.entries[episode_key(record['episode_number'])] = {
+                'sha256': sha256,
+                'bytes': len(payload),
+                'source': source,
+                'stored_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            }
+
+        return sha256
+
+    def get(self, episode_number):
+        """The stored record for an episode, or None"""
+        entry = self.entries.get(episode_key(episode_number))
+        if not entry:
+            return None
+        return self.read_object(self.object_path(entry['sha256']))
+
+    @staticmethod
+    def read_object(path):
+        with gzip.open(path, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+
+    def get_text(self, episode_number):
+        """Transcript text for an episode, or None"""
+        record = self.get(episode_number)
+        return record.get('transcript') if record else None
+
+    def matches_source(self, episode_number, source):
+        """True if the stored transcript came from this exact Drive file revision"""
+        entry = self.entries.get(episode_key(episode_number))
+        if not entry or not entry.get('source') or not source:
+            return False
+        stored = entry['source']
+        if stored.get('file_id') != source.get('file_id'):
+            return False
+        # Google Docs have no md5Checksum; their modifiedTime changes on every edit
+        for field in ('md5Checksum', 'modifiedTime'):
+            if source.get(field):
+                return stored.get(field) == source[field]
+        return False
+
+    def object_paths(self):
+        """Episode key -> object path for every stored episode, in key order"""
+        return {key: self.object_path(entry['sha256']) for key, entry in sorted(self.entries.items())}
+
+    def collect_garbage(self):
+        """
+        Delete objects no longer referenced by the index; returns the count
+
+        Call save() first, so the index on disk never points at a deleted object.
+        """
+        referenced = {entry['sha256'] for entry in self.entries.values()}
+        removed = 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob('*/*.json.gz'):
+                if path.name[:-len('.json.gz')] not in referenced:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+def source_for(drive_file):
+    """Source signature of a Drive file dict from the folder listing"""
+    return {
+        'file_id': drive_file['id'],
+        'name': drive_file.get('name'),
+        'modifiedTime': drive_file.get('modifiedTime'),
+        'md5Checksum': drive_file.get('md5Checksum'),
+    }
+
+def import_directory(store, transcripts_dir):
+    """Add every episode-XXX.json file of a directory to the store"""
+    imported = 0
+    for path in sorted(Path(transcripts_dir).glob('episode-*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        if record.get('transcript'):
+            store.put(record, source={'file': path.name})
+            imported += 1
+    store.save()
+    return imported
+
+def export_directory(store, transcripts_dir):
+    """Write every stored record as episode-XXX.json (README naming)"""
+    Path(transcripts_dir).mkdir(parents=True, exist_ok=True)
+    exported = 0
+    for key in sorted(store.entries):
+        with open(Path(transcripts_dir) / f"episode-{key}.json", 'w', encoding='utf-8') as f:
+            json.dump(store.get(key), f, indent=2, ensure_ascii=False)
+        exported += 1
+    return exported
+
+if __name__ == '__main__':
+    import sys
+
+    store = TranscriptStore()
+
+    if '--import' in sys.argv:
+        source_dir = sys.argv[sys.argv.index('--import') + 1]
+        print(f"✓ Imported {import_directory(store, source_dir)} transcripts from {source_dir}")
+
+    if '--export' in sys.argv:
+        target_dir = sys.argv[sys.argv.index('--export') + 1]
+        print(f"✓ Exported {export_directory(store, target_dir)} transcripts to {target_dir}")
+
+    if '--gc' in sys.argv:
+        print(f"✓ Removed {store.collect_garbage()} unreferenced objects")
+
+    objects = list(store.objects_dir.glob('*/*.json.gz')) if store.objects_dir.exists() else []
+    raw_bytes = sum(entry['bytes'] for entry in store.entries.values())
+    stored_bytes = sum(path.stat().st_size for path in objects)
+    print(f"✓ {len(store.entries)} episodes, {len(objects)} objects in {store.root}/")
+    print(f"✓ {raw_bytes / 1024 / 1024:.1f} MB of records, {stored_bytes / 1024 / 1024:.1f} MB on disk")